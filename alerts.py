@@ -0,0 +1,144 @@
+# alerts.py
+# 提醒分发 - 声音、控制台输出、停止连点等提醒处理在后台线程执行，不拖慢检测循环
+import inspect
+import itertools
+import queue
+import threading
+import time
+
+
+def accepts_argument(function):
+    """函数能否接收一个位置参数（取不到签名的内置函数等按能接收处理）"""
+    try:
+        inspect.signature(function).bind(None)
+    except TypeError:
+        return False
+    except ValueError:
+        return True
+    return True
+
+
+class AlertHandler:
+    """一个提醒处理函数及其优先级、超时设置"""
+
+    def __init__(self, name, function, priority=0, timeout=None):
+        """
+        参数:
+        name: 名称，用于输出
+        function: 处理函数，参数为 {区域名称: [关键词, ...]}
+        priority: 优先级，数值越小越先执行
+        timeout: 最长等待时间(秒)，超时后不再等待它，继续处理后面的任务
+        """
+        self.name = name
+        self.function = function
+        self.priority = priority
+        self.timeout = timeout
+        self.running = threading.Event()  # 上一次调用是否仍在执行
+
+
+class AlertDispatcher:
+    """
+    提醒分发器
+    功能：dispatch() 只把任务放进优先级队列后立即返回；后台工作线程按优先级取出任务，
+    在独立线程中执行处理函数并按超时等待，某个处理函数卡住不会影响其他处理函数
+    """
+
+    def __init__(self, workers=2, default_timeout=2.0, verbose=True, metrics=None):
+        """
+        参数:
+        workers: 工作线程数，不同处理函数可以同时执行（如一边响铃一边停止连点）
+        default_timeout: 处理函数未指定超时时使用的超时(秒)
+        verbose: 是否输出超时、异常信息
+        metrics: 指标注册表，记录排队时间和各处理函数耗时
+        """
+        self.default_timeout = default_timeout
+        self.verbose = verbose
+        self.metrics = metrics
+        self.handlers = []
+        self.tasks = queue.PriorityQueue()
+        self.sequence = itertools.count()  # 同优先级按提交顺序执行
+        self.closed = False
+
+        # 统计
+        self.dispatched = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.errors = 0
+
+        self.threads = []
+        for index in range(max(1, workers)):
+            thread = threading.Thread(target=self.worker_loop, name=f'alert-{index}')
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def register(self, name, function, priority=0, timeout=None):
+        """登记处理函数，返回 AlertHandler"""
+        handler = AlertHandler(name, function, priority,
+                               self.default_timeout if timeout is None else timeout)
+        self.handlers.append(handler)
+        self.handlers.sort(key=lambda item: item.priority)
+        return handler
+
+    def dispatch(self, matches):
+        """提交一次提醒，立即返回"""
+        if self.closed:
+            return
+        self.dispatched += 1
+        submitted = time.perf_counter()
+        for handler in self.handlers:
+            self.tasks.put((handler.priority, next(self.sequence), handler, matches, submitted))
+
+    def worker_loop(self):
+        """工作线程：按优先级取出任务并执行"""
+        while True:
+            _, _, handler, matches, submitted = self.tasks.get()
+            if handler is None:
+                break
+            if self.metrics is not None:
+                self.metrics.observe('alert_queue_delay', time.perf_counter() - submitted)
+            self.run_handler(handler, matches)
+
+    def run_handler(self, handler, matches):
+        """在独立线程中执行处理函数，最多等待 handler.timeout 秒"""
+        if handler.running.is_set():
+            # 上一次调用超时后仍未结束，不再叠加新的调用
+            self.skipped += 1
+            if self.verbose:
+                print(f"[警告] 提醒处理「{handler.name}」上次尚未结束，本次跳过")
+            return
+
+        handler.running.set()
+
+        def call():
+            start = time.perf_counter()
+            try:
+                handler.function(matches)
+            except Exception as e:
+                self.errors += 1
+                if self.verbose:
+                    print(f"[错误] 提醒处理「{handler.name}」出错: {e}")
+            finally:
+                handler.running.clear()
+                if self.metrics is not None:
+                    self.metrics.observe(f'alert_{handler.name}', time.perf_counter() - start)
+
+        thread = threading.Thread(target=call, name=f'alert-{handler.name}')
+        thread.daemon = True
+        thread.start()
+        thread.join(handler.timeout)
+        if thread.is_alive():
+            self.timeouts += 1
+            if self.verbose:
+                print(f"[警告] 提醒处理「{handler.name}」超过{handler.timeout}秒未完成，继续处理其他提醒")
+
+    def close(self):
+        """停止工作线程（已在队列中的任务会先执行完）"""
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.threads:
+            # 优先级设为无穷大，保证排在所有已提交任务之后
+            self.tasks.put((float('inf'), next(self.sequence), None, None, None))
+        for thread in self.threads:
+            thread.join(timeout=1.0)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# bench_constrained_ocr.py
+# 受限识别基准测试 - 对比普通识别与按关键词字符白名单受限识别的耗时、召回率和误报
+#
+# 画面集包括：含目标课程的画面（统计召回率）、不含目标课程的基准画面，
+# 以及含有与目标课程字形相近的干扰课程的画面（统计误报）
+#
+# 用法示例:
+#   python benchmarks/bench_constrained_ocr.py
+#   python benchmarks/bench_constrained_ocr.py --engine onnx --size 900x500 --fuzzy
+import argparse
+import time
+
+import bench_utils
+from bench_utils import summarize, print_table
+from synthetic_frames import TARGET_COURSES, make_rows, make_scenario, render_course_table, to_monitor_gray
+
+from keyword_matcher import KeywordMatcher, build_allowlist
+from ocr_engines import create_ocr_engine
+
+# 与目标课程共用大部分字符、但不是目标课程的干扰课程
+DECOY_COURSES = {
+    'zh': ["机器人学", "多媒体设计", "模式设计", "代数几何"],
+    'en': ["Machine Design", "Multimedia Art", "Pattern Design", "Python Basics"],
+}
+
+
+def make_frames(language, width, height, scale):
+    """
+    生成画面集（灰度 + 缩放，与 capture_region 输出一致）
+
+    返回: [(类型, 目标课程名或None, 灰度图), ...]，类型为 'target' / 'baseline' / 'decoy'
+    """
+    baseline, targets = make_scenario(language, width, height)
+    frames = [('baseline', None, baseline)] + [('target', name, frame) for name, frame in targets]
+
+    row_count = max(1, height // int(16 * 2.2) - 1)
+    for index, decoy in enumerate(DECOY_COURSES[language]):
+        rows = make_rows(language, row_count, target=decoy, target_row=index % row_count, seed=index)
+        frames.append(('decoy', None, render_course_table(rows, width, height, language)))
+
+    return [(kind, target, to_monitor_gray(frame, scale)) for kind, target, frame in frames]
+
+
+def run(engine, frames, matcher, allowlist, min_confidence, repeats):
+    """
+    识别并匹配 repeats 轮
+
+    返回: (每帧耗时列表, 召回率, 误报次数, 平均每帧识别出的字符数)
+    """
+    timings = []
+    hits = targets = false_alarms = 0
+    chars = 0
+    for round_index in range(repeats):
+        for kind, target, frame in frames:
+            start = time.perf_counter()
+            results = engine.readtext(frame, allowlist=allowlist)
+            if allowlist is not None:
+                results = [result for result in results if result[2] >= min_confidence]
+            found = matcher.find([result[1] for result in results])
+            timings.append(time.perf_counter() - start)
+            if round_index:
+                continue
+
+            chars += sum(len(result[1]) for result in results)
+            if kind == 'target':
+                targets += 1
+                hits += target in found
+            elif found:
+                false_alarms += 1
+    return timings, hits / float(targets), false_alarms, chars / float(len(frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="受限识别与普通识别对比")
+    parser.add_argument('--engine', default='easyocr', help="OCR引擎: easyocr / onnx")
+    parser.add_argument('--model-dir', default='onnx_models', help="ONNX模型目录")
+    parser.add_argument('--language', default='zh', help="画面语言: zh / en")
+    parser.add_argument('--size', default='600x300,1200x800', help="合成画面尺寸列表")
+    parser.add_argument('--scale', type=float, default=0.7, help="image_scale")
+    parser.add_argument('--min-confidence', type=float, default=0.3, help="受限识别的最低置信度")
+    parser.add_argument('--fuzzy', action='store_true', help="使用模糊匹配")
+    parser.add_argument('--repeats', type=int, default=3, help="画面集重复识别的轮数")
+    parser.add_argument('--json', default=None, help="结果输出的JSON文件路径")
+    args = parser.parse_args()
+
+    options = {'model_dir': args.model_dir} if args.engine == 'onnx' else {}
+    print(f"加载 {args.engine} ...")
+    engine = create_ocr_engine(args.engine, **options)
+
+    keywords = TARGET_COURSES[args.language]
+    allowlist = build_allowlist(keywords)
+    print(f"关键词: {', '.join(keywords)}; 白名单 {len(allowlist)} 个字符")
+
+    results = []
+    for width, height in bench_utils.parse_sizes(args.size):
+        frames = make_frames(args.language, width, height, args.scale)
+        engine.readtext(frames[0][2])
+        for mode, mode_allowlist in (('普通', None), ('受限', allowlist)):
+            matcher = KeywordMatcher(keywords, fuzzy=args.fuzzy,
+                                     reachable_only=mode_allowlist is not None)
+            timings, recall, false_alarms, chars = run(engine, frames, matcher, mode_allowlist,
+                                                       args.min_confidence, args.repeats)
+            results.append({'size': f"{width}x{height}", 'mode': mode, 'latency': summarize(timings),
+                            'recall': recall, 'false_alarms': false_alarms,
+                            'decoy_frames': len(DECOY_COURSES[args.language]) + 1,
+                            'chars_per_frame': chars})
+    engine.close()
+
+    print(f"\n引擎 {args.engine}, 缩放 {args.scale}, {'模糊' if args.fuzzy else '精确'}匹配, "
+          f"每种配置 {args.repeats} 轮")
+    print_table(
+        ["区域", "模式", "p50(ms)", "p95(ms)", "召回率", "误报/非目标画面", "每帧字符数"],
+        [[r['size'], r['mode'], f"{r['latency']['p50_ms']:.0f}", f"{r['latency']['p95_ms']:.0f}",
+          f"{r['recall'] * 100:.0f}%", f"{r['false_alarms']}/{r['decoy_frames']}",
+          f"{r['chars_per_frame']:.0f}"]
+         for r in results])
+
+    if args.json:
+        bench_utils.write_json(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
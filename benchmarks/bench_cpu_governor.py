@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# bench_cpu_governor.py
+# CPU预算基准测试 - 不同CPU占用预算/OCR线程数下，监控进程的实际CPU占用、端到端检测延迟，
+# 以及同时运行的"浏览器"（另一个进程中的固定计算任务）还能拿到多少CPU
+#
+# 用法示例:
+#   python benchmarks/bench_cpu_governor.py
+#   python benchmarks/bench_cpu_governor.py --budgets none,50,25 --threads none,2 --trials 10
+import argparse
+import multiprocessing
+import random
+import time
+
+import bench_utils
+from bench_utils import summarize, print_table
+from bench_detection_latency import OfflineCapture, measure_latency
+from synthetic_frames import TARGET_COURSES, make_scenario
+
+from course_monitor import CourseMonitor
+
+
+def competitor(stop_event, counter):
+    """模拟浏览器渲染：不停做固定的计算，统计完成的轮数"""
+    while not stop_event.is_set():
+        total = 0
+        for value in range(20000):
+            total += value * value
+        with counter.get_lock():
+            counter.value += 1
+
+
+def competitor_rate(duration):
+    """单独运行竞争进程 duration 秒，返回每秒完成的轮数（作为不受干扰时的基准）"""
+    stop_event = multiprocessing.Event()
+    counter = multiprocessing.Value('l', 0)
+    process = multiprocessing.Process(target=competitor, args=(stop_event, counter), daemon=True)
+    process.start()
+    time.sleep(duration)
+    stop_event.set()
+    process.join()
+    return counter.value / duration
+
+
+def parse_optional(text, cast):
+    """解析 'none,50,25' 形式的列表，none 表示不限制"""
+    return [None if item.strip().lower() == 'none' else cast(item) for item in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU预算对CPU占用和检测延迟的影响")
+    parser.add_argument('--language', default='zh', help="画面语言: zh / en")
+    parser.add_argument('--size', default='900x500', help="监控区域尺寸")
+    parser.add_argument('--scale', type=float, default=0.7, help="image_scale")
+    parser.add_argument('--budgets', default='none,50,25,10', help="CPU占用预算列表(%%)，none=不限制")
+    parser.add_argument('--threads', default='none', help="OCR线程数列表，none=不限制")
+    parser.add_argument('--check-interval', type=float, default=0.2, help="监控检查间隔(秒)")
+    parser.add_argument('--trials', type=int, default=8, help="每种配置的检测延迟测量次数")
+    parser.add_argument('--timeout', type=float, default=15.0, help="单次检测的超时时间(秒)")
+    parser.add_argument('--json', default=None, help="结果输出的JSON文件路径")
+    args = parser.parse_args()
+
+    random.seed(0)
+    width, height = bench_utils.parse_sizes(args.size)[0]
+    baseline, targets = make_scenario(args.language, width, height)
+    region = (0, 0, width, height)
+    backend = OfflineCapture(baseline)
+
+    monitor = CourseMonitor({
+        'keywords': list(TARGET_COURSES[args.language]),
+        'capture_backend': backend,
+        'check_interval': args.check_interval,
+        'image_scale': args.scale,
+        'change_detection': False,
+        'alert_cooldown': 0,
+        'on_target_detected': lambda matches: None,  # measure_latency 会换成计时用的回调
+        'verbose': False,
+    })
+    monitor.play_beep_sound = lambda: True
+
+    print("测量竞争进程单独运行时的速度...")
+    idle_rate = competitor_rate(3.0)
+
+    results = []
+    for threads in parse_optional(args.threads, int):
+        for budget in parse_optional(args.budgets, float):
+            print(f"测试中: OCR线程数={threads or '不限制'} CPU预算={budget or '不限制'}")
+            monitor.governor.ocr_threads = threads
+            monitor.governor.cpu_percent = budget
+            monitor.governor.verbose = False
+            monitor.governor.apply()
+
+            stop_event = multiprocessing.Event()
+            counter = multiprocessing.Value('l', 0)
+            process = multiprocessing.Process(target=competitor, args=(stop_event, counter),
+                                              daemon=True)
+            process.start()
+            start = time.perf_counter()
+
+            latencies, misses = measure_latency(monitor, backend, region, baseline, targets,
+                                                args.trials, args.check_interval * 2, args.timeout)
+
+            elapsed = time.perf_counter() - start
+            stop_event.set()
+            process.join()
+            summary = monitor.governor.summary()
+            results.append({
+                'threads': threads, 'budget': budget,
+                'cpu_percent': summary['cpu_percent'],
+                'throttle_share': summary['throttle_share'],
+                'latency': summarize(latencies), 'misses': misses,
+                'competitor': counter.value / elapsed / idle_rate if idle_rate else float('nan'),
+            })
+
+    monitor.close()
+    print(f"\n区域 {width}x{height}, 缩放 {args.scale}, 检查间隔 {args.check_interval}秒")
+    print_table(
+        ["OCR线程", "CPU预算", "实际CPU占用", "限流时间占比", "检测延迟p50(ms)", "p95(ms)", "超时",
+         "竞争进程速度"],
+        [[r['threads'] or '不限制', f"{r['budget']:g}%" if r['budget'] else '不限制',
+          f"{r['cpu_percent']:.0f}%", f"{r['throttle_share'] * 100:.0f}%",
+          f"{r['latency'].get('p50_ms', float('nan')):.0f}",
+          f"{r['latency'].get('p95_ms', float('nan')):.0f}", r['misses'],
+          f"{r['competitor'] * 100:.0f}%"]
+         for r in results])
+
+    if args.json:
+        bench_utils.write_json(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# bench_detection_latency.py
+# 端到端检测延迟基准测试 - 从"课程出现在屏幕上"到"on_target_detected 被调用"
+#
+# 用法示例:
+#   python benchmarks/bench_detection_latency.py
+#   python benchmarks/bench_detection_latency.py --sizes 900x500 --scales 1.0,0.7 --trials 20
+import argparse
+import random
+import threading
+import time
+
+import bench_utils
+from bench_utils import summarize, timed, print_table
+from synthetic_frames import TARGET_COURSES, make_scenario
+
+from capture_backends import CaptureBackend
+from course_monitor import CourseMonitor
+
+
+class OfflineCapture(CaptureBackend):
+    """
+    离线截图替身
+    功能：代替屏幕截图返回指定画面，并记录每次截图拿到的是第几次切换的画面
+    """
+
+    name = 'offline'
+    color_format = 'RGB'
+
+    def __init__(self, frame):
+        self.lock = threading.Lock()
+        self.frame = frame
+        self.generation = 0
+        self.grabbed_generation = -1
+
+    def show(self, frame):
+        """切换屏幕上的画面，返回 (画面编号, 切换时刻)"""
+        with self.lock:
+            self.frame = frame
+            self.generation += 1
+            return self.generation, time.perf_counter()
+
+    def grab(self, region):
+        with self.lock:
+            self.grabbed_generation = self.generation
+            return self.frame
+
+
+def measure_stages(monitor, backend, region, baseline, targets, repeats):
+    """逐阶段计时，同时统计关键词召回率和误报"""
+    stages = {'capture': [], 'ocr': [], 'match': []}
+    hits = 0
+    false_alarms = 0
+
+    frames = [(None, baseline)] + list(targets)
+    for _ in range(repeats):
+        for expected, frame in frames:
+            backend.show(frame)
+            screenshot, capture_time = timed(monitor.capture_region, region)
+            texts, ocr_time = timed(monitor.recognize_text_safe, screenshot)
+            found, match_time = timed(monitor.check_keywords, texts)
+
+            stages['capture'].append(capture_time)
+            stages['ocr'].append(ocr_time)
+            stages['match'].append(match_time)
+            if expected is None:
+                false_alarms += 1 if found else 0
+            elif expected in found:
+                hits += 1
+
+    recall = hits / float(len(targets) * repeats) if targets else float('nan')
+    return stages, recall, false_alarms
+
+
+def measure_latency(monitor, backend, region, baseline, targets, trials, settle_time, timeout):
+    """在真实的监控循环中测量检测延迟"""
+    detected = threading.Event()
+    state = {'generation': None, 'shown_at': 0.0, 'latency': None}
+
+    def on_detected(*args):
+        # 只统计由本轮目标画面触发的回调
+        if backend.grabbed_generation == state['generation'] and not detected.is_set():
+            state['latency'] = time.perf_counter() - state['shown_at']
+            detected.set()
+
+    monitor.callback_function = on_detected
+    monitor.is_monitoring = True
+    thread = threading.Thread(target=monitor.monitor_region, args=(region,))
+    thread.daemon = True
+    thread.start()
+
+    latencies = []
+    misses = 0
+    try:
+        for trial in range(trials):
+            backend.show(baseline)
+            time.sleep(settle_time + random.uniform(0, monitor.check_interval))
+
+            detected.clear()
+            state['latency'] = None
+            _, target = targets[trial % len(targets)]
+            state['generation'], state['shown_at'] = backend.show(target)
+
+            if detected.wait(timeout):
+                latencies.append(state['latency'])
+            else:
+                misses += 1
+    finally:
+        monitor.is_monitoring = False
+        thread.join(timeout=timeout)
+
+    return latencies, misses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="选课监控端到端检测延迟基准测试")
+    parser.add_argument('--languages', default='zh,en', help="画面语言: zh,en")
+    parser.add_argument('--sizes', default='600x300,900x500,1200x800', help="监控区域尺寸列表")
+    parser.add_argument('--scales', default='1.0,0.8,0.6', help="image_scale 列表")
+    parser.add_argument('--font-size', type=int, default=16, help="表格字号")
+    parser.add_argument('--repeats', type=int, default=3, help="逐阶段计时的重复次数")
+    parser.add_argument('--trials', type=int, default=10, help="每组配置的端到端延迟测量次数")
+    parser.add_argument('--check-interval', type=float, default=0.2, help="监控检查间隔(秒)")
+    parser.add_argument('--timeout', type=float, default=10.0, help="单次检测的超时时间(秒)")
+    parser.add_argument('--gpu', action='store_true', help="使用GPU")
+    parser.add_argument('--json', default=None, help="结果输出的JSON文件路径")
+    args = parser.parse_args()
+
+    random.seed(0)
+    sizes = bench_utils.parse_sizes(args.sizes)
+    scales = bench_utils.parse_floats(args.scales)
+    languages = args.languages.split(',')
+
+    first_baseline, _ = make_scenario(languages[0], *sizes[0], font_size=args.font_size)
+    backend = OfflineCapture(first_baseline)
+
+    results = []
+    for language in languages:
+        # 所有配置共用一个监控器（只加载一次OCR模型），逐项修改参数
+        monitor = CourseMonitor({
+            'keywords': list(TARGET_COURSES[language]),
+            'capture_backend': backend,
+            'check_interval': args.check_interval,
+            'alert_cooldown': 0,
+            # 先占位登记回调处理器，measure_latency 再换成计时用的回调
+            'on_target_detected': lambda matches: None,
+            'use_gpu': args.gpu,
+            'verbose': False,
+        })
+        monitor.play_beep_sound = lambda: True
+
+        for width, height in sizes:
+            baseline, targets = make_scenario(language, width, height, font_size=args.font_size)
+            region = (0, 0, width, height)
+            for scale in scales:
+                # 缩放由预处理器执行，只改 image_scale 不会生效
+                monitor.apply_scale_profile(scale, monitor.preprocessor.sharpen)
+                backend.show(baseline)
+                frame_shape = monitor.capture_region(region).shape[:2]
+                expected_shape = monitor.preprocessor.output_size(width, height)[::-1]
+                if frame_shape != expected_shape:
+                    raise RuntimeError(f"缩放比例 {scale} 未生效: 预处理输出 {frame_shape}, 应为 {expected_shape}")
+                print(f"测试中: 语言={language} 区域={width}x{height} 缩放={scale} "
+                      f"OCR输入={frame_shape[1]}x{frame_shape[0]}")
+
+                stages, recall, false_alarms = measure_stages(
+                    monitor, backend, region, baseline, targets, args.repeats)
+                per_check = [sum(values) for values in zip(*stages.values())]
+                settle_time = args.check_interval + 2 * bench_utils.percentile(per_check, 50)
+
+                latencies, misses = measure_latency(
+                    monitor, backend, region, baseline, targets,
+                    args.trials, settle_time, args.timeout)
+
+                results.append({
+                    'language': language,
+                    'size': f"{width}x{height}",
+                    'image_scale': scale,
+                    'ocr_input': f"{frame_shape[1]}x{frame_shape[0]}",
+                    'stages': {name: summarize(values) for name, values in stages.items()},
+                    'latency': summarize(latencies),
+                    'misses': misses,
+                    'recall': recall,
+                    'false_alarms': false_alarms,
+                })
+
+    print("\n逐阶段耗时 (p50 / p95, 毫秒)")
+    print_table(
+        ["语言", "区域", "缩放", "OCR输入", "截图+预处理", "OCR", "关键词匹配"],
+        [[r['language'], r['size'], r['image_scale'], r['ocr_input']] +
+         [f"{r['stages'][name]['p50_ms']:.1f} / {r['stages'][name]['p95_ms']:.1f}"
+          for name in ('capture', 'ocr', 'match')]
+         for r in results])
+
+    print("\n端到端检测延迟 (毫秒) 与召回率")
+    print_table(
+        ["语言", "区域", "缩放", "p50", "p95", "p99", "超时", "召回率", "误报"],
+        [[r['language'], r['size'], r['image_scale'],
+          f"{r['latency'].get('p50_ms', float('nan')):.0f}",
+          f"{r['latency'].get('p95_ms', float('nan')):.0f}",
+          f"{r['latency'].get('p99_ms', float('nan')):.0f}",
+          r['misses'], f"{r['recall'] * 100:.0f}%", r['false_alarms']]
+         for r in results])
+
+    if args.json:
+        bench_utils.write_json(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# bench_ocr_engines.py
+# OCR引擎对比 - 在固定的一组画面上比较 easyocr 与 ONNX(int8/float32) 引擎的加载时间、识别耗时和准确率
+#
+# 准确率指标：
+#   召回率  - 目标画面中目标课程被识别出来的比例
+#   误报    - 不含目标课程的基准画面中误报出关键词的次数
+#   一致度  - 与第一个引擎（参考引擎）识别出的文字的一致程度
+#
+# 用法示例:
+#   python export_ocr_models.py          # 先导出ONNX模型
+#   python benchmarks/bench_ocr_engines.py
+#   python benchmarks/bench_ocr_engines.py --engines easyocr,onnx,onnx-fp32 --size 600x300,1200x800
+#   python benchmarks/bench_ocr_engines.py --frames-dir recordings/   # 使用录制的画面（只统计一致度）
+import argparse
+import glob
+import os
+import time
+
+import cv2
+
+import bench_utils
+from bench_utils import summarize, print_table
+from synthetic_frames import TARGET_COURSES, make_scenario, to_monitor_gray
+
+from calibration import text_agreement
+from keyword_matcher import KeywordMatcher
+from ocr_engines import create_ocr_engine
+
+# 可比较的引擎：名称 -> (引擎, 参数)
+ENGINE_VARIANTS = {
+    'easyocr': ('easyocr', {}),
+    'onnx': ('onnx', {'quantized': True}),
+    'onnx-fp32': ('onnx', {'quantized': False}),
+}
+
+
+def load_frames(args):
+    """
+    准备固定的画面集（灰度 + 缩放，与 capture_region 输出一致）
+
+    返回: [(目标课程名或None, 灰度图), ...]
+    """
+    frames = []
+    if args.frames_dir:
+        for path in sorted(glob.glob(os.path.join(args.frames_dir, '*.png'))):
+            frames.append((None, cv2.imread(path, cv2.IMREAD_GRAYSCALE)))
+    else:
+        for width, height in bench_utils.parse_sizes(args.size):
+            baseline, targets = make_scenario(args.language, width, height)
+            frames.extend([(None, baseline)] + targets)
+    return [(target, to_monitor_gray(frame, args.scale)) for target, frame in frames]
+
+
+def evaluate(engine, frames, repeats, matcher):
+    """
+    逐帧识别 repeats 轮
+
+    返回: (每帧耗时列表, 每帧文字列表, 召回率, 误报次数)
+    """
+    timings = []
+    texts = []
+    hits = targets = false_alarms = 0
+    for round_index in range(repeats):
+        for target, frame in frames:
+            start = time.perf_counter()
+            results = engine.readtext(frame)
+            timings.append(time.perf_counter() - start)
+            if round_index:
+                continue
+
+            frame_texts = [result[1] for result in results]
+            texts.append(frame_texts)
+            found = matcher.find(frame_texts)
+            if target is not None:
+                targets += 1
+                hits += target in found
+            elif found:
+                false_alarms += 1
+    recall = hits / float(targets) if targets else float('nan')
+    return timings, texts, recall, false_alarms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR引擎准确率/耗时对比")
+    parser.add_argument('--engines', default='easyocr,onnx', help=f"引擎列表，第一个作为参考 "
+                                                                  f"(可选: {', '.join(ENGINE_VARIANTS)})")
+    parser.add_argument('--model-dir', default='onnx_models', help="ONNX模型目录")
+    parser.add_argument('--language', default='zh', help="画面语言: zh / en")
+    parser.add_argument('--size', default='600x300,1200x800', help="合成画面尺寸列表")
+    parser.add_argument('--frames-dir', default=None, help="使用目录中录制的PNG画面代替合成画面")
+    parser.add_argument('--scale', type=float, default=0.7, help="image_scale")
+    parser.add_argument('--repeats', type=int, default=3, help="画面集重复识别的轮数")
+    parser.add_argument('--threads', type=int, default=None, help="ONNX Runtime计算线程数")
+    parser.add_argument('--json', default=None, help="结果输出的JSON文件路径")
+    args = parser.parse_args()
+
+    frames = load_frames(args)
+    keywords = [] if args.frames_dir else TARGET_COURSES[args.language]
+    matcher = KeywordMatcher(keywords)
+    print(f"画面集: {len(frames)} 帧, 缩放 {args.scale}")
+
+    results = []
+    reference = None
+    for variant in args.engines.split(','):
+        name, options = ENGINE_VARIANTS[variant]
+        if name == 'onnx':
+            options = dict(options, model_dir=args.model_dir, threads=args.threads)
+
+        print(f"加载 {variant} ...")
+        start = time.perf_counter()
+        try:
+            engine = create_ocr_engine(name, **options)
+        except Exception as e:
+            print(f"[警告] {variant} 加载失败，跳过: {e}")
+            continue
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.readtext(frames[0][1])
+        first_call = time.perf_counter() - start
+
+        timings, texts, recall, false_alarms = evaluate(engine, frames, args.repeats, matcher)
+        engine.close()
+
+        if reference is None:
+            reference = texts
+        agreement = sum(text_agreement(ref, got) for ref, got in zip(reference, texts)) / len(texts)
+        results.append({'engine': variant, 'load_s': load_time, 'first_call_ms': first_call * 1000,
+                        'latency': summarize(timings), 'recall': recall,
+                        'false_alarms': false_alarms, 'agreement': agreement})
+
+    if not results:
+        return
+    baseline = results[0]['latency']['p50_ms']
+    print(f"\n参考引擎: {results[0]['engine']}, 每个引擎识别 {args.repeats} 轮")
+    print_table(
+        ["引擎", "加载(秒)", "首次(ms)", "p50(ms)", "p95(ms)", "加速比", "召回率", "误报", "一致度"],
+        [[r['engine'], f"{r['load_s']:.1f}", f"{r['first_call_ms']:.0f}",
+          f"{r['latency']['p50_ms']:.0f}", f"{r['latency']['p95_ms']:.0f}",
+          f"{baseline / r['latency']['p50_ms']:.2f}x",
+          '-' if r['recall'] != r['recall'] else f"{r['recall'] * 100:.0f}%",
+          r['false_alarms'], f"{r['agreement'] * 100:.1f}%"]
+         for r in results])
+
+    if args.json:
+        bench_utils.write_json(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
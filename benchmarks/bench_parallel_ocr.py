@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# bench_parallel_ocr.py
+# 并行OCR基准测试 - 对比单进程 readtext 与不同进程数的条带并行识别的吞吐量
+# （与 CourseMonitor 一样通过 create_ocr_engine 创建引擎）
+#
+# 用法示例:
+#   python benchmarks/bench_parallel_ocr.py
+#   python benchmarks/bench_parallel_ocr.py --size 1200x1600 --workers 1,2,4,8 --frames 10
+#   python benchmarks/bench_parallel_ocr.py --engine onnx
+import argparse
+import time
+
+import bench_utils
+from bench_utils import summarize, print_table
+from synthetic_frames import TARGET_COURSES, make_scenario, to_monitor_gray
+
+from keyword_matcher import KeywordMatcher
+from ocr_engines import create_ocr_engine
+from parallel_ocr import ParallelOCR
+
+
+def make_frames(language, width, height, scale):
+    """生成预处理后的测试画面（灰度 + 缩放，与 capture_region 输出一致）"""
+    _, targets = make_scenario(language, width, height)
+    return [(target, to_monitor_gray(frame, scale)) for target, frame in targets]
+
+
+def run(readtext, frames, count, matcher):
+    """连续识别 count 帧，返回 (每帧耗时列表, 吞吐量, 召回率)"""
+    timings = []
+    hits = 0
+    start = time.perf_counter()
+    for index in range(count):
+        target, frame = frames[index % len(frames)]
+        frame_start = time.perf_counter()
+        results = readtext(frame)
+        timings.append(time.perf_counter() - frame_start)
+        if target in matcher.find([result[1] for result in results]):
+            hits += 1
+    elapsed = time.perf_counter() - start
+    return timings, count / elapsed, hits / float(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并行OCR吞吐量基准测试")
+    parser.add_argument('--engine', default='easyocr', help="OCR引擎: easyocr / onnx")
+    parser.add_argument('--model-dir', default='onnx_models', help="ONNX模型目录")
+    parser.add_argument('--language', default='zh', help="画面语言: zh / en")
+    parser.add_argument('--size', default='1200x1600', help="监控区域尺寸")
+    parser.add_argument('--scale', type=float, default=0.8, help="image_scale")
+    parser.add_argument('--workers', default='1,2,4', help="测试的工作进程数列表")
+    parser.add_argument('--overlap', type=int, default=32, help="条带重叠像素")
+    parser.add_argument('--frames', type=int, default=8, help="每种配置识别的帧数")
+    parser.add_argument('--json', default=None, help="结果输出的JSON文件路径")
+    args = parser.parse_args()
+
+    width, height = bench_utils.parse_sizes(args.size)[0]
+    frames = make_frames(args.language, width, height, args.scale)
+    matcher = KeywordMatcher(TARGET_COURSES[args.language])
+
+    options = {'model_dir': args.model_dir} if args.engine == 'onnx' else {}
+    print(f"加载单进程 {args.engine} ...")
+    engine = create_ocr_engine(args.engine, **options)
+    try:
+        engine.readtext(frames[0][1])
+        timings, throughput, recall = run(engine.readtext, frames, args.frames, matcher)
+    finally:
+        engine.close()
+
+    results = []
+    results.append({'mode': 'single', 'workers': 1, 'latency': summarize(timings),
+                    'throughput': throughput, 'recall': recall})
+
+    for workers in [int(item) for item in args.workers.split(',')]:
+        print(f"启动 {workers} 个工作进程...")
+        engine = ParallelOCR(workers=workers, overlap=args.overlap, engine=args.engine,
+                             engine_options=options)
+        try:
+            engine.wait_ready()
+            engine.readtext(frames[0][1])
+            timings, throughput, recall = run(engine.readtext, frames, args.frames, matcher)
+        finally:
+            engine.close()
+        results.append({'mode': 'parallel', 'workers': workers, 'latency': summarize(timings),
+                        'throughput': throughput, 'recall': recall})
+
+    baseline = results[0]['throughput']
+    print(f"\n引擎 {args.engine}, 区域 {width}x{height}, 缩放 {args.scale}, 每种配置 {args.frames} 帧")
+    print_table(
+        ["模式", "进程数", "p50(ms)", "p95(ms)", "吞吐量(帧/秒)", "加速比", "召回率"],
+        [[r['mode'], r['workers'], f"{r['latency']['p50_ms']:.0f}", f"{r['latency']['p95_ms']:.0f}",
+          f"{r['throughput']:.2f}", f"{r['throughput'] / baseline:.2f}x", f"{r['recall'] * 100:.0f}%"]
+         for r in results])
+
+    if args.json:
+        bench_utils.write_json(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# bench_preprocess.py
+# 截图预处理基准测试 - 对比原来每步新建数组的预处理与 Preprocessor 的各阶段耗时和每帧内存分配
+#
+# 用法示例:
+#   python benchmarks/bench_preprocess.py
+#   python benchmarks/bench_preprocess.py --size 900x500,1920x1080 --scale 1.0,0.8,0.5 --frames 300
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+import bench_utils
+from bench_utils import summarize, print_table
+from synthetic_frames import make_scenario
+
+from metrics import MetricsRegistry
+from preprocess import Preprocessor
+
+
+def baseline_preprocess(frame, scale):
+    """原来的预处理：拷贝 → RGB转BGR → 缩放 → 转灰度 → 每次重新构造锐化核"""
+    image = np.array(frame)
+    image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    if scale < 1.0:
+        height, width = image.shape[:2]
+        image = cv2.resize(image, (int(width * scale), int(height * scale)),
+                           interpolation=cv2.INTER_AREA)
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if scale < 0.9:
+        kernel = np.array([[0, -0.25, 0],
+                           [-0.25, 2.0, -0.25],
+                           [0, -0.25, 0]])
+        image = cv2.filter2D(image, -1, kernel)
+    return image
+
+
+def measure_time(process, frames, count):
+    """连续处理 count 帧，返回每帧耗时列表"""
+    timings = []
+    for index in range(count):
+        frame = frames[index % len(frames)]
+        start = time.perf_counter()
+        process(frame)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def measure_allocations(process, frames, count):
+    """
+    用 tracemalloc 统计每帧处理期间新分配内存的峰值(字节)
+
+    先处理几帧让缓冲区分配完毕，只统计稳定状态
+    """
+    for frame in frames[:3]:
+        process(frame)
+    tracemalloc.start()
+    try:
+        peaks = []
+        for index in range(count):
+            frame = frames[index % len(frames)]
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            process(frame)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="截图预处理基准测试")
+    parser.add_argument('--language', default='zh', help="画面语言: zh / en")
+    parser.add_argument('--size', default='600x300,1200x800,1920x1080', help="监控区域尺寸列表")
+    parser.add_argument('--scale', default='1.0,0.8,0.5', help="image_scale 列表")
+    parser.add_argument('--frames', type=int, default=200, help="每种配置处理的帧数")
+    parser.add_argument('--json', default=None, help="结果输出的JSON文件路径")
+    args = parser.parse_args()
+
+    results = []
+    for width, height in bench_utils.parse_sizes(args.size):
+        _, targets = make_scenario(args.language, width, height)
+        frames = [frame for _, frame in targets]
+
+        for scale in bench_utils.parse_floats(args.scale):
+            variants = [('baseline', lambda frame, s=scale: baseline_preprocess(frame, s), None)]
+            for binarize in (None, 'otsu', 'adaptive'):
+                metrics = MetricsRegistry()
+                timed_pre = Preprocessor(scale=scale, binarize=binarize, metrics=metrics)
+                plain_pre = Preprocessor(scale=scale, binarize=binarize)
+                variants.append((f"preprocessor/{binarize or 'gray'}",
+                                 lambda frame, p=plain_pre: p.process(frame, 'RGB'),
+                                 (timed_pre, metrics)))
+
+            for name, process, staged in variants:
+                timings = measure_time(process, frames, args.frames)
+                allocated = measure_allocations(process, frames, min(args.frames, 50))
+
+                stages = {}
+                if staged is not None:
+                    # 单独跑一遍带阶段计时的版本，避免计时开销计入总耗时
+                    timed_pre, metrics = staged
+                    measure_time(lambda frame: timed_pre.process(frame, 'RGB'), frames, args.frames)
+                    stages = {stage: summary['p50_ms']
+                              for stage, summary in metrics.snapshot()['stages'].items()}
+
+                results.append({'size': f"{width}x{height}", 'scale': scale, 'variant': name,
+                                'latency': summarize(timings), 'alloc_bytes_per_frame': allocated,
+                                'stages_p50_ms': stages})
+
+    print(f"\n每种配置 {args.frames} 帧，输入为 RGB 截图")
+    print_table(
+        ["区域", "缩放", "方式", "p50(ms)", "p95(ms)", "每帧分配(KB)", "各阶段p50(ms)"],
+        [[r['size'], r['scale'], r['variant'], f"{r['latency']['p50_ms']:.3f}",
+          f"{r['latency']['p95_ms']:.3f}", f"{r['alloc_bytes_per_frame'] / 1024:.1f}",
+          ' '.join(f"{stage.replace('capture_', '')}={value:.3f}"
+                   for stage, value in r['stages_p50_ms'].items())]
+         for r in results])
+
+    if args.json:
+        bench_utils.write_json(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
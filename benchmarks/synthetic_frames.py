@@ -0,0 +1,164 @@
+# synthetic_frames.py
+# 合成课程列表画面 - 用PIL绘制仿川大选课系统的课程表格，供基准测试使用
+import functools
+import os
+import random
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# 常见系统中的中文字体，可用环境变量 BENCH_FONT 指定其他字体
+FONT_CANDIDATES = [
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/simhei.ttf",
+    "C:/Windows/Fonts/simsun.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc",
+]
+
+COLUMNS = {
+    'zh': ["课程号", "课序号", "课程名", "教师", "上课时间", "课余量", "操作"],
+    'en': ["Code", "No.", "Course", "Teacher", "Time", "Seats", "Action"],
+}
+
+# 列宽占比
+COLUMN_WEIGHTS = [0.12, 0.07, 0.30, 0.12, 0.20, 0.09, 0.10]
+
+FILLER_COURSES = {
+    'zh': ["高等数学", "大学英语", "线性代数", "概率论与数理统计", "数据结构", "操作系统",
+           "计算机网络", "编译原理", "软件工程", "数字图像处理", "大学物理", "体育"],
+    'en': ["Calculus", "College English", "Linear Algebra", "Probability", "Data Structures",
+           "Operating Systems", "Computer Networks", "Compilers", "Software Engineering",
+           "Image Processing", "College Physics", "Physical Education"],
+}
+
+TARGET_COURSES = {
+    'zh': ["多媒体技术", "机器学习", "模式识别", "代数式代码和AI框架"],
+    'en': ["Machine Learning", "Multimedia Technology", "Pattern Recognition", "Python Programming"],
+}
+
+TEACHERS = {
+    'zh': ["张伟", "王芳", "李娜", "刘洋", "陈静", "杨磊"],
+    'en': ["Zhang", "Wang", "Li", "Liu", "Chen", "Yang"],
+}
+
+TIMES = {
+    'zh': ["周一 1-2节", "周二 3-4节", "周三 5-6节", "周四 7-8节", "周五 1-2节"],
+    'en': ["Mon 1-2", "Tue 3-4", "Wed 5-6", "Thu 7-8", "Fri 1-2"],
+}
+
+ACTION = {'zh': "选课", 'en': "Select"}
+
+
+@functools.lru_cache(maxsize=None)
+def find_font(size):
+    """查找支持中文的字体，找不到时退回PIL默认字体（中文会显示为方块）"""
+    candidates = [os.environ.get('BENCH_FONT')] + FONT_CANDIDATES
+    for path in candidates:
+        if path and os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    print("[警告] 未找到中文字体，中文画面将无法正确渲染，可设置环境变量 BENCH_FONT")
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow 10.1 之前的默认字体不支持设置字号
+        return ImageFont.load_default()
+
+
+def make_rows(language, row_count, target=None, target_row=None, seed=None):
+    """生成表格行数据，target 指定要出现的目标课程名"""
+    rng = random.Random(seed)
+    rows = []
+    for index in range(row_count):
+        course = rng.choice(FILLER_COURSES[language])
+        if target is not None and index == target_row:
+            course = target
+        rows.append([
+            f"{rng.randint(100000, 999999)}",
+            f"{rng.randint(1, 9):02d}",
+            course,
+            rng.choice(TEACHERS[language]),
+            rng.choice(TIMES[language]),
+            f"{rng.randint(0, 120)}",
+            ACTION[language],
+        ])
+    return rows
+
+
+def render_course_table(rows, width, height, language='zh', font_size=16):
+    """
+    绘制课程表格
+
+    返回: (高, 宽, 3) 的RGB数组
+    """
+    font = find_font(font_size)
+    image = Image.new('RGB', (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+
+    row_height = int(font_size * 2.2)
+    column_x = [0]
+    for weight in COLUMN_WEIGHTS:
+        column_x.append(column_x[-1] + int(width * weight))
+    column_x[-1] = width - 1
+
+    table = [COLUMNS[language]] + rows
+    for row_index, row in enumerate(table):
+        top = row_index * row_height
+        if top + row_height > height:
+            break
+        if row_index == 0:
+            draw.rectangle([0, top, width, top + row_height], fill=(232, 240, 250))
+        elif row_index % 2 == 0:
+            draw.rectangle([0, top, width, top + row_height], fill=(248, 248, 248))
+
+        for col_index, text in enumerate(row):
+            x = column_x[col_index] + 6
+            y = top + (row_height - font_size) // 2
+            color = (255, 255, 255) if (row_index and col_index == len(row) - 1) else (40, 40, 40)
+            if row_index and col_index == len(row) - 1:
+                draw.rectangle([column_x[col_index] + 4, top + 4,
+                                column_x[col_index + 1] - 4, top + row_height - 4],
+                               fill=(64, 128, 220))
+            draw.text((x, y), text, font=font, fill=color)
+
+        draw.line([0, top + row_height, width, top + row_height], fill=(210, 210, 210))
+
+    for x in column_x:
+        draw.line([x, 0, x, height], fill=(210, 210, 210))
+
+    return np.asarray(image)
+
+
+def make_scenario(language, width, height, font_size=16, seed=0):
+    """
+    生成一组测试画面：不含目标课程的基准画面，以及每门目标课程各一张目标画面
+
+    返回: (基准画面, [(目标课程名, 目标画面), ...])
+    """
+    row_count = max(1, height // int(font_size * 2.2) - 1)
+    baseline = render_course_table(make_rows(language, row_count, seed=seed),
+                                   width, height, language, font_size)
+    targets = []
+    for index, target in enumerate(TARGET_COURSES[language]):
+        rows = make_rows(language, row_count, target=target,
+                         target_row=(seed + index) % row_count, seed=seed)
+        targets.append((target, render_course_table(rows, width, height, language, font_size)))
+    return baseline, targets
+
+
+def to_monitor_gray(frame, scale):
+    """
+    把画面转为灰度并按 scale 缩小，与 capture_region 交给OCR的图像一致（不做锐化）
+
+    参数:
+    frame: RGB画面或已是灰度的图像
+    scale: 缩放比例，不小于1时不缩放
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY) if frame.ndim == 3 else frame
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray
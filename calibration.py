@@ -0,0 +1,142 @@
+# calibration.py
+# 缩放/锐化自动校准 - 在选定区域上试验不同的缩放比例和锐化设置，选出仍能识别全部文字的最快组合
+import difflib
+import json
+import os
+import time
+
+import numpy as np
+
+from preprocess import Preprocessor
+
+# 依次尝试的缩放比例（从大到小）
+CALIBRATION_SCALES = (1.0, 0.9, 0.8, 0.7, 0.6, 0.5)
+
+
+def text_agreement(reference, texts):
+    """两组识别结果的文字一致程度(0~1)，忽略空白"""
+    expected = ''.join(''.join(reference).split())
+    actual = ''.join(''.join(texts).split())
+    if not expected:
+        return 1.0 if not actual else 0.0
+    return difflib.SequenceMatcher(None, expected, actual, autojunk=False).ratio()
+
+
+def region_key(region):
+    """按区域尺寸生成保存校准结果用的键"""
+    left, top, right, bottom = region
+    return f"{right - left}x{bottom - top}"
+
+
+class CalibrationStore:
+    """
+    校准结果存储
+    功能：把每种区域尺寸的校准结果保存在JSON文件中，下次选择同样大小的区域时直接使用
+    """
+
+    def __init__(self, path='calibration.json'):
+        self.path = path
+        self.profiles = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.profiles = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[警告] 读取校准文件失败: {e}")
+
+    def get(self, region):
+        """读取区域对应的校准结果，没有时返回None"""
+        return self.profiles.get(region_key(region))
+
+    def put(self, region, profile):
+        """保存区域的校准结果"""
+        self.profiles[region_key(region)] = profile
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.profiles, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"[警告] 保存校准文件失败: {e}")
+
+
+class Calibrator:
+    """
+    缩放/锐化校准器
+    功能：先用原始分辨率识别一次作为参考，再按缩放比例从大到小、锐化开/关逐一识别，
+    记录耗时和与参考结果的一致程度；参考结果中出现的关键词都要能识别出来，
+    并且一致程度不低于 min_agreement，满足条件的组合中选耗时最短的
+    """
+
+    def __init__(self, recognize, find_keywords, scales=CALIBRATION_SCALES,
+                 min_agreement=0.9, repeats=2):
+        """
+        参数:
+        recognize: 识别函数，输入灰度图像返回文字列表
+        find_keywords: 函数，输入文字列表返回其中包含的关键词
+        scales: 尝试的缩放比例
+        min_agreement: 与参考结果的最低一致程度(0~1)
+        repeats: 每种组合识别的次数，耗时取中位数
+        """
+        self.recognize = recognize
+        self.find_keywords = find_keywords
+        self.scales = sorted(scales, reverse=True)
+        self.min_agreement = min_agreement
+        self.repeats = max(1, int(repeats))
+
+    def measure(self, frame, color_format, scale, sharpen):
+        """按一种设置预处理并识别，返回 (文字列表, 耗时中位数秒)"""
+        image = Preprocessor(scale=scale, sharpen=sharpen, ring_size=1).process(frame, color_format)
+        timings = []
+        texts = []
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            texts = self.recognize(image)
+            timings.append(time.perf_counter() - start)
+        return texts, float(np.median(timings))
+
+    def calibrate(self, frame, color_format, should_continue=None):
+        """
+        在一帧截图上校准
+
+        参数:
+        frame: 截屏后端返回的原始图像
+        color_format: 图像的颜色格式
+        should_continue: 返回False时提前结束（使用目前最好的结果）
+
+        返回: {'image_scale', 'sharpen', 'latency_ms', 'agreement', 'reference_latency_ms',
+               'keywords', 'candidates'}
+        """
+        frame = np.array(frame)  # 后端返回的可能是会被覆盖的缓冲区
+        reference, reference_time = self.measure(frame, color_format, 1.0, False)
+        required = set(self.find_keywords(reference))
+
+        best = {'image_scale': 1.0, 'sharpen': False, 'latency_ms': reference_time * 1000,
+                'agreement': 1.0}
+        candidates = [dict(best)]
+
+        for scale in self.scales:
+            passed = False
+            for sharpen in (False, True):
+                if scale >= 1.0 and not sharpen:
+                    continue  # 即参考设置
+                if should_continue is not None and not should_continue():
+                    break
+                texts, elapsed = self.measure(frame, color_format, scale, sharpen)
+                agreement = text_agreement(reference, texts)
+                ok = required <= set(self.find_keywords(texts)) and agreement >= self.min_agreement
+                candidate = {'image_scale': scale, 'sharpen': sharpen, 'latency_ms': elapsed * 1000,
+                             'agreement': agreement, 'ok': ok}
+                candidates.append(candidate)
+                if ok:
+                    passed = True
+                    if candidate['latency_ms'] < best['latency_ms']:
+                        best = {key: candidate[key] for key in best}
+            # 某个比例下无论是否锐化都识别不全，更小的比例一般也不行
+            if not passed and scale < 1.0:
+                break
+
+        best.update({
+            'reference_latency_ms': reference_time * 1000,
+            'keywords': sorted(required),
+            'candidates': candidates,
+        })
+        return best
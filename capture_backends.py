@@ -0,0 +1,359 @@
+# capture_backends.py
+# 截屏后端 - 统一的截图接口，后端直接返回NumPy视图，交给预处理阶段使用
+import ctypes
+import ctypes.util
+import glob
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class CaptureBackend:
+    """
+    截屏后端基类
+
+    grab() 返回的数组可能是后端内部缓冲区的视图，只保证在下一次 grab() 之前有效，
+    调用方如需长期保存应自行 copy()。color_format 说明通道顺序，供预处理阶段选择转换方式。
+    """
+
+    name = 'base'
+    color_format = 'RGB'  # 'RGB' / 'BGR' / 'BGRA' / 'GRAY'
+
+    def grab(self, region):
+        """截取区域 (left, top, right, bottom)，返回 (高, 宽[, 通道]) 的数组"""
+        raise NotImplementedError
+
+    def close(self):
+        """释放后端资源"""
+
+
+class ImageGrabBackend(CaptureBackend):
+    """PIL.ImageGrab 后端（原有实现，Windows/macOS 通用）"""
+
+    name = 'imagegrab'
+    color_format = 'RGB'
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self.image_grab = ImageGrab
+
+    def grab(self, region):
+        # np.asarray 直接读取PIL的数组接口，不再额外做颜色转换拷贝
+        return np.asarray(self.image_grab.grab(bbox=region))
+
+
+class MssBackend(CaptureBackend):
+    """
+    mss 后端
+    mss 返回的原始BGRA缓冲区直接包装成NumPy视图，不做任何拷贝
+    """
+
+    name = 'mss'
+    color_format = 'BGRA'
+
+    def __init__(self):
+        import mss
+        self.mss = mss
+        # mss 实例不能跨线程使用，每个线程各自持有一个
+        self.local = threading.local()
+
+    def grab(self, region):
+        sct = getattr(self.local, 'sct', None)
+        if sct is None:
+            sct = self.mss.mss()
+            self.local.sct = sct
+
+        left, top, right, bottom = region
+        shot = sct.grab({'left': left, 'top': top,
+                         'width': right - left, 'height': bottom - top})
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def close(self):
+        sct = getattr(self.local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self.local.sct = None
+
+
+class _XImage(ctypes.Structure):
+    """XImage 结构体（只声明需要读取的前半部分字段）"""
+    _fields_ = [
+        ('width', ctypes.c_int),
+        ('height', ctypes.c_int),
+        ('xoffset', ctypes.c_int),
+        ('format', ctypes.c_int),
+        ('data', ctypes.c_void_p),
+        ('byte_order', ctypes.c_int),
+        ('bitmap_unit', ctypes.c_int),
+        ('bitmap_bit_order', ctypes.c_int),
+        ('bitmap_pad', ctypes.c_int),
+        ('depth', ctypes.c_int),
+        ('bytes_per_line', ctypes.c_int),
+        ('bits_per_pixel', ctypes.c_int),
+        ('red_mask', ctypes.c_ulong),
+        ('green_mask', ctypes.c_ulong),
+        ('blue_mask', ctypes.c_ulong),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ('shmseg', ctypes.c_ulong),
+        ('shmid', ctypes.c_int),
+        ('shmaddr', ctypes.c_void_p),
+        ('readOnly', ctypes.c_int),
+    ]
+
+
+class XShmBackend(CaptureBackend):
+    """
+    Linux X11 共享内存(MIT-SHM)后端
+    X服务器直接把像素写入共享内存段，返回的数组就是该内存段的视图
+    """
+
+    name = 'xshm'
+    color_format = 'BGRA'
+
+    ZPIXMAP = 2
+    IPC_PRIVATE = 0
+    IPC_CREAT = 0o1000
+    IPC_RMID = 0
+    ALL_PLANES = 0xFFFFFFFFFFFFFFFF if ctypes.sizeof(ctypes.c_ulong) == 8 else 0xFFFFFFFF
+
+    def __init__(self, display=None):
+        if not sys.platform.startswith('linux'):
+            raise RuntimeError("xshm 截屏后端仅支持 Linux/X11")
+
+        self.display_name = display or os.environ.get('DISPLAY')
+        self.display = None
+        self.image = None
+        self.shminfo = None
+        self.size = None
+        self.buffer = None
+        self.load_libraries()
+
+    def load_libraries(self):
+        """加载 libX11 / libXext / libc 并声明函数签名"""
+        libx11 = ctypes.util.find_library('X11')
+        libxext = ctypes.util.find_library('Xext')
+        if not libx11 or not libxext:
+            raise RuntimeError("未找到 libX11 或 libXext")
+
+        x11 = ctypes.cdll.LoadLibrary(libx11)
+        xext = ctypes.cdll.LoadLibrary(libxext)
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDefaultScreen.restype = ctypes.c_int
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultDepth.restype = ctypes.c_int
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmQueryExtension.restype = ctypes.c_int
+        xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+            ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint,
+        ]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+            ctypes.c_int, ctypes.c_int, ctypes.c_ulong,
+        ]
+        xext.XShmGetImage.restype = ctypes.c_int
+
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmget.restype = ctypes.c_int
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+        self.x11, self.xext, self.libc = x11, xext, libc
+
+    def open_display(self):
+        """连接X服务器（在第一次截图的线程中进行）"""
+        name = self.display_name.encode() if self.display_name else None
+        self.display = self.x11.XOpenDisplay(name)
+        if not self.display:
+            raise RuntimeError(f"无法连接X显示: {self.display_name}")
+        if not self.xext.XShmQueryExtension(self.display):
+            raise RuntimeError("X服务器不支持 MIT-SHM 扩展")
+
+        screen = self.x11.XDefaultScreen(self.display)
+        self.root = self.x11.XDefaultRootWindow(self.display)
+        self.visual = self.x11.XDefaultVisual(self.display, screen)
+        self.depth = self.x11.XDefaultDepth(self.display, screen)
+
+    def create_image(self, width, height):
+        """按区域尺寸创建共享内存图像，尺寸不变时重复使用"""
+        self.release_image()
+
+        shminfo = _XShmSegmentInfo()
+        image = self.xext.XShmCreateImage(self.display, self.visual, self.depth, self.ZPIXMAP,
+                                          None, ctypes.byref(shminfo), width, height)
+        if not image:
+            raise RuntimeError("XShmCreateImage 失败")
+
+        size = image.contents.bytes_per_line * image.contents.height
+        shmid = self.libc.shmget(self.IPC_PRIVATE, size, self.IPC_CREAT | 0o600)
+        if shmid < 0:
+            self.x11.XDestroyImage(image)
+            raise OSError(ctypes.get_errno(), "shmget 失败")
+
+        address = self.libc.shmat(shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            self.libc.shmctl(shmid, self.IPC_RMID, None)
+            self.x11.XDestroyImage(image)
+            raise OSError(ctypes.get_errno(), "shmat 失败")
+
+        shminfo.shmid = shmid
+        shminfo.shmaddr = address
+        shminfo.readOnly = 0
+        image.contents.data = address
+        self.xext.XShmAttach(self.display, ctypes.byref(shminfo))
+        self.x11.XSync(self.display, 0)
+        # 双方都已挂载后标记删除，进程退出时内存段会被自动回收
+        self.libc.shmctl(shmid, self.IPC_RMID, None)
+
+        bytes_per_line = image.contents.bytes_per_line
+        raw = np.ctypeslib.as_array(ctypes.cast(address, ctypes.POINTER(ctypes.c_uint8)),
+                                    shape=(height, bytes_per_line))
+        self.buffer = raw[:, :width * 4].reshape(height, width, 4)
+        self.image = image
+        self.shminfo = shminfo
+        self.size = (width, height)
+
+    def grab(self, region):
+        if self.display is None:
+            self.open_display()
+
+        left, top, right, bottom = region
+        size = (right - left, bottom - top)
+        if size != self.size:
+            self.create_image(*size)
+
+        if not self.xext.XShmGetImage(self.display, self.root, self.image,
+                                      left, top, self.ALL_PLANES):
+            raise RuntimeError("XShmGetImage 失败")
+        return self.buffer
+
+    def release_image(self):
+        """释放共享内存图像"""
+        if self.image is None:
+            return
+        self.buffer = None
+        self.xext.XShmDetach(self.display, ctypes.byref(self.shminfo))
+        self.x11.XDestroyImage(self.image)
+        self.libc.shmdt(self.shminfo.shmaddr)
+        self.image = None
+        self.shminfo = None
+        self.size = None
+
+    def close(self):
+        if self.display is None:
+            return
+        self.release_image()
+        self.x11.XCloseDisplay(self.display)
+        self.display = None
+
+
+class ReplayBackend(CaptureBackend):
+    """
+    回放后端
+    从图片文件、图片目录或内存中的帧列表依次读取画面，用于无屏幕环境下运行和测试
+    """
+
+    name = 'replay'
+    color_format = 'BGR'
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+    def __init__(self, source, loop=True, frame_interval=None, color_format='BGR'):
+        """
+        参数:
+        source: 图片路径、图片目录，或NumPy帧列表
+        loop: 播放到最后一帧后是否从头开始
+        frame_interval: 按真实时间回放时每帧持续的秒数，None表示每次截图前进一帧
+        color_format: 内存帧的通道顺序（从文件读取的帧总是BGR）
+        """
+        if isinstance(source, (list, tuple)):
+            self.paths = None
+            self.frames = list(source)
+            self.color_format = color_format
+        else:
+            if os.path.isdir(source):
+                self.paths = sorted(
+                    path for path in glob.glob(os.path.join(source, '*'))
+                    if path.lower().endswith(self.IMAGE_EXTENSIONS)
+                )
+            else:
+                self.paths = [source]
+            self.frames = [None] * len(self.paths)
+
+        if not self.frames:
+            raise ValueError(f"回放源中没有可用的画面: {source}")
+
+        self.loop = loop
+        self.frame_interval = frame_interval
+        self.index = 0
+        self.start_time = None
+
+    def current_index(self):
+        """计算本次应返回的帧序号"""
+        count = len(self.frames)
+        if self.frame_interval:
+            if self.start_time is None:
+                self.start_time = time.monotonic()
+            index = int((time.monotonic() - self.start_time) / self.frame_interval)
+        else:
+            index = self.index
+            self.index += 1
+        return index % count if self.loop else min(index, count - 1)
+
+    def load(self, index):
+        """读取（并缓存）第 index 帧"""
+        frame = self.frames[index]
+        if frame is None:
+            frame = cv2.imread(self.paths[index], cv2.IMREAD_COLOR)
+            if frame is None:
+                raise RuntimeError(f"无法读取回放画面: {self.paths[index]}")
+            self.frames[index] = frame
+        return frame
+
+    def grab(self, region):
+        frame = self.load(self.current_index())
+        left, top, right, bottom = region
+        # 录制的是整屏画面时按区域裁剪，否则认为录制的就是监控区域本身
+        if frame.shape[0] >= bottom and frame.shape[1] >= right:
+            return frame[top:bottom, left:right]
+        return frame
+
+
+CAPTURE_BACKENDS = {
+    'imagegrab': ImageGrabBackend,
+    'mss': MssBackend,
+    'xshm': XShmBackend,
+    'replay': ReplayBackend,
+}
+
+
+def create_capture_backend(name, **options):
+    """按名称创建截屏后端"""
+    backend_class = CAPTURE_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"未知的截屏后端: {name} (可选: {', '.join(CAPTURE_BACKENDS)})")
+    return backend_class(**options)
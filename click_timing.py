@@ -0,0 +1,163 @@
+# click_timing.py
+# 高精度点击计时 - 按绝对截止时间安排点击（不累积漂移），支持定点突发点击并统计点击抖动
+import datetime
+import time
+
+# 距离截止时间小于该值时改为忙等，sleep/Event.wait 的唤醒误差通常在1~2毫秒
+DEFAULT_SPIN_THRESHOLD = 0.002
+
+
+def sleep_until(deadline, spin_threshold=DEFAULT_SPIN_THRESHOLD, stop_event=None):
+    """
+    精确等待到指定的 time.perf_counter() 时刻
+
+    先粗略等待（等待停止事件，停止请求会立即打断等待），
+    剩下最后 spin_threshold 秒时忙等，误差可以做到亚毫秒级
+
+    参数:
+    deadline: 目标时刻（time.perf_counter 时间）
+    spin_threshold: 忙等时长(秒)
+    stop_event: threading.Event，被设置时立即停止等待
+
+    返回: 是否等到了截止时间（被停止时返回False）
+    """
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= spin_threshold:
+            break
+        if stop_event is None:
+            time.sleep(remaining - spin_threshold)
+        elif stop_event.wait(remaining - spin_threshold):
+            return False
+
+    while time.perf_counter() < deadline:
+        pass
+    return stop_event is None or not stop_event.is_set()
+
+
+def parse_wall_time(text, now=None):
+    """
+    把 'HH:MM:SS' 或 'HH:MM:SS.fff' 解析为今天对应的时间戳（time.time 时间）
+
+    已经过去的时刻返回 None
+    """
+    now = time.time() if now is None else now
+    fmt = '%H:%M:%S.%f' if '.' in text else '%H:%M:%S'
+    clock = datetime.datetime.strptime(text.strip(), fmt).time()
+    today = datetime.datetime.fromtimestamp(now).date()
+    timestamp = datetime.datetime.combine(today, clock).timestamp()
+    return timestamp if timestamp >= now else None
+
+
+class ClickScheduler:
+    """
+    点击调度器
+    功能：第 n 次点击的截止时间固定为 起点 + n × 间隔，点击本身和输出的耗时不会累积成漂移；
+    到达设定的墙上时间（如选课开放时刻）时切换为短间隔突发点击，持续一段时间后恢复
+    """
+
+    def __init__(self, interval, burst_times=None, burst_interval=0.2, burst_duration=5.0):
+        """
+        参数:
+        interval: 常规点击间隔(秒)
+        burst_times: 突发点击开始的时刻列表，格式 'HH:MM:SS'，None 表示不使用
+        burst_interval: 突发阶段的点击间隔(秒)
+        burst_duration: 每次突发持续的时长(秒)
+        """
+        self.interval = interval
+        self.burst_interval = burst_interval
+        self.burst_duration = burst_duration
+
+        # 墙上时间换算为 perf_counter 时间，之后只用单调时钟
+        wall_now, mono_now = time.time(), time.perf_counter()
+        self.bursts = []
+        for text in burst_times or []:
+            timestamp = parse_wall_time(text, wall_now)
+            if timestamp is not None:
+                self.bursts.append(mono_now + (timestamp - wall_now))
+        self.bursts.sort()
+
+        self.next_deadline = mono_now
+        self.skipped = 0  # 因点击耗时超过间隔而跳过的次数
+
+    def in_burst(self, moment):
+        """指定时刻是否处于突发阶段"""
+        return any(start <= moment < start + self.burst_duration for start in self.bursts)
+
+    def next_burst(self, after):
+        """after 之后最近的一次突发开始时刻"""
+        for start in self.bursts:
+            if start > after:
+                return start
+        return None
+
+    def advance(self, now=None):
+        """
+        安排下一次点击并返回它的截止时间
+
+        参数:
+        now: 当前 perf_counter 时间，用于判断是否已经错过若干次点击
+        """
+        now = time.perf_counter() if now is None else now
+        current = self.next_deadline
+        step = self.burst_interval if self.in_burst(current) else self.interval
+        deadline = current + step
+
+        # 点击本身比间隔还慢时，跳过已经错过的时刻，不连续补点
+        if deadline < now:
+            missed = int((now - deadline) // step) + 1
+            self.skipped += missed
+            deadline += missed * step
+
+        # 突发时刻精确对齐，不等到常规间隔结束
+        burst = self.next_burst(current)
+        if burst is not None and burst < deadline:
+            deadline = burst
+
+        self.next_deadline = deadline
+        return deadline
+
+
+class JitterHistogram:
+    """
+    点击抖动统计
+    功能：记录每次点击实际时刻相对截止时间的偏差，停止时以直方图显示
+    """
+
+    BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.samples = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def record(self, lateness):
+        """记录一次点击的偏差(秒，正数表示晚于截止时间)"""
+        late_ms = abs(lateness) * 1000
+        index = 0
+        while index < len(self.BUCKETS_MS) and late_ms >= self.BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.samples += 1
+        self.total += late_ms
+        self.worst = max(self.worst, late_ms)
+
+    def format(self, width=40):
+        """生成直方图文本"""
+        if not self.samples:
+            return "点击抖动: 暂无数据"
+
+        lines = [f"点击抖动: {self.samples}次, 平均{self.total / self.samples:.3f}毫秒, "
+                 f"最大{self.worst:.3f}毫秒"]
+        peak = max(self.counts)
+        lower = 0
+        for index, count in enumerate(self.counts):
+            if index < len(self.BUCKETS_MS):
+                label = f"{lower:>5g}-{self.BUCKETS_MS[index]:<5g}ms"
+                lower = self.BUCKETS_MS[index]
+            else:
+                label = f"  >= {lower:<5g}ms"
+            bar = '#' * (round(count / peak * width) if count else 0)
+            lines.append(f"  {label} {count:>6} {bar}")
+        return "\n".join(lines)
@@ -1,5 +1,6 @@
 # config.py
 # 配置文件 - 统一管理课程检测和鼠标连点的配置参数
+from frame_change import DEFAULT_CHANGE_THRESHOLD
 
 # ==================== 课程检测配置 ====================
 COURSE_MONITOR_CONFIG = {
@@ -11,14 +12,127 @@ COURSE_MONITOR_CONFIG = {
         "代数式代码和AI框架"
     ],
 
+    # 关键词匹配
+    'fuzzy_match': False,  # 是否启用模糊匹配: 容忍OCR把形近字认错(如 机器学习 -> 机器学刁)
+    'max_edits': 1,  # 模糊匹配允许的最大差异字数(4个字以下的关键词按原文精确匹配，英文短词须是完整单词)
+    'constrained_ocr': False,  # 受限识别: 只在关键词用到的字、数字和分隔符中识别，减少误报
+    'allowlist_extra': None,  # 受限识别时额外允许的字符: None=数字和常见分隔符
+    'constrained_min_confidence': 0.3,  # 受限识别时丢弃置信度低于0.3的行（多为被强行认成关键词字符的其他文字）
+
     # 性能优化设置
     'image_scale': 0.8,  # 图像缩放比例: 0.5 = 50%
+    'sharpen': 'auto',  # 缩小后是否锐化: 'auto'=缩放比例小于0.9时锐化, True/False=强制开/关
+    'binarize': None,  # 二值化: None=不处理, 'otsu'=全局阈值, 'adaptive'=自适应阈值(背景不均匀时使用)
+    'adaptive_block_size': 31,  # 自适应阈值的邻域大小(像素, 奇数)
+    'adaptive_c': 10,  # 自适应阈值从邻域均值中减去的常数
+    'preprocess_ring_size': 4,  # 预处理输出缓冲区个数(循环复用，避免每帧分配内存)
     'check_interval': 1.0,  # 检查间隔: 1.0秒
     'alert_cooldown': 2,  # 提醒冷却时间: 2秒
 
+    # 缩放自动校准 (选定区域后用不同缩放比例/锐化设置试识别，选出能识别全部文字的最快组合)
+    'auto_calibrate': False,  # 是否自动校准 image_scale 和 sharpen（开启后覆盖这两项的配置值）
+    'recalibrate': False,  # 是否忽略已保存的结果重新校准
+    'calibration_file': 'calibration.json',  # 校准结果文件，按区域尺寸保存
+    'calibration_min_agreement': 0.9,  # 与原始分辨率识别结果的最低文字一致度: 90%
+    'calibration_repeats': 2,  # 每种设置识别的次数(取中位数耗时)
+
+    # 表格版面分析 (自动找出课程表格的列，只识别课程名和课余量列，表格结构变化时重新分析)
+    'table_layout': False,  # 是否只识别表格中的部分列
+    'layout_column_names': ['课程名', '课余量'],  # 需要识别的列的表头文字
+    'layout_check_checks': 20,  # 每20次检查核对一次表格结构
+    'layout_gap': 16,  # 拼接各列时中间留出的空白(像素)
+
+    # 画面变化检测 (画面没变化时跳过OCR，复用上次识别结果)
+    'change_detection': True,  # 是否启用画面变化检测
+    'change_threshold': DEFAULT_CHANGE_THRESHOLD,  # 变化阈值: 缩略图中变化像素占比超过0.1%才重新识别(一行文字变化约占0.2%~0.5%)
+    'force_ocr_interval': 30,  # 强制识别间隔: 画面再静止，30秒也至少识别一次
+
+    # 分块增量识别 (只对内容变化的条带重新OCR，适合较高的课程列表)
+    'incremental_ocr': False,  # 是否启用分块增量识别
+    'tile_height': 120,  # 条带高度: 120像素(缩放后)
+    'tile_overlap': 24,  # 条带重叠: 24像素，应不小于半行文字高度
+
+    # 文字框缓存 (版面不变时跳过文字检测，只运行文字识别)
+    'cache_text_boxes': False,  # 是否启用文字框缓存
+    'detect_refresh_checks': 30,  # 连续复用30次后强制重新检测一次
+
+    # 模板匹配快速通道 (OCR找到关键词后截下它的样子，之后几毫秒的模板匹配就能再次确认)
+    'template_fast_path': False,  # 是否启用模板匹配快速通道
+    'template_match_threshold': 0.9,  # 模板匹配度阈值: 0~1，越高越严格
+    'template_verify_checks': 20,  # 模板连续命中20次后做一次完整OCR校验
+
+    # 多核并行OCR (画面切成有重叠的条带，多个进程同时识别；每个进程各自加载模型，内存占用成倍增加)
+    'parallel_ocr': False,  # 是否启用并行OCR
+    'parallel_workers': None,  # 工作进程数: None=CPU核数-1
+    'parallel_overlap': 32,  # 条带重叠: 32像素(缩放后)，应不小于半行文字高度
+
+    # 流水线模式 (截图 / 识别 / 匹配提醒 分线程并行，识别总是处理最新画面)
+    'pipeline_mode': False,  # 是否启用流水线模式
+    'pipeline_queue_size': 1,  # 画面队列长度: 满了丢弃最旧的画面
+    'capture_interval': 0.2,  # 流水线模式下的截图间隔: 0.2秒
+
+    # 截屏后端
+    'capture_backend': 'imagegrab',  # 'imagegrab'(默认) / 'mss' / 'xshm'(Linux X11) / 'replay'(回放录制画面)
+    'replay_path': None,  # 回放后端的图片文件或目录
+    'replay_loop': True,  # 回放到最后一帧后是否从头开始
+    'replay_frame_interval': None,  # 回放时每帧持续秒数: None=每次检查前进一帧
+    'region': None,  # 预设监控区域 (左, 上, 右, 下)，设置后跳过手动框选
+
+    # 多区域监控 (一次截图，多个区域批量识别，各区域可设置自己的关键词)
+    # 例: [{'name': '课程列表', 'bbox': None, 'keywords': None},
+    #      {'name': '课余量', 'bbox': (900, 300, 980, 800), 'keywords': ['余量']}]
+    # bbox=None 表示启动时手动框选，keywords=None 表示使用上面的全局关键词
+    'regions': None,
+
+    # 自适应检查频率 (画面变化或刚点击刷新后加快检查，画面静止时逐步放慢，开启后 check_interval 只作为初始值)
+    'adaptive_interval': False,  # 是否启用自适应检查频率
+    'min_interval': 0.1,  # 最短检查间隔: 0.1秒(快速检查阶段)
+    'max_interval': 2.0,  # 最长检查间隔: 2.0秒(画面长时间静止)
+    'burst_duration': 3.0,  # 画面变化/刷新后快速检查持续3秒
+    'backoff_factor': 1.5,  # 画面静止时每次间隔放大1.5倍
+    'cpu_budget': None,  # 检查耗时占比上限(0~1): 如0.5表示每个检查周期最多一半时间在做识别，None=不限制
+
+    # 点击同步检查 (同时启用鼠标连点时有效: 每次点击刷新后等页面稳定下来立即识别，避免识别到加载一半的页面)
+    'click_sync': False,  # 是否启用点击同步检查
+    'settle_ms': 300,  # 页面连续300毫秒没有变化即认为加载完成
+    'settle_poll_interval': 0.03,  # 等待页面稳定时的截图间隔: 0.03秒
+    'settle_timeout': 3.0,  # 最多等待3秒，超时直接识别当前画面
+
+    # 提醒分发 (响铃、输出、停止连点都在后台执行，检测循环不会被提醒拖慢)
+    'alert_workers': 2,  # 提醒处理线程数，响铃和停止连点可以同时进行
+    'alert_timeout': 2.0,  # 单个提醒处理最长等待: 2秒，超时不再等待
+    'callback_timeout': 3.0,  # 回调函数(如停止连点)最长等待: 3秒
+
+    # 运行指标 (截屏、识别、匹配、回调、点击等各阶段的耗时分布)
+    'metrics': True,  # 是否记录各阶段耗时
+    'metrics_port': None,  # 本机指标接口端口，如 9108，访问 http://127.0.0.1:9108/metrics 或 /metrics.json
+    'metrics_jsonl': None,  # 指标快照追加写入的JSONL文件，如 'metrics.jsonl'
+    'metrics_jsonl_interval': 10,  # JSONL写入间隔: 10秒
+
+    # 资源限制 (选课时浏览器要渲染刷新后的页面，别让OCR占满所有CPU核)
+    'ocr_threads': None,  # OCR计算线程数上限: 如2, None=不限制(PyTorch默认用满所有核)
+    'process_priority': None,  # 进程优先级: None=不修改, 'below_normal'=低于正常, 'idle'=最低 (连点器在同一进程中，同样受影响)
+    'cpu_affinity': None,  # 只在指定的CPU核上运行: 如[2, 3], None=不限制 (Windows下需要psutil或使用系统接口)
+    # 与上面自适应检查频率的 cpu_budget 可以同时设置: 先按调度器等到下一次检查，再按本项补足推迟，
+    # 实际检查间隔取两者中较长的一个(更严格的限制生效); 不开启 adaptive_interval 时只有本项生效
+    'process_cpu_percent': None,  # 进程CPU占用上限: 如25表示平均最多占用全部CPU的25%，超出时推迟下一次检查，None=不限制
+    'process_cpu_window': 5.0,  # 进程CPU占用统计时长: 最近5秒
+
+    # 性能剖析 (长时间运行变慢时排查用，平时保持关闭)
+    'profiling': False,  # 是否开启采样剖析和内存分配跟踪
+    'profile_dir': 'profiles',  # 结果文件目录（*_profile.folded 可用 flamegraph.pl/speedscope 查看）
+    'profile_every_checks': 500,  # 每500次检查写出一组结果
+    'profile_sample_interval': 0.005,  # 调用栈采样间隔: 5毫秒
+    'profile_keep_dumps': 5,  # 只保留最近5组结果
+
     # 其他设置
     'status_interval': 30,  # 状态显示间隔: 30秒
     'use_gpu': False,  # 是否使用GPU加速(需要NVIDIA显卡)
+    'ocr_engine': 'easyocr',  # OCR引擎: 'easyocr'(PyTorch原版), 'onnx'(int8量化模型，启动快、占内存少)
+    'onnx_model_dir': 'onnx_models',  # ONNX模型目录，先运行 python export_ocr_models.py 导出
+    'onnx_threads': None,  # ONNX Runtime计算线程数: None=自动
+    'onnx_quantized': True,  # 优先使用int8量化模型，False=使用float32模型
+    'background_warmup': True,  # 是否在设置功能时后台加载并预热OCR模型
     'verbose': True,  # 是否显示详细输出信息
 }
 
@@ -30,6 +144,13 @@ CLICKER_CONFIG = {
     'click_count': None,  # 点击次数: None=无限
     'click_button': 'left',  # 点击按钮: 'left'(左键), 'right'(右键), 'middle'(中键)
 
+    # 计时设置 (按绝对时间安排点击，不会因点击耗时逐渐变慢)
+    'spin_threshold_ms': 2,  # 距离点击时刻小于2毫秒时忙等，精度可达亚毫秒
+    'burst_times': None,  # 突发点击开始时刻，如 ['12:30:00'] 表示选课开放时刻
+    'burst_interval': 0.2,  # 突发点击间隔: 0.2秒
+    'burst_duration': 5.0,  # 每次突发点击持续: 5秒
+    'show_jitter_stats': True,  # 停止时显示点击抖动直方图
+
     # 显示设置
     'verbose': True,  # 显示详细输出
     'show_mouse_position': True,  # 启动时显示鼠标位置
@@ -39,4 +160,13 @@ CLICKER_CONFIG = {
 FEATURE_SWITCHES = {
     'enable_course_monitor': False,  # 是否启用课程检测
     'enable_clicker': False,  # 是否启用鼠标连点
-}
\ No newline at end of file
+}
+
+# ==================== 多会话运行配置 (python orchestrator.py) ====================
+# 在一个进程中同时运行多组 课程检测 + 鼠标连点，所有会话共用一个OCR模型
+ORCHESTRATOR_CONFIG = {
+    'sessions_file': 'sessions.json',  # 会话定义文件，格式见 sessions.example.json
+    'status_interval': 30,  # 各会话状态输出间隔: 30秒
+    'stats_json': None,  # 退出时把各会话的统计写入该JSON文件，如 'session_stats.json'
+    'serialize_input': True,  # 各会话的鼠标点击串行执行，避免多个连点器同时移动鼠标
+}
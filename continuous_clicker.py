@@ -5,6 +5,10 @@ import threading
 import keyboard
 import sys
 
+from click_timing import ClickScheduler, JitterHistogram, sleep_until
+from metrics import MetricsRegistry
+from runtime import CancelToken, CancellableTask
+
 
 class ContinuousClicker:
     """
@@ -21,7 +25,10 @@ class ContinuousClicker:
         config: 配置字典，包含点击参数
         """
         self.is_clicking = False
-        self.click_thread = None
+        self.click_task = None  # 点击循环任务，取消后正在进行的等待立即结束
+        self.exit_event = threading.Event()  # 独立运行时的退出请求
+        self.jitter = JitterHistogram()
+        self.click_total = 0
 
         # 默认配置
         default_config = {
@@ -32,6 +39,18 @@ class ContinuousClicker:
             'click_button': 'left',  # 点击按钮: 'left', 'right', 'middle'
             'verbose': True,  # 是否显示详细输出
             'show_mouse_position': True,  # 是否显示鼠标位置
+            'on_click': None,  # 每次点击后调用的回调函数（如通知课程检测页面已刷新）
+            'spin_threshold_ms': 2,  # 距离点击时刻小于该毫秒数时改为忙等，提高计时精度
+            'burst_times': None,  # 突发点击开始时刻列表，如 ['12:30:00']
+            'burst_interval': 0.2,  # 突发点击间隔(秒)
+            'burst_duration': 5.0,  # 每次突发点击持续时长(秒)
+            'show_jitter_stats': True,  # 停止时显示点击抖动直方图
+            'metrics_registry': None,  # 共享的指标注册表（与课程检测共用一个指标接口）
+            'metrics': True,  # 单独运行时是否记录点击耗时和抖动（传入共享注册表时由共享方决定）
+            'metrics_port': None,  # 单独运行时的本机指标接口端口，如 9109
+            'metrics_jsonl': None,  # 单独运行时指标快照追加写入的JSONL文件
+            'metrics_jsonl_interval': 10,  # JSONL写入间隔(秒)
+            'input_lock': None,  # 多个连点器共用的输入锁，同一时刻只有一个连点器操作鼠标
         }
 
         # 合并配置
@@ -39,9 +58,17 @@ class ContinuousClicker:
         if config:
             self.config.update(config)
 
-        # 当前位置显示相关
-        self.show_position = self.config['show_mouse_position']
-        self.position_thread = None
+        # 点击耗时统计：可以传入与课程检测共享的注册表，否则自己创建并按配置启动输出
+        self.metrics = self.config['metrics_registry']
+        self.owns_metrics = self.metrics is None
+        if self.owns_metrics:
+            self.metrics = MetricsRegistry(enabled=self.config['metrics'])
+            self.metrics.start_exporters(port=self.config['metrics_port'],
+                                         jsonl_path=self.config['metrics_jsonl'],
+                                         jsonl_interval=self.config['metrics_jsonl_interval'],
+                                         verbose=self.config['verbose'])
+        self.metrics.add_collector(lambda: {'clicks_total': self.click_total})
+        self.position_task = None  # 鼠标位置显示任务，取消后立即停止
 
         self.print_welcome()
 
@@ -91,32 +118,41 @@ class ContinuousClicker:
                 print(f"设置位置时出错: {e}")
             return None
 
-    def show_mouse_position_loop(self):
-        """持续显示鼠标位置（在新线程中运行）"""
-        while self.show_position:
+    def show_mouse_position_loop(self, token):
+        """持续显示鼠标位置（在后台任务中运行，令牌取消后立即结束）"""
+        while not token.cancelled:
             try:
                 x, y = pyautogui.position()
                 # 使用回车符覆盖上一行输出
                 print(f"\r鼠标位置: ({x}, {y}) - 按Ctrl+Alt+P停止显示", end='', flush=True)
-                time.sleep(0.1)
             except:
                 break
+            if token.sleep(0.1):
+                break
         print()  # 换行
 
+    def stop_mouse_position(self):
+        """停止鼠标位置显示，等待显示任务结束"""
+        if self.position_task is not None:
+            self.position_task.cancel()
+            self.position_task.join(timeout=1.0)
+            self.position_task = None
+
     def toggle_mouse_position(self):
         """切换鼠标位置显示"""
-        self.show_position = not self.show_position
-
-        if self.show_position:
-            # 启动显示线程
-            self.position_thread = threading.Thread(target=self.show_mouse_position_loop)
-            self.position_thread.daemon = True
-            self.position_thread.start()
+        if self.position_task is not None and self.position_task.is_alive():
+            self.stop_mouse_position()
             if self.config['verbose']:
-                print("✓ 已启用鼠标位置显示")
+                print("✓ 已禁用鼠标位置显示")
         else:
+            # 旧任务已经结束（如读取位置出错），换一个新任务
+            self.stop_mouse_position()
+            token = CancelToken()
+            self.position_task = CancellableTask(self.show_mouse_position_loop, args=(token,),
+                                                 name='mouse-position', token=token)
+            self.position_task.start()
             if self.config['verbose']:
-                print("✓ 已禁用鼠标位置显示")
+                print("✓ 已启用鼠标位置显示")
 
     def click_loop(self):
         """点击循环"""
@@ -141,15 +177,36 @@ class ContinuousClicker:
             print("=" * 60 + "\n")
 
         click_count = 0
+        stop_event = self.click_task.token.event
+        spin_threshold = self.config['spin_threshold_ms'] / 1000.0
+        scheduler = ClickScheduler(interval,
+                                   burst_times=self.config['burst_times'],
+                                   burst_interval=self.config['burst_interval'],
+                                   burst_duration=self.config['burst_duration'])
+        self.jitter = JitterHistogram()
+
+        if verbose and scheduler.bursts:
+            print(f"已安排 {len(scheduler.bursts)} 次突发点击 "
+                  f"(间隔{scheduler.burst_interval}秒，持续{scheduler.burst_duration}秒)")
 
         while self.is_clicking:
             try:
+                # 等到本次点击的截止时间（按绝对时间安排，点击和输出的耗时不会累积）
+                deadline = scheduler.next_deadline
+                if not sleep_until(deadline, spin_threshold, stop_event):
+                    break
+                lateness = time.perf_counter() - deadline
+                self.jitter.record(lateness)
+                self.metrics.observe('click_lateness', max(0.0, lateness))
+
                 click_count += 1
+                self.click_total += 1
 
                 # 执行点击
-                pyautogui.click(x=pos[0], y=pos[1],
-                                duration=duration,
-                                button=button)
+                self.perform_click(pos, duration, button)
+
+                if self.config['on_click']:
+                    self.config['on_click']()
 
                 if verbose:
                     current_time = time.strftime("%H:%M:%S")
@@ -165,8 +222,8 @@ class ContinuousClicker:
                     self.is_clicking = False
                     break
 
-                # 等待下一次点击
-                time.sleep(interval)
+                # 安排下一次点击
+                scheduler.advance()
 
             except KeyboardInterrupt:
                 if verbose:
@@ -175,10 +232,30 @@ class ContinuousClicker:
             except Exception as e:
                 if verbose:
                     print(f"[错误] 点击异常: {e}")
-                time.sleep(1)
+                if stop_event.wait(1):
+                    break
+                scheduler.advance()
 
         if verbose and not self.is_clicking:
             print(f"\n⏹️  点击已停止，共点击 {click_count} 次")
+            if scheduler.skipped:
+                print(f"因点击耗时超过间隔跳过 {scheduler.skipped} 次")
+            if self.config['show_jitter_stats']:
+                print(self.jitter.format())
+
+    def perform_click(self, pos, duration, button):
+        """执行一次点击；共用输入锁时先等其他连点器的点击完成，等待时间记入指标 click_input_wait"""
+        input_lock = self.config['input_lock']
+        if input_lock is None:
+            with self.metrics.time('click'):
+                pyautogui.click(x=pos[0], y=pos[1], duration=duration, button=button)
+            return
+
+        wait_start = time.perf_counter()
+        with input_lock:
+            self.metrics.observe('click_input_wait', time.perf_counter() - wait_start)
+            with self.metrics.time('click'):
+                pyautogui.click(x=pos[0], y=pos[1], duration=duration, button=button)
 
     def start_clicking(self):
         """开始点击流程"""
@@ -190,18 +267,21 @@ class ContinuousClicker:
                     print("✗ 无法获取点击位置")
                 return
 
-            self.is_clicking = True
-
-            # 在新线程中启动点击循环
-            self.click_thread = threading.Thread(target=self.click_loop)
-            self.click_thread.daemon = True
-            self.click_thread.start()
+            self.start_click_loop()
 
             if self.config['verbose']:
                 print("\n✅ 连续点击已启动！")
         else:
             self.stop_clicking()
 
+    def start_click_loop(self):
+        """在后台任务中启动点击循环（使用已设置的点击位置）"""
+        if self.is_clicking:
+            return
+        self.is_clicking = True
+        self.click_task = CancellableTask(self.click_loop, name='clicker')
+        self.click_task.start()
+
     def stop_clicking(self):
         """停止点击"""
         if self.is_clicking:
@@ -209,9 +289,10 @@ class ContinuousClicker:
                 print("\n正在停止连续点击...")
             self.is_clicking = False
 
-            # 等待点击线程结束
-            if self.click_thread and self.click_thread.is_alive():
-                self.click_thread.join(timeout=2.0)
+            # 取消点击任务：正在进行的等待立即结束，最多等当前这次点击完成
+            if self.click_task is not None:
+                self.click_task.cancel()
+                self.click_task.join(timeout=2.0)
 
             if self.config['verbose']:
                 print("连续点击已停止")
@@ -227,7 +308,7 @@ class ContinuousClicker:
         """运行主程序循环"""
         # 设置快捷键
         keyboard.add_hotkey('ctrl+alt+c', self.toggle_clicking)
-        keyboard.add_hotkey('ctrl+alt+q', self.quit_program)
+        keyboard.add_hotkey('ctrl+alt+q', self.exit_event.set)
         keyboard.add_hotkey('ctrl+alt+p', self.toggle_mouse_position)
 
         if self.config['verbose']:
@@ -236,10 +317,13 @@ class ContinuousClicker:
             print("      按 Ctrl+Alt+P 显示鼠标位置")
             print("      按 Ctrl+Alt+Q 退出程序\n")
 
+        # 主线程等待退出事件（快捷键回调在 keyboard 的线程中执行，不能在那里直接退出进程）
         try:
-            keyboard.wait()
+            while not self.exit_event.wait(0.5):
+                pass
         except KeyboardInterrupt:
-            self.quit_program()
+            pass
+        self.quit_program()
 
     def quit_program(self):
         """安全退出程序"""
@@ -248,9 +332,9 @@ class ContinuousClicker:
             print("正在退出连续点击工具...")
 
         self.stop_clicking()
-        self.show_position = False  # 停止位置显示
-
-        time.sleep(0.5)
+        self.stop_mouse_position()  # 停止位置显示
+        if self.owns_metrics:
+            self.metrics.close()
 
         if self.config['verbose']:
             print("感谢使用！")
@@ -4,10 +4,28 @@ import time
 import threading
 import keyboard
 import sys
-import cv2
-import numpy as np
-from PIL import ImageGrab
-import easyocr
+from concurrent.futures import ThreadPoolExecutor
+
+from frame_change import DEFAULT_CHANGE_THRESHOLD, FrameChangeDetector
+from tile_cache import TileTextCache
+from pipeline import DropOldestQueue
+from layout_cache import TextBoxCache
+from ocr_warmup import OCRWarmup
+from ocr_engines import OCR_ENGINE_PACKAGES, create_ocr_engine, engine_from_config
+from parallel_ocr import ParallelOCR
+from template_tracker import TemplateTracker
+from scheduler import AdaptiveScheduler
+from monitor_regions import MonitorRegion, union_bbox, crop_regions, pad_to_same_size
+from keyword_matcher import ALLOWLIST_EXTRA, KeywordMatcher, build_allowlist
+from capture_backends import CaptureBackend, create_capture_backend
+from preprocess import Preprocessor
+from calibration import Calibrator, CalibrationStore, region_key
+from table_layout import TableLayout, DEFAULT_COLUMN_NAMES
+from metrics import MetricsRegistry
+from profiling import LoopProfiler
+from resource_governor import ResourceGovernor
+from alerts import AlertDispatcher, accepts_argument
+from runtime import CancelToken, CancellableTask, TaskCancelled
 
 
 class CourseMonitor:
@@ -16,6 +34,9 @@ class CourseMonitor:
     功能：仅监控指定屏幕区域，识别指定文字关键词并声音提醒
     """
 
+    # 单区域监控时回调结果中使用的区域名称
+    DEFAULT_REGION_NAME = '监控区域'
+
     def __init__(self, config):
         """
         初始化监控器
@@ -27,6 +48,17 @@ class CourseMonitor:
         self.config = config
         self.reader = None
 
+        # 监控任务、状态输出任务共用一个取消令牌，停止时所有等待立即返回
+        self.stop_token = CancelToken()
+        self.monitor_task = None
+        self.status_task = None
+        self.exit_event = threading.Event()  # 独立运行时的退出请求
+        # OCR在单独的线程中执行，监控循环等待结果时也能立即响应停止；
+        # 多会话运行时传入公平调度器的执行器，各会话轮流使用同一个OCR线程和模型
+        self.ocr_executor = config.get('ocr_executor', None)
+        if self.ocr_executor is None:
+            self.ocr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr')
+
         # 从配置中获取参数
         self.keywords = config.get('keywords', ["模式识别", "机器学习", "Python", "深度学习"])
         self.image_scale = config.get('image_scale', 0.7)
@@ -34,12 +66,183 @@ class CourseMonitor:
         self.status_interval = config.get('status_interval', 30)
         self.alert_cooldown = config.get('alert_cooldown', 1)
         self.use_gpu = config.get('use_gpu', False)
+        # OCR引擎：easyocr(默认) 或 onnx(导出并量化的模型，不需要PyTorch)
+        self.ocr_engine, self.ocr_engine_options = engine_from_config(config)
         self.verbose = config.get('verbose', True)
 
+        # 关键词匹配引擎：关键词变化时才重新编译
+        self.fuzzy_match = config.get('fuzzy_match', False)
+        self.max_edits = config.get('max_edits', 1)
+        self.keyword_matcher = None
+        self.matcher_keywords = None
+
+        # 受限识别：只在关键词用到的字符（加数字和分隔符）中解码，关键词变化时重新生成白名单
+        self.constrained_ocr = config.get('constrained_ocr', False)
+        self.allowlist_extra = config.get('allowlist_extra', None) or ALLOWLIST_EXTRA
+        self.constrained_min_confidence = config.get('constrained_min_confidence', 0.3)
+        self.allowlist = None
+        self.allowlist_keywords = None
+
+        # 截屏后端和预设监控区域（预设区域时跳过交互设置，便于无人值守/回放运行）
+        self.preset_region = config.get('region', None)
+        self.capture_backend = self.init_capture_backend()
+
+        # 画面变化检测：画面没有明显变化时跳过OCR，复用上次的识别结果
+        self.change_detection = config.get('change_detection', True)
+        self.force_ocr_interval = config.get('force_ocr_interval', 30)
+        self.change_detector = FrameChangeDetector(
+            threshold=config.get('change_threshold', DEFAULT_CHANGE_THRESHOLD)
+        )
+
+        # 分块增量识别：只对内容变化的条带重新OCR
+        self.incremental_ocr = config.get('incremental_ocr', False)
+        self.tile_cache = TileTextCache(
+            tile_height=config.get('tile_height', 120),
+            overlap=config.get('tile_overlap', 24),
+        )
+
+        # 文字框缓存：版面不变时跳过文字检测，只对缓存的文字框做识别
+        self.cache_text_boxes = config.get('cache_text_boxes', False)
+        self.box_cache = TextBoxCache(refresh_checks=config.get('detect_refresh_checks', 30))
+
+        # 自适应检查频率：画面变化或点击刷新后加快检查，画面静止时逐步放慢
+        self.scheduler = None
+        if config.get('adaptive_interval', False):
+            self.scheduler = AdaptiveScheduler(
+                base_interval=self.check_interval,
+                min_interval=config.get('min_interval', 0.1),
+                max_interval=config.get('max_interval', 2.0),
+                burst_duration=config.get('burst_duration', 3.0),
+                backoff_factor=config.get('backoff_factor', 1.5),
+                cpu_budget=config.get('cpu_budget', None),
+            )
+        self.last_frame_changed = False
+
+        # 点击同步检查：连点器每次点击刷新后，等页面稳定下来立即识别
+        self.click_sync = config.get('click_sync', False)
+        self.settle_time = config.get('settle_ms', 300) / 1000.0
+        self.settle_poll_interval = config.get('settle_poll_interval', 0.03)
+        self.settle_timeout = config.get('settle_timeout', 3.0)
+        self.settle_detector = FrameChangeDetector(threshold=self.change_detector.threshold)
+        self.refresh_event = threading.Event()
+        self.sync_count = 0
+        self.total_settle_wait = 0.0
+
+        # 多区域监控：每个区域有自己的关键词，一次截图、批量识别
+        self.regions = [
+            MonitorRegion.from_config(index, item, self.change_detector.threshold)
+            for index, item in enumerate(config.get('regions') or [])
+        ]
+
+        # 模板匹配快速通道：确认过的关键词截成模板，之后先用模板匹配，找不到或到了校验周期才做完整OCR
+        self.template_fast_path = config.get('template_fast_path', False)
+        self.template_verify_checks = config.get('template_verify_checks', 20)
+        self.template_tracker = TemplateTracker(
+            match_threshold=config.get('template_match_threshold', 0.9)
+        )
+        self.template_hits = 0
+        self.checks_since_verify = 0
+
+        # 多核并行OCR：把画面切成条带，由常驻进程池并行识别
+        self.parallel_ocr = config.get('parallel_ocr', False)
+        self.parallel_workers = config.get('parallel_workers', None)
+        self.parallel_overlap = config.get('parallel_overlap', 32)
+        self.parallel_engine = None
+
+        # 流水线模式：截图、识别、匹配提醒分别在独立线程中进行
+        self.pipeline_mode = config.get('pipeline_mode', False)
+        self.pipeline_queue_size = config.get('pipeline_queue_size', 1)
+        self.capture_interval = config.get('capture_interval', self.check_interval)
+        self.pipeline_dropped = 0
+        self.pipeline_queues = ()
+
+        # 运行统计
+        self.check_count = 0
+        self.ocr_count = 0
+        self.skip_count = 0
+        self.alert_count = 0
+        self.last_alert_time = 0
+        self.last_ocr_time = 0
+        self.last_texts = []
+
+        # 分阶段耗时统计：可以传入与连点器共享的注册表，否则自己创建并按配置启动输出
+        self.metrics = config.get('metrics_registry', None)
+        self.owns_metrics = self.metrics is None
+        if self.owns_metrics:
+            self.metrics = MetricsRegistry(enabled=config.get('metrics', True))
+            self.metrics.start_exporters(port=config.get('metrics_port', None),
+                                         jsonl_path=config.get('metrics_jsonl', None),
+                                         jsonl_interval=config.get('metrics_jsonl_interval', 10.0),
+                                         verbose=self.verbose)
+        self.metrics.add_collector(self.metric_counters)
+
+        # 缩放/锐化自动校准：选定区域后试验不同设置，结果按区域尺寸保存
+        self.auto_calibrate = config.get('auto_calibrate', False)
+        self.recalibrate = config.get('recalibrate', False)
+        self.calibration_file = config.get('calibration_file', 'calibration.json')
+        self.calibration_min_agreement = config.get('calibration_min_agreement', 0.9)
+        self.calibration_repeats = config.get('calibration_repeats', 2)
+
+        # 表格版面分析：找出课程表格的列，只识别课程名（和课余量）列；表格结构变化时重新学习
+        self.table_layout_enabled = config.get('table_layout', False)
+        self.layout_column_names = config.get('layout_column_names', DEFAULT_COLUMN_NAMES)
+        self.layout_check_checks = config.get('layout_check_checks', 20)
+        self.layout_gap = config.get('layout_gap', 16)
+        self.table_layout = None
+        self.layout_checks = 0
+
+        # 截图预处理：输出缓冲区轮换使用，之后第 preprocess_ring_size 帧才会覆盖；
+        # 跨线程交出去的帧（流水线模式）另行拷贝，不依赖缓冲区个数和识别耗时
+        self.preprocessor = Preprocessor(
+            scale=self.image_scale,
+            sharpen=config.get('sharpen', 'auto'),
+            binarize=config.get('binarize', None),
+            adaptive_block_size=config.get('adaptive_block_size', 31),
+            adaptive_c=config.get('adaptive_c', 10),
+            ring_size=config.get('preprocess_ring_size', 4),
+            metrics=self.metrics if self.metrics.enabled else None)
+
+        # 资源限制：限制OCR线程数、优先级和CPU核，CPU占用超出预算时推迟下一次检查，给浏览器留出CPU
+        # （在调度器按 cpu_budget 等待之后再补足推迟，两者取更严格的一个）
+        self.governor = ResourceGovernor(ocr_threads=config.get('ocr_threads', None),
+                                         priority=config.get('process_priority', None),
+                                         affinity=config.get('cpu_affinity', None),
+                                         cpu_percent=config.get('process_cpu_percent', None),
+                                         window=config.get('process_cpu_window', 5.0),
+                                         verbose=self.verbose)
+
+        # 性能剖析（默认关闭，关闭时监控循环中只有一次 None 判断）
+        self.profiler = None
+        if config.get('profiling', False):
+            self.profiler = LoopProfiler(output_dir=config.get('profile_dir', 'profiles'),
+                                         every_checks=config.get('profile_every_checks', 500),
+                                         sample_interval=config.get('profile_sample_interval', 0.005),
+                                         keep_dumps=config.get('profile_keep_dumps', 5))
+
         # 关键修复：保存回调函数
         self.callback_function = config.get('on_target_detected', None)
 
-        self.init_ocr_simple()
+        # 提醒分发：响铃、输出、回调都在后台线程执行，检测循环不等待
+        self.alerts = AlertDispatcher(workers=config.get('alert_workers', 2),
+                                      default_timeout=config.get('alert_timeout', 2.0),
+                                      verbose=self.verbose, metrics=self.metrics)
+        if self.callback_function:
+            self.alerts.register('callback', self.run_callback, priority=0,
+                                 timeout=config.get('callback_timeout', 3.0))
+        self.alerts.register('sound', lambda matches: self.play_beep_sound(), priority=1)
+        if self.verbose:
+            self.alerts.register('console', self.print_alert, priority=2)
+
+        # OCR后台预热：可以传入已在启动时开始的预热任务，也可以在这里开始
+        self.ocr_warmup = config.get('ocr_warmup', None)
+        if self.ocr_warmup is None and config.get('background_warmup', False):
+            self.ocr_warmup = OCRWarmup(self.use_gpu, self.image_scale, self.ocr_engine,
+                                        self.ocr_engine_options).start()
+        self.startup_time = self.ocr_warmup.started_at if self.ocr_warmup else time.perf_counter()
+        self.first_check_reported = False
+
+        if self.ocr_warmup is None:
+            self.init_ocr_simple()
         if self.verbose:
             self.print_config()
 
@@ -51,6 +254,24 @@ class CourseMonitor:
         print(f"监控关键词: {', '.join(self.keywords)}")
         print(f"优化设置: 图像缩放{self.image_scale * 100}%, 检查间隔{self.check_interval}秒")
         print(f"提醒冷却: {self.alert_cooldown}秒, GPU加速: {'是' if self.use_gpu else '否'}")
+        if self.change_detection:
+            print(f"画面变化检测: 开启 (阈值{self.change_detector.threshold * 100:.2f}%)")
+        if self.regions:
+            print(f"多区域监控: {', '.join(region.name for region in self.regions)}")
+        if self.fuzzy_match:
+            print(f"模糊匹配: 开启 (容忍形近字, 最多{self.max_edits}处差异)")
+        if self.constrained_ocr:
+            print(f"受限识别: 开启 (白名单{len(self.get_allowlist())}个字符)")
+        if self.incremental_ocr:
+            print(f"分块增量识别: 开启 (条带高度{self.tile_cache.tile_height}像素)")
+        if self.scheduler is not None:
+            print(f"自适应检查频率: 开启 (间隔{self.scheduler.min_interval}~{self.scheduler.max_interval}秒)")
+        if self.template_fast_path:
+            print(f"模板匹配快速通道: 开启 (每{self.template_verify_checks}次命中做一次完整OCR校验)")
+        if self.parallel_ocr:
+            print(f"并行OCR: 开启 (工作进程数{self.parallel_workers or '自动'})")
+        if self.cache_text_boxes:
+            print(f"文字框缓存: 开启 (最多连续复用{self.box_cache.refresh_checks}次)")
         print("快捷键说明:")
         print("  Ctrl+S = 开始/停止监控")
         print("  Ctrl+Q = 退出程序")
@@ -63,22 +284,106 @@ class CourseMonitor:
         if self.verbose:
             print("正在初始化OCR识别器...")
         try:
-            self.reader = easyocr.Reader(
-                lang_list=['ch_sim', 'en'],
-                gpu=self.use_gpu,
-            )
+            self.reader = create_ocr_engine(self.ocr_engine, use_gpu=self.use_gpu,
+                                            verbose=self.verbose, **self.ocr_engine_options)
             if self.verbose:
-                print("✓ OCR识别器初始化成功")
+                print(f"✓ OCR识别器初始化成功 (引擎: {self.reader.name})")
             return True
         except Exception as e:
             print(f"✗ OCR初始化失败: {e}")
             self.handle_ocr_error(e)
             return False
 
+    def wait_for_ocr(self):
+        """等待后台预热完成并取得OCR识别器，返回识别器是否可用"""
+        if self.ocr_warmup is None or self.reader is not None:
+            return self.reader is not None
+
+        if not self.ocr_warmup.ready.is_set() and self.verbose:
+            print("正在等待OCR模型在后台加载完成...")
+        self.ocr_warmup.wait()
+
+        if self.ocr_warmup.error is not None:
+            print(f"✗ OCR初始化失败: {self.ocr_warmup.error}")
+            self.handle_ocr_error(self.ocr_warmup.error)
+            return False
+
+        self.reader = self.ocr_warmup.reader
+        if self.verbose:
+            print(f"✓ OCR识别器已就绪 (加载{self.ocr_warmup.load_time:.1f}秒, "
+                  f"预热{self.ocr_warmup.warmup_time:.1f}秒)")
+        return True
+
+    def init_parallel_ocr(self):
+        """启动并行OCR进程池（每个进程各自加载模型，较慢，只在开始监控时做一次）"""
+        if not self.parallel_ocr or self.parallel_engine is not None:
+            return True
+
+        if self.verbose:
+            print("正在启动并行OCR进程池...")
+        try:
+            self.parallel_engine = ParallelOCR(workers=self.parallel_workers,
+                                               overlap=self.parallel_overlap,
+                                               use_gpu=self.use_gpu,
+                                               engine=self.ocr_engine,
+                                               engine_options=self.ocr_engine_options)
+            self.parallel_engine.wait_ready()
+            if self.verbose:
+                print(f"✓ 并行OCR已就绪 ({self.parallel_engine.workers}个工作进程)")
+            return True
+        except Exception as e:
+            print(f"✗ 并行OCR启动失败，改用单进程识别: {e}")
+            self.parallel_engine = None
+            self.parallel_ocr = False
+            return False
+
+    def recognize_text_parallel(self, image):
+        """使用进程池并行识别整幅图像，返回 [(box, text, confidence), ...]"""
+        try:
+            return self.constrain_results(self.parallel_engine.readtext(image, self.get_allowlist()))
+        except Exception as e:
+            if self.verbose:
+                print(f"[错误] 并行识别失败，改为单进程识别: {e}")
+            return self.recognize_text_detailed(image)
+
+    def report_first_check(self):
+        """首次识别完成时报告从启动到可以检测所用的时间"""
+        if not self.first_check_reported:
+            self.first_check_reported = True
+            if self.verbose:
+                elapsed = time.perf_counter() - self.startup_time
+                print(f"[就绪] 首次检查完成，距程序启动{elapsed:.1f}秒")
+
+    def init_capture_backend(self):
+        """根据配置创建截屏后端，失败时回退到 ImageGrab"""
+        backend = self.config.get('capture_backend', 'imagegrab')
+        if isinstance(backend, CaptureBackend):
+            return backend
+
+        options = {}
+        if backend == 'replay':
+            options = {
+                'source': self.config.get('replay_path'),
+                'loop': self.config.get('replay_loop', True),
+                'frame_interval': self.config.get('replay_frame_interval', None),
+            }
+
+        try:
+            return create_capture_backend(backend, **options)
+        except Exception as e:
+            print(f"✗ 截屏后端 {backend} 初始化失败: {e}")
+            if backend == 'imagegrab':
+                raise
+            print("  已回退到 ImageGrab 截屏")
+            return create_capture_backend('imagegrab')
+
     def handle_ocr_error(self, error):
         """处理OCR初始化错误"""
         print("\n" + "=" * 50)
         print("OCR初始化问题解决方案：")
+        if self.ocr_engine == 'onnx':
+            print("0. 使用ONNX引擎时需要: pip install onnxruntime，")
+            print("   并在装有easyocr的环境中运行一次 python export_ocr_models.py 导出模型")
         print("1. 确保easyocr正确安装: pip install easyocr")
         print("2. 如果仍有问题，尝试安装稳定版本:")
         print("   pip install easyocr==1.7.0  # 稳定版本")
@@ -112,65 +417,253 @@ class CourseMonitor:
                     print(f"无效区域: {region}")
                 return None
 
-            screenshot = ImageGrab.grab(bbox=region)
-            screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-
-            # 图像预处理优化
-            if self.image_scale < 1.0:
-                height, width = screenshot_cv.shape[:2]
-                new_width = int(width * self.image_scale)
-                new_height = int(height * self.image_scale)
-                screenshot_cv = cv2.resize(screenshot_cv, (new_width, new_height),
-                                           interpolation=cv2.INTER_AREA)
+            # 后端返回的可能是内部缓冲区的视图，预处理结果写入预处理器自己的输出缓冲区
+            with self.metrics.time('capture_grab'):
+                screenshot_cv = self.capture_backend.grab(region)
 
-            screenshot_cv = cv2.cvtColor(screenshot_cv, cv2.COLOR_BGR2GRAY)
-
-            if self.image_scale < 0.9:
-                kernel = np.array([[0, -0.25, 0],
-                                   [-0.25, 2.0, -0.25],
-                                   [0, -0.25, 0]])
-                screenshot_cv = cv2.filter2D(screenshot_cv, -1, kernel)
+            # 图像预处理优化：灰度 → 缩放 → 锐化 → 二值化(可选)
+            screenshot_cv = self.preprocessor.process(screenshot_cv, self.capture_backend.color_format)
 
+            # 多区域监控时各区域已由用户划定，不再做表格分析
+            if self.table_layout_enabled and not self.regions:
+                screenshot_cv = self.apply_table_layout(screenshot_cv)
             return screenshot_cv
+        except TaskCancelled:
+            raise
         except Exception as e:
             if self.verbose:
                 print(f"[错误] 截屏失败: {e}")
             return None
 
+    def apply_table_layout(self, image):
+        """只保留表格中需要识别的列；每隔 layout_check_checks 次检查表格结构是否变化"""
+        self.layout_checks += 1
+        if self.table_layout is None or self.layout_checks >= self.layout_check_checks:
+            self.layout_checks = 0
+            if self.table_layout is None or not self.table_layout.matches(image):
+                self.table_layout = self.learn_table_layout(image)
+        return self.table_layout.crop(image)
+
+    def learn_table_layout(self, image):
+        """在当前画面上学习表格版面（需要识别一次整个区域以读取表头）"""
+        with self.metrics.time('layout_learn'):
+            layout = TableLayout.learn(
+                image,
+                # 表头文字不在关键词白名单中，学习版面时不做受限识别
+                lambda gray: self.run_ocr(self.recognize_text_detailed, gray, False),
+                column_names=self.layout_column_names,
+                find_keywords=self.check_keywords,
+                gap=self.layout_gap,
+                ring_size=self.preprocessor.ring_size)
+        if self.verbose:
+            print(f"表格版面: {layout.describe()}")
+        return layout
+
+    def get_allowlist(self):
+        """受限识别的字符白名单（全局和各区域关键词用到的字符），未开启时返回None"""
+        if not self.constrained_ocr:
+            return None
+        keywords = tuple(self.keywords) + tuple(keyword for region in self.regions
+                                                for keyword in region.keywords or ())
+        if self.allowlist is None or keywords != self.allowlist_keywords:
+            self.allowlist = build_allowlist(keywords, self.allowlist_extra)
+            self.allowlist_keywords = keywords
+        return self.allowlist
+
+    def constrain_results(self, results):
+        """受限识别时丢弃低置信度的行：白名单外的文字被强行认成白名单字符时置信度很低"""
+        if not self.constrained_ocr:
+            return results
+        return [result for result in results
+                if len(result) < 3 or result[2] >= self.constrained_min_confidence]
+
+    def recognize_text_detailed(self, image, constrained=True):
+        """安全地识别图像中的文字，保留文字框和置信度"""
+        if self.reader is None:
+            if self.verbose:
+                print("OCR识别器未初始化")
+            return []
+
+        try:
+            with self.metrics.time('ocr_readtext'):
+                if not constrained:
+                    return self.reader.readtext(image)
+                return self.constrain_results(self.reader.readtext(image, self.get_allowlist()))
+        except Exception as e:
+            if self.verbose:
+                print(f"[错误] 文字识别失败: {e}")
+            return []
+
     def recognize_text_safe(self, image):
         """安全地识别图像中的文字"""
+        texts = []
+        for result in self.recognize_text_detailed(image):
+            if len(result) >= 2:
+                text = result[1]
+                texts.append(text)
+        return texts
+
+    def recognize_with_cached_boxes(self, image):
+        """
+        检测与识别分离：版面未变化时复用缓存的文字框，只运行识别模型
+
+        返回: [(box, text, confidence), ...]
+        """
         if self.reader is None:
             if self.verbose:
                 print("OCR识别器未初始化")
             return []
 
         try:
-            results = self.reader.readtext(image)
-            texts = []
-            for result in results:
-                if len(result) >= 2:
-                    text = result[1]
-                    texts.append(text)
-            return texts
+            boxes = self.box_cache.lookup(image)
+            if boxes is None:
+                boxes = self.reader.detect(image)
+                self.box_cache.store(boxes)
+
+            horizontal_list, free_list = boxes
+            if not horizontal_list and not free_list:
+                return []
+            return self.constrain_results(
+                self.reader.recognize(image, horizontal_list, free_list, self.get_allowlist()))
         except Exception as e:
             if self.verbose:
                 print(f"[错误] 文字识别失败: {e}")
+            self.box_cache.reset()
             return []
 
+    def recognize_frame_detailed(self, image):
+        """按当前识别模式识别一帧图像，返回 [(box, text, confidence), ...]"""
+        with self.metrics.time('ocr'):
+            return self.recognize_frame_by_mode(image)
+
+    def recognize_frame_by_mode(self, image):
+        """按当前识别模式分派识别"""
+        if self.parallel_engine is not None:
+            return self.recognize_text_parallel(image)
+        if self.incremental_ocr:
+            return self.tile_cache.recognize(image, self.recognize_text_detailed)
+        if self.cache_text_boxes:
+            return self.recognize_with_cached_boxes(image)
+        return self.recognize_text_detailed(image)
+
+    def run_ocr(self, function, *args):
+        """
+        在OCR线程中执行识别并等待结果
+
+        停止监控时立即抛出 TaskCancelled，不等待正在进行的识别，还没开始的识别直接取消
+        """
+        future = self.ocr_executor.submit(function, *args)
+        try:
+            return self.stop_token.wait_future(future)
+        except TaskCancelled:
+            future.cancel()
+            raise
+
+    def recognize_frame(self, image):
+        """按当前识别模式识别一帧图像"""
+        return [result[1] for result in self.recognize_frame_detailed(image) if len(result) >= 2]
+
+    def template_stage(self, screenshot):
+        """
+        模板匹配快速通道
+
+        返回: 模板找到的关键词列表；没有模板、没有找到或到了校验周期时返回None，需要做完整OCR
+        """
+        if not self.template_fast_path or not self.template_tracker.has_templates():
+            return None
+        if self.checks_since_verify >= self.template_verify_checks:
+            return None
+
+        with self.metrics.time('template_search'):
+            found = self.template_tracker.search(screenshot)
+        if not found:
+            return None
+
+        self.template_hits += 1
+        self.checks_since_verify += 1
+        return found
+
+    def get_keyword_matcher(self):
+        """获取关键词匹配器，关键词列表变化时重新编译"""
+        keywords = tuple(self.keywords)
+        if self.keyword_matcher is None or keywords != self.matcher_keywords:
+            self.keyword_matcher = KeywordMatcher(keywords, fuzzy=self.fuzzy_match,
+                                                  max_edits=self.max_edits,
+                                                  reachable_only=self.constrained_ocr)
+            self.matcher_keywords = keywords
+        return self.keyword_matcher
+
     def check_keywords(self, texts):
         """检查是否包含监控关键词"""
-        found = []
-        for text in texts:
-            for keyword in self.keywords:
-                if keyword in text:
-                    found.append(keyword)
-        return list(set(found))
-
-    def setup_monitoring_region(self):
+        with self.metrics.time('keyword_match'):
+            return self.get_keyword_matcher().find(texts)
+
+    def count_check(self):
+        """记录一次检查"""
+        self.check_count += 1
+        if self.profiler is not None:
+            self.profiler.tick()
+
+    def metric_counters(self):
+        """供指标接口输出的计数"""
+        return {
+            'checks_total': self.check_count,
+            'ocr_total': self.ocr_count,
+            'skipped_total': self.skip_count,
+            'alerts_total': self.alert_count,
+            'cpu_percent': self.governor.cpu_share(),
+        }
+
+    def should_run_ocr(self, screenshot, now, last_ocr_time):
+        """判断本次检查是否需要执行OCR（画面变化检测）"""
+        if not self.change_detection:
+            return True
+
+        changed = self.change_detector.has_changed(screenshot)
+        # 长时间未识别时强制识别一次，避免细微变化被漏掉
+        if not changed and now - last_ocr_time >= self.force_ocr_interval:
+            self.change_detector.reset()
+            self.change_detector.has_changed(screenshot)
+            return True
+        return changed
+
+    def format_status(self):
+        """生成状态行文字"""
+        status = f"监控中... 检查{self.check_count}次"
+        if self.change_detection:
+            processed = self.ocr_count + self.skip_count
+            skip_rate = self.skip_count / processed * 100 if processed else 0.0
+            status += f", 识别{self.ocr_count}次, 跳过{self.skip_count}次(跳过率{skip_rate:.0f}%)"
+        if self.incremental_ocr:
+            status += f", 条带复用率{self.tile_cache.reuse_ratio() * 100:.0f}%"
+        if self.cache_text_boxes:
+            status += f", 文字框复用率{self.box_cache.reuse_ratio() * 100:.0f}%"
+        if self.template_fast_path:
+            status += f", 模板命中{self.template_hits}次"
+        if self.pipeline_mode:
+            status += f", 丢弃旧帧{self.pipeline_dropped}次"
+        status += f", 提醒{self.alert_count}次"
+        if self.governor.configured():
+            status += f", {self.governor.format_status()}"
+        if self.click_sync and self.sync_count:
+            status += (f", 同步检查{self.sync_count}次"
+                       f"(平均等待页面稳定{self.total_settle_wait / self.sync_count * 1000:.0f}毫秒)")
+        if self.scheduler is not None:
+            status += (f", 实际频率{self.scheduler.achieved_rate():.2f}次/秒"
+                       f"(当前间隔{self.scheduler.interval:.2f}秒)")
+        return status
+
+    def setup_monitoring_region(self, name=None):
         """引导用户设置监控区域"""
+        if self.preset_region and name is None:
+            region = tuple(int(v) for v in self.preset_region)
+            if self.verbose:
+                print(f"\n使用配置中预设的监控区域: {region}")
+            return region
+
         if self.verbose:
             print("\n" + "=" * 60)
-            print("步骤1: 设置监控区域")
+            print("步骤1: 设置监控区域" + (f"「{name}」" if name else ""))
             print("=" * 60)
 
         try:
@@ -208,7 +701,7 @@ class CourseMonitor:
                     print("⚠️  警告: 区域过小，可能影响识别效果")
                     choice = input("是否重新设置? (y/n): ")
                     if choice.lower() == 'y':
-                        return self.setup_monitoring_region()
+                        return self.setup_monitoring_region(name)
 
             return region
 
@@ -217,8 +710,156 @@ class CourseMonitor:
                 print(f"设置区域时出错: {e}")
             return None
 
-    def monitor_region(self, region):
-        """监控指定区域 - 修复版（解决状态打印频繁和提醒间隔不准确问题）"""
+    def apply_scale_profile(self, image_scale, sharpen):
+        """使用新的缩放比例和锐化设置"""
+        self.image_scale = image_scale
+        self.preprocessor.configure(scale=image_scale, sharpen=sharpen)
+
+    def calibrate_region(self, region):
+        """
+        为监控区域选择缩放比例和锐化设置
+
+        已保存过同样尺寸区域的结果时直接使用，否则在当前画面上校准并保存
+        """
+        store = CalibrationStore(self.calibration_file)
+        profile = None if self.recalibrate else store.get(region)
+
+        if profile is None:
+            frame = self.capture_backend.grab(region)
+            if frame is None:
+                return
+            if self.verbose:
+                print(f"\n正在校准缩放比例 (区域 {region_key(region)})，请保持页面不动...")
+
+            # 校准也在OCR线程中识别，共用OCR引擎的其他会话不会同时调用模型
+            calibrator = Calibrator(lambda image: self.run_ocr(self.recognize_text_safe, image),
+                                    self.check_keywords,
+                                    min_agreement=self.calibration_min_agreement,
+                                    repeats=self.calibration_repeats)
+            try:
+                profile = calibrator.calibrate(frame, self.capture_backend.color_format,
+                                               should_continue=lambda: self.is_monitoring)
+            except Exception as e:
+                if self.verbose:
+                    print(f"[错误] 校准失败，使用配置中的设置: {e}")
+                return
+            store.put(region, profile)
+
+            if self.verbose:
+                for candidate in profile['candidates']:
+                    print(f"  缩放{candidate['image_scale'] * 100:.0f}% "
+                          f"{'锐化' if candidate['sharpen'] else '不锐化'}: "
+                          f"{candidate['latency_ms']:.0f}毫秒, 一致度{candidate['agreement'] * 100:.0f}%")
+        elif self.verbose:
+            print(f"\n使用已保存的校准结果 (区域 {region_key(region)})")
+
+        self.apply_scale_profile(profile['image_scale'], profile['sharpen'])
+        if self.verbose:
+            print(f"✓ 图像缩放{profile['image_scale'] * 100:.0f}%, "
+                  f"{'锐化' if profile['sharpen'] else '不锐化'}, "
+                  f"识别约{profile['latency_ms']:.0f}毫秒 (原始分辨率约{profile['reference_latency_ms']:.0f}毫秒)")
+
+    def notify_refresh(self):
+        """页面刚被刷新（例如连点器点击了刷新按钮），自适应模式下立即加快检查，点击同步模式下触发一次检查"""
+        self.refresh_event.set()
+        if self.scheduler is not None:
+            self.scheduler.notify_refresh()
+
+    def wait_for_settled_frame(self, region):
+        """
+        点击刷新后持续截图比较，直到页面保持稳定 settle_ms 毫秒
+
+        返回: 稳定后的一帧截图，超时则返回最后一帧
+        """
+        start = time.monotonic()
+        last_change = start
+        screenshot = None
+        self.settle_detector.reset()
+
+        while self.is_monitoring:
+            frame = self.capture_region(region)
+            now = time.monotonic()
+            if frame is not None:
+                screenshot = frame
+                if self.settle_detector.has_changed(frame):
+                    last_change = now
+                elif now - last_change >= self.settle_time:
+                    break
+            if now - start >= self.settle_timeout:
+                break
+            if self.stop_token.sleep(self.settle_poll_interval):
+                break
+
+        self.sync_count += 1
+        self.total_settle_wait += time.monotonic() - start
+        return screenshot
+
+    def monitor_region_click_sync(self, region):
+        """
+        点击同步模式监控指定区域
+
+        每次连点器点击刷新后等待页面稳定再识别；一段时间没有点击时按检查间隔照常检查
+        """
+        self.print_monitor_banner(region)
+        self.reset_monitor_state()
+        self.refresh_event.clear()
+
+        while self.is_monitoring:
+            try:
+                refreshed = self.stop_token.wait_event(self.refresh_event, self.check_interval)
+                if not self.is_monitoring:
+                    break
+                self.refresh_event.clear()
+
+                self.count_check()
+                loop_start_time = time.time()
+
+                # 1. 刚刷新时等页面稳定后的画面，否则直接截图
+                if refreshed:
+                    screenshot = self.wait_for_settled_frame(region)
+                else:
+                    screenshot = self.capture_region(region)
+                if screenshot is None:
+                    continue
+
+                # 2. 识别文字并检查关键词
+                texts = self.ocr_stage(screenshot, loop_start_time)
+                self.alert_stage(texts, loop_start_time)
+                self.throttle()
+
+            except TaskCancelled:
+                break
+            except KeyboardInterrupt:
+                if self.verbose:
+                    print("\n监控被中断")
+                break
+            except Exception as e:
+                if self.verbose:
+                    print(f"[错误] 监控异常: {e}")
+                self.stop_token.sleep(self.check_interval * 2)
+
+    def wait_next_check(self, processing_time, changed, interval=None):
+        """等待下一次检查：自适应模式按调度器的截止时间，否则按固定间隔；之后按CPU预算限流"""
+        interval = self.check_interval if interval is None else interval
+        if self.scheduler is not None:
+            self.scheduler.record_check(time.monotonic() - processing_time, processing_time, changed)
+            self.scheduler.wait(lambda: self.is_monitoring)
+        elif processing_time < interval:
+            self.stop_token.sleep(interval - processing_time)
+        elif self.verbose and processing_time > interval * 2:
+            # 如果处理时间超过检查间隔，立即开始下一次检查
+            print(f"[注意] OCR处理耗时较长: {processing_time:.2f}秒")
+        self.throttle()
+
+    def throttle(self):
+        """CPU占用超出预算时推迟下一次检查，推迟的时间记入指标 governor_throttle"""
+        delay = self.governor.throttle_delay()
+        if delay > 0:
+            self.metrics.observe('governor_throttle', delay)
+            self.stop_token.sleep(delay)
+
+    def print_monitor_banner(self, region):
+        """打印监控启动信息"""
         if self.verbose:
             print("\n" + "=" * 60)
             print("步骤2: 开始监控")
@@ -226,71 +867,287 @@ class CourseMonitor:
             print(f"监控区域: {region}")
             print(f"监控关键词: {', '.join(self.keywords)}")
             print(f"优化设置: 图像缩放{self.image_scale * 100}%, 检查间隔{self.check_interval}秒")
+            if self.click_sync:
+                print(f"运行模式: 点击同步 (每次刷新后页面稳定{self.settle_time * 1000:.0f}毫秒即识别)")
+            elif self.pipeline_mode:
+                print("运行模式: 流水线 (截图 / 识别 / 匹配提醒 分线程并行)")
             print("-" * 60)
             print("监控已启动！发现关键词时将发出声音提醒。")
             print("按 Ctrl+S 停止监控\n")
 
-        alert_count = 0
-        check_count = 0
-        last_alert_time = 0
-        last_status_time = time.time()
+    def reset_monitor_state(self):
+        """重置每次监控开始时的统计和缓存"""
+        self.check_count = 0
+        self.ocr_count = 0
+        self.skip_count = 0
+        self.alert_count = 0
+        self.last_alert_time = 0
+        self.last_ocr_time = 0
+        self.last_texts = []
+        self.change_detector.reset()
+        self.tile_cache.reset()
+        self.box_cache.reset()
+        self.template_tracker.reset()
+        self.template_hits = 0
+        self.checks_since_verify = 0
+        self.sync_count = 0
+        self.total_settle_wait = 0.0
+        self.table_layout = None
+        self.layout_checks = 0
+
+    def print_governor_summary(self):
+        """输出CPU占用和预算造成的检查推迟"""
+        summary = self.governor.summary()
+        print(f"CPU占用: 平均{summary['cpu_percent']:.0f}%", end='')
+        if summary['cpu_percent_limit']:
+            print(f" (预算{summary['cpu_percent_limit']:g}%), 限流{summary['throttle_count']}次, "
+                  f"共推迟{summary['throttle_seconds']:.1f}秒"
+                  f"({summary['throttle_share'] * 100:.0f}%的时间), "
+                  f"检测最多因此晚{summary['throttle_max_seconds'] * 1000:.0f}毫秒")
+        else:
+            print()
+
+    def print_status(self):
+        """打印一次状态行"""
+        if self.verbose:
+            time_str = time.strftime("%H:%M:%S")
+            print(f"[{time_str}] {self.format_status()}")
+
+    def ocr_stage(self, screenshot, now):
+        """识别文字 (OCR)，画面没有变化时复用上次的结果，模板能找到关键词时跳过OCR"""
+        if not self.should_run_ocr(screenshot, now, self.last_ocr_time):
+            self.skip_count += 1
+            self.last_frame_changed = False
+            return self.last_texts
+
+        # 模板找到的关键词本身就作为识别结果交给关键词匹配
+        texts = self.template_stage(screenshot)
+        if texts is None:
+            results = self.run_ocr(self.recognize_frame_detailed, screenshot)
+            texts = [result[1] for result in results if len(result) >= 2]
+            self.ocr_count += 1
+            self.report_first_check()
+            if self.template_fast_path:
+                self.template_tracker.learn(screenshot, results, self.check_keywords)
+                self.checks_since_verify = 0
+
+        self.last_frame_changed = texts != self.last_texts
+        self.last_texts = texts
+        self.last_ocr_time = now
+        return texts
+
+    def alert_stage(self, texts, now):
+        """检查关键词并在冷却时间外发出提醒"""
+        if not texts:
+            return
+
+        found_keywords = self.check_keywords(texts)
+        if not found_keywords:
+            return
+
+        # 防重复提醒（使用截图时的时间戳）
+        if now - self.last_alert_time <= self.alert_cooldown:
+            return
+
+        self.last_alert_time = now
+        self.fire_alert({self.DEFAULT_REGION_NAME: found_keywords})
+
+    def fire_alert(self, matches):
+        """
+        发出提醒并调用回调函数（交给提醒分发器，立即返回）
+
+        参数:
+        matches: {区域名称: [找到的关键词, ...]}
+        """
+        self.alert_count += 1
+        self.alerts.dispatch(matches)
+
+    def add_alert_handler(self, name, handler, priority=3, timeout=None):
+        """
+        增加提醒处理函数（如推送消息、写日志等）
+
+        参数:
+        handler: 处理函数，参数为 {区域名称: [找到的关键词, ...]}
+        priority: 优先级，数值越小越先执行
+        timeout: 最长等待时间(秒)，None 使用 alert_timeout
+        """
+        return self.alerts.register(name, handler, priority, timeout)
+
+    def print_alert(self, matches):
+        """在控制台输出提醒"""
+        time_str = time.strftime("%H:%M:%S")
+        if len(matches) == 1 and self.DEFAULT_REGION_NAME in matches:
+            found = ', '.join(matches[self.DEFAULT_REGION_NAME])
+        else:
+            found = '; '.join(f"{name}: {', '.join(keywords)}" for name, keywords in matches.items())
+        print(f"[{time_str}] 提醒{self.alert_count}: 发现「{found}」")
+
+    def run_callback(self, matches):
+        """调用回调函数（按区域传入匹配结果；不带参数的旧式回调照旧不传参数）"""
+        print("检测到目标课程，正在调用回调函数...")
+        if accepts_argument(self.callback_function):
+            self.callback_function(matches)
+        else:
+            self.callback_function()
+        # 回调函数可能会停止监控，所以检查一下
+        if not self.is_monitoring:
+            print("回调函数停止了监控，退出监控循环")
+
+    def setup_regions(self):
+        """设置多区域监控的各个区域，未在配置中给出坐标的区域逐个手动框选"""
+        for region in self.regions:
+            if region.bbox is None:
+                region.bbox = self.setup_monitoring_region(region.name)
+                if region.bbox is None:
+                    return False
+            region.build_matcher(self.keywords, fuzzy=self.fuzzy_match, max_edits=self.max_edits,
+                                 reachable_only=self.constrained_ocr)
+        return True
+
+    def recognize_batch(self, images):
+        """
+        批量识别多张图像，共用一次推理调用
+
+        返回: 与 images 一一对应的文字列表
+        """
+        if self.reader is None:
+            if self.verbose:
+                print("OCR识别器未初始化")
+            return [[] for _ in images]
+
+        if len(images) == 1:
+            return [self.recognize_text_safe(images[0])]
+
+        try:
+            with self.metrics.time('ocr_batch'):
+                batch_results = self.reader.readtext_batched(pad_to_same_size(images),
+                                                             self.get_allowlist())
+            return [[result[1] for result in self.constrain_results(results) if len(result) >= 2]
+                    for results in batch_results]
+        except Exception as e:
+            if self.verbose:
+                print(f"[错误] 批量识别失败，改为逐个识别: {e}")
+            return [self.recognize_text_safe(image) for image in images]
+
+    def monitor_regions(self):
+        """多区域监控：一次截取所有区域的外接矩形，变化的区域批量识别，按区域匹配关键词"""
+        bbox = union_bbox(self.regions)
+        scale = self.image_scale if self.image_scale < 1.0 else 1.0
+
+        if self.verbose:
+            print("\n" + "=" * 60)
+            print("步骤2: 开始多区域监控")
+            print("=" * 60)
+            for region in self.regions:
+                print(f"「{region.name}」 {region.bbox}: {', '.join(region.matcher.keywords)}")
+            print(f"优化设置: 图像缩放{self.image_scale * 100}%, 检查间隔{self.check_interval}秒")
+            print("-" * 60)
+            print("监控已启动！发现关键词时将发出声音提醒。")
+            print("按 Ctrl+S 停止监控\n")
+
+        self.reset_monitor_state()
+        for region in self.regions:
+            region.reset()
 
         while self.is_monitoring:
             try:
-                check_count += 1
-                # 在循环开始时获取准确的时间戳
+                self.count_check()
                 loop_start_time = time.time()
 
-                # 状态打印（每30秒一次）
-                if loop_start_time - last_status_time > self.status_interval:
-                    if self.verbose:
-                        time_str = time.strftime("%H:%M:%S")
-                        print(f"[{time_str}] 监控中... 检查{check_count}次, 提醒{alert_count}次")
-                    last_status_time = loop_start_time
+                # 1. 一次截取全部区域
+                screenshot = self.capture_region(bbox)
+                if screenshot is None:
+                    self.stop_token.sleep(self.check_interval)
+                    continue
+                crops = crop_regions(screenshot, self.regions, bbox[:2], scale)
+
+                # 2. 只把画面有变化的区域放进同一批识别；长时间未识别时所有区域强制识别一次
+                force = loop_start_time - self.last_ocr_time >= self.force_ocr_interval
+                changed = []
+                for index, (region, crop) in enumerate(zip(self.regions, crops)):
+                    region_changed = True
+                    if self.change_detection:
+                        region_changed = region.change_detector.has_changed(crop)
+                        if not region_changed and force:
+                            region.change_detector.reset()
+                            region.change_detector.has_changed(crop)
+                            region_changed = True
+                    if region_changed:
+                        changed.append(index)
+                content_changed = False
+                if changed:
+                    batch = self.run_ocr(self.recognize_batch, [crops[i] for i in changed])
+                    for index, texts in zip(changed, batch):
+                        content_changed = content_changed or texts != self.regions[index].last_texts
+                        self.regions[index].last_texts = texts
+                    self.ocr_count += 1
+                    self.report_first_check()
+                    self.last_ocr_time = loop_start_time
+                else:
+                    self.skip_count += 1
+
+                # 3. 按区域匹配关键词
+                matches = {}
+                for region in self.regions:
+                    found = region.matcher.find(region.last_texts)
+                    if found and loop_start_time - region.last_alert_time > self.alert_cooldown:
+                        region.last_alert_time = loop_start_time
+                        matches[region.name] = found
+                if matches:
+                    self.fire_alert(matches)
+                    if not self.is_monitoring:
+                        break
+
+                processing_time = time.time() - loop_start_time
+                self.wait_next_check(processing_time, content_changed)
+
+            except TaskCancelled:
+                break
+            except KeyboardInterrupt:
+                if self.verbose:
+                    print("\n监控被中断")
+                break
+            except Exception as e:
+                if self.verbose:
+                    print(f"[错误] 监控异常: {e}")
+                self.stop_token.sleep(self.check_interval * 2)
+
+    def monitor_region(self, region):
+        """监控指定区域 - 修复版（解决状态打印频繁和提醒间隔不准确问题）"""
+        if self.click_sync:
+            return self.monitor_region_click_sync(region)
+        if self.pipeline_mode:
+            return self.monitor_region_pipelined(region)
+
+        self.print_monitor_banner(region)
+        self.reset_monitor_state()
+
+        while self.is_monitoring:
+            try:
+                self.count_check()
+                # 在循环开始时获取准确的时间戳
+                loop_start_time = time.time()
 
                 # 1. 截取指定区域
                 screenshot = self.capture_region(region)
                 if screenshot is None:
-                    time.sleep(self.check_interval)
+                    self.stop_token.sleep(self.check_interval)
                     continue
 
                 # 2. 识别文字 (OCR)
-                texts = self.recognize_text_safe(screenshot)
+                texts = self.ocr_stage(screenshot, loop_start_time)
 
                 # 3. 检查关键词
-                if texts:
-                    found_keywords = self.check_keywords(texts)
-
-                    if found_keywords:
-                        # 防重复提醒（使用循环开始时的时间戳）
-                        if loop_start_time - last_alert_time > self.alert_cooldown:
-                            alert_count += 1
-                            last_alert_time = loop_start_time
-
-                            self.play_beep_sound()
-
-                            if self.verbose:
-                                time_str = time.strftime("%H:%M:%S")
-                                print(f"[{time_str}] 提醒{alert_count}: 发现「{', '.join(found_keywords)}」")
-
-                            # 关键修复：调用回调函数
-                            if self.callback_function:
-                                print("检测到目标课程，正在调用回调函数...")
-                                self.callback_function()
-                                # 回调函数可能会停止监控，所以检查一下
-                                if not self.is_monitoring:
-                                    print("回调函数停止了监控，退出监控循环")
-                                    break
+                self.alert_stage(texts, loop_start_time)
+                if not self.is_monitoring:
+                    break
 
                 # 4. 计算实际耗时，动态调整等待时间
                 processing_time = time.time() - loop_start_time
-                if processing_time < self.check_interval:
-                    time.sleep(self.check_interval - processing_time)
-                else:
-                    # 如果处理时间超过检查间隔，立即开始下一次检查
-                    if self.verbose and processing_time > self.check_interval * 2:
-                        print(f"[注意] OCR处理耗时较长: {processing_time:.2f}秒")
+                self.wait_next_check(processing_time, self.last_frame_changed)
 
+            except TaskCancelled:
+                break
             except KeyboardInterrupt:
                 if self.verbose:
                     print("\n监控被中断")
@@ -298,45 +1155,170 @@ class CourseMonitor:
             except Exception as e:
                 if self.verbose:
                     print(f"[错误] 监控异常: {e}")
-                time.sleep(self.check_interval * 2)
+                self.stop_token.sleep(self.check_interval * 2)
+
+    def monitor_region_pipelined(self, region):
+        """
+        流水线模式监控指定区域
+
+        截图线程按检查间隔不断抓取画面放入队列（只保留最新的帧），
+        识别线程总是取最新的一帧做OCR，匹配提醒在第三个线程中进行，
+        这样提醒和回调不会拖慢下一次识别，识别也不会阻塞截图。
+        """
+        self.print_monitor_banner(region)
+        self.reset_monitor_state()
+
+        frame_queue = DropOldestQueue(self.pipeline_queue_size)
+        text_queue = DropOldestQueue(4)
+        queues = (frame_queue, text_queue)
+        self.pipeline_queues = queues
+
+        ocr_thread = threading.Thread(target=self.pipeline_ocr_worker, args=queues)
+        match_thread = threading.Thread(target=self.pipeline_match_worker, args=(text_queue,))
+        for worker in (ocr_thread, match_thread):
+            worker.daemon = True
+            worker.start()
+
+        # 截图生产者在当前线程中运行
+        try:
+            self.pipeline_capture_worker(region, frame_queue)
+        finally:
+            frame_queue.close()
+            text_queue.close()
+            ocr_thread.join(timeout=self.check_interval * 2)
+            match_thread.join(timeout=self.check_interval * 2)
+            self.pipeline_dropped = frame_queue.dropped
+
+    def pipeline_capture_worker(self, region, frame_queue):
+        """流水线第一级：按固定间隔截图"""
+        while self.is_monitoring:
+            try:
+                loop_start_time = time.time()
+
+                screenshot = self.capture_region(region)
+                if screenshot is not None:
+                    self.count_check()
+                    # 预处理输出缓冲区会被之后的截图覆盖，而识别线程可能要用它好几秒，
+                    # 放进队列的必须是独立的拷贝
+                    frame_queue.put((loop_start_time, screenshot.copy()))
+                    self.pipeline_dropped = frame_queue.dropped
+
+                processing_time = time.time() - loop_start_time
+                self.wait_next_check(processing_time, self.last_frame_changed,
+                                     interval=self.capture_interval)
+
+            except TaskCancelled:
+                break
+            except KeyboardInterrupt:
+                if self.verbose:
+                    print("\n监控被中断")
+                break
+            except Exception as e:
+                if self.verbose:
+                    print(f"[错误] 截图线程异常: {e}")
+                self.stop_token.sleep(self.check_interval * 2)
+
+    def pipeline_ocr_worker(self, frame_queue, text_queue):
+        """流水线第二级：总是对最新的一帧做OCR"""
+        while self.is_monitoring:
+            item = frame_queue.get_latest(timeout=self.check_interval)
+            if item is None:
+                continue
+            captured_time, screenshot = item
+            try:
+                texts = self.ocr_stage(screenshot, captured_time)
+                text_queue.put((captured_time, texts))
+            except TaskCancelled:
+                break
+            except Exception as e:
+                if self.verbose:
+                    print(f"[错误] 识别线程异常: {e}")
+
+    def pipeline_match_worker(self, text_queue):
+        """流水线第三级：关键词匹配和提醒"""
+        while self.is_monitoring:
+            item = text_queue.get(timeout=self.check_interval)
+            if item is None:
+                continue
+            captured_time, texts = item
+            try:
+                self.alert_stage(texts, captured_time)
+            except Exception as e:
+                if self.verbose:
+                    print(f"[错误] 匹配线程异常: {e}")
 
     def start_monitoring(self):
         """开始监控流程"""
         if not self.is_monitoring:
-            if self.reader is None:
+            if not self.wait_for_ocr():
                 if self.verbose:
                     print("✗ 无法启动: OCR识别器未初始化")
                 return
 
+            self.init_parallel_ocr()
+
             if self.verbose:
                 print("\n启动区域监控...")
             self.is_monitoring = True
+            self.stop_token = CancelToken()
 
-            region = self.setup_monitoring_region()
-            if region is None:
+            if self.regions:
+                if not self.setup_regions():
+                    if self.verbose:
+                        print("区域设置失败，监控已取消")
+                    self.is_monitoring = False
+                    return
+                target, args = self.monitor_regions, ()
+            else:
+                region = self.setup_monitoring_region()
+                if region is None:
+                    if self.verbose:
+                        print("区域设置失败，监控已取消")
+                    self.is_monitoring = False
+                    return
+                target, args = self.monitor_region, (region,)
+
+            if self.auto_calibrate:
+                self.calibrate_region(union_bbox(self.regions) if self.regions else args[0])
+
+            self.governor.apply()
+
+            if self.profiler is not None:
+                self.profiler.start()
                 if self.verbose:
-                    print("区域设置失败，监控已取消")
-                self.is_monitoring = False
-                return
+                    print(f"性能剖析已开启，每{self.profiler.every_checks}次检查写入 {self.profiler.output_dir}/")
 
-            monitor_thread = threading.Thread(
-                target=self.monitor_region,
-                args=(region,)
-            )
-            monitor_thread.daemon = True
-            monitor_thread.start()
+            self.monitor_task = CancellableTask(target, args, name='monitor', token=self.stop_token).start()
+            self.status_task = CancellableTask(self.status_loop, name='status', token=self.stop_token).start()
 
             if self.verbose:
                 print("\n✅ 区域监控已启动！")
 
+    def status_loop(self):
+        """状态输出任务：每隔 status_interval 秒输出一次运行状态"""
+        while not self.stop_token.sleep(self.status_interval):
+            self.print_status()
+
     def stop_monitoring(self):
         """停止监控"""
         if self.is_monitoring:
             if self.verbose:
                 print("\n正在停止监控...")
             self.is_monitoring = False
-            time.sleep(1.5)
+
+            # 取消令牌唤醒所有等待，再唤醒调度器和流水线队列，监控线程随即退出
+            self.stop_token.cancel()
+            if self.scheduler is not None:
+                self.scheduler.wake_event.set()
+            for pipeline_queue in self.pipeline_queues:
+                pipeline_queue.close()
+            if self.monitor_task is not None:
+                self.monitor_task.join(timeout=1.0)
+            if self.profiler is not None:
+                self.profiler.stop()
             if self.verbose:
+                if self.governor.configured():
+                    self.print_governor_summary()
                 print("监控已停止")
 
     def toggle_monitoring(self):
@@ -349,16 +1331,30 @@ class CourseMonitor:
     def run(self):
         """运行主程序循环"""
         keyboard.add_hotkey('ctrl+s', self.toggle_monitoring)
-        keyboard.add_hotkey('ctrl+q', self.quit_program)
+        keyboard.add_hotkey('ctrl+q', self.exit_event.set)
 
         if self.verbose:
             print("程序已就绪，等待快捷键命令...")
             print("提示: 按 Ctrl+S 开始设置监控区域，按 Ctrl+Q 退出程序\n")
 
+        # 主线程等待退出事件（快捷键回调在 keyboard 的线程中执行，不能在那里直接退出进程）
         try:
-            keyboard.wait()
+            while not self.exit_event.wait(0.5):
+                pass
         except KeyboardInterrupt:
-            self.quit_program()
+            pass
+        self.quit_program()
+
+    def close(self):
+        """释放OCR线程、进程池、截屏后端等资源"""
+        self.ocr_executor.shutdown(wait=False)
+        if self.parallel_engine is not None:
+            self.parallel_engine.close()
+            self.parallel_engine = None
+        self.capture_backend.close()
+        self.alerts.close()
+        if self.owns_metrics:
+            self.metrics.close()
 
     def quit_program(self):
         """安全退出程序"""
@@ -366,21 +1362,21 @@ class CourseMonitor:
             print("\n" + "=" * 60)
             print("正在退出选课监控助手...")
         self.stop_monitoring()
-        time.sleep(0.5)
+        self.close()
         if self.verbose:
             print("感谢使用！")
             print("=" * 60)
         sys.exit(0)
 
 
-def check_dependencies():
-    """检查必要的Python库是否已安装"""
+def check_dependencies(ocr_engine='easyocr'):
+    """检查必要的Python库是否已安装（OCR库按所选引擎检查）"""
     print("检查运行环境...")
 
     required_modules = [
         ('pyautogui', 'pyautogui'),
         ('keyboard', 'keyboard'),
-        ('easyocr', 'easyocr'),
+        OCR_ENGINE_PACKAGES.get(ocr_engine, OCR_ENGINE_PACKAGES['easyocr']),
         ('cv2', 'opencv-python'),
         ('PIL', 'Pillow'),
         ('numpy', 'numpy')
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# export_ocr_models.py
+# 导出ONNX模型 - 把 easyocr 的检测/识别模型导出为ONNX并做int8动态量化，供 'ocr_engine': 'onnx' 使用
+#
+# 只需在装有 easyocr(PyTorch) 的环境中运行一次，之后运行选课助手只需要 onnxruntime:
+#   pip install easyocr onnx onnxruntime
+#   python export_ocr_models.py
+#   python export_ocr_models.py --output onnx_models --no-quantize
+import argparse
+import json
+import os
+
+import easyocr
+import torch
+
+from ocr_engines import ONNX_METADATA_FILE
+
+OPSET = 13
+
+
+def export_detector(reader, path):
+    """导出 CRAFT 检测模型，输入高宽可变"""
+    detector = getattr(reader.detector, 'module', reader.detector).eval()
+    dummy = torch.randn(1, 3, 320, 640)
+    torch.onnx.export(detector, dummy, path, opset_version=OPSET,
+                      input_names=['image'], output_names=['scores', 'feature'],
+                      dynamic_axes={'image': {0: 'batch', 2: 'height', 3: 'width'},
+                                    'scores': {0: 'batch', 1: 'score_height', 2: 'score_width'},
+                                    'feature': {0: 'batch', 2: 'feature_height',
+                                                3: 'feature_width'}})
+
+
+class RecognizerExport(torch.nn.Module):
+    """识别模型的 forward 需要一个不使用的 text 参数，导出时包一层去掉它"""
+
+    def __init__(self, recognizer):
+        super().__init__()
+        self.recognizer = recognizer
+
+    def forward(self, image):
+        return self.recognizer(image, None)
+
+
+def export_recognizer(reader, path, image_height):
+    """导出 CRNN 识别模型，批大小和宽度可变"""
+    recognizer = getattr(reader.recognizer, 'module', reader.recognizer).eval()
+    dummy = torch.randn(2, 1, image_height, 256)
+    torch.onnx.export(RecognizerExport(recognizer).eval(), dummy, path, opset_version=OPSET,
+                      input_names=['image'], output_names=['logits'],
+                      dynamic_axes={'image': {0: 'batch', 3: 'width'},
+                                    'logits': {0: 'batch', 1: 'steps'}})
+
+
+def quantize(source, target, op_types):
+    """int8 动态量化：权重离线量化，激活在推理时按批量化，不需要校准数据"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(source, target, op_types_to_quantize=list(op_types),
+                     weight_type=QuantType.QInt8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出easyocr模型为ONNX并量化")
+    parser.add_argument('--output', default='onnx_models', help="输出目录")
+    parser.add_argument('--languages', default='ch_sim,en', help="easyocr 语言列表")
+    parser.add_argument('--no-quantize', action='store_true', help="只导出 float32 模型")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    languages = args.languages.split(',')
+    print(f"加载 easyocr 模型 ({', '.join(languages)})...")
+    # quantize=False：PyTorch 的动态量化模型无法导出，量化交给 ONNX Runtime 完成
+    reader = easyocr.Reader(lang_list=languages, gpu=False, quantize=False, verbose=False)
+    image_height = 64
+
+    paths = {name: os.path.join(args.output, f"{name}.onnx") for name in ('detector', 'recognizer')}
+    with torch.no_grad():
+        print("导出检测模型...")
+        export_detector(reader, paths['detector'])
+        print("导出识别模型...")
+        export_recognizer(reader, paths['recognizer'], image_height)
+
+    if not args.no_quantize:
+        print("int8 量化...")
+        quantize(paths['detector'], os.path.join(args.output, 'detector.int8.onnx'),
+                 ('Conv', 'MatMul'))
+        quantize(paths['recognizer'], os.path.join(args.output, 'recognizer.int8.onnx'),
+                 ('Conv', 'MatMul', 'Gemm', 'LSTM'))
+
+    metadata = {
+        'languages': languages,
+        'image_height': image_height,
+        'characters': reader.character,
+        'lang_characters': ''.join(reader.lang_char),
+    }
+    with open(os.path.join(args.output, ONNX_METADATA_FILE), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+    for filename in sorted(os.listdir(args.output)):
+        size = os.path.getsize(os.path.join(args.output, filename)) / 1024 / 1024
+        print(f"  {filename:<24} {size:8.1f} MB")
+    print(f"✓ 已导出到 {args.output}，在 config.py 中设置 'ocr_engine': 'onnx' 即可使用")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# frame_change.py
+# 画面变化检测 - 在截图和OCR之间做一次廉价的差异比较，画面没变就不必重新识别
+import cv2
+import numpy as np
+
+# 默认变化阈值: 900x500的课程表格中换掉一门课程名约改变缩略图0.3%的像素，阈值要低于这个比例
+DEFAULT_CHANGE_THRESHOLD = 0.001
+
+
+class FrameChangeDetector:
+    """
+    画面变化检测器
+    功能：把截图缩小成缩略图后与上一次识别时的画面比较，变化超过阈值才认为画面有更新
+    """
+
+    def __init__(self, threshold=DEFAULT_CHANGE_THRESHOLD, pixel_delta=12, thumb_width=160):
+        """
+        初始化检测器
+
+        参数:
+        threshold: 变化像素占比阈值(0~1)，超过该比例认为画面已变化
+        pixel_delta: 缩略图上单个像素灰度差超过该值才计为变化
+        thumb_width: 缩略图宽度(像素)，越小越快但越不敏感
+        """
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.thumb_width = thumb_width
+        self.reference = None  # 上一次被判定为"已变化"时的缩略图
+        self.last_ratio = 0.0
+
+        # 缩略图和差值图的缓冲区：两个缩略图缓冲区轮流使用，一个保存参考帧，另一个写入新帧
+        self.thumb_buffers = [None, None]
+        self.spare = 0
+        self.diff = None
+
+    def make_thumbnail(self, image):
+        """生成用于比较的灰度缩略图（写入空闲的缩略图缓冲区）"""
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        height, width = image.shape[:2]
+        if width <= self.thumb_width:
+            size = (height, width)
+        else:
+            size = (max(1, int(height * self.thumb_width / width)), self.thumb_width)
+
+        thumb = self.thumb_buffers[self.spare]
+        if thumb is None or thumb.shape != size:
+            thumb = np.empty(size, dtype=np.uint8)
+            self.thumb_buffers[self.spare] = thumb
+
+        if size == (height, width):
+            np.copyto(thumb, image)
+        else:
+            cv2.resize(image, (size[1], size[0]), dst=thumb, interpolation=cv2.INTER_AREA)
+        return thumb
+
+    def change_ratio(self, thumb):
+        """计算缩略图相对参考帧的变化像素占比"""
+        if self.reference is None or self.reference.shape != thumb.shape:
+            return 1.0
+        if self.diff is None or self.diff.shape != thumb.shape:
+            self.diff = np.empty_like(thumb)
+        cv2.absdiff(thumb, self.reference, dst=self.diff)
+        cv2.threshold(self.diff, self.pixel_delta, 255, cv2.THRESH_BINARY, dst=self.diff)
+        return cv2.countNonZero(self.diff) / float(self.diff.size)
+
+    def has_changed(self, image):
+        """
+        判断画面是否发生变化
+
+        只有判定为变化时才更新参考帧，这样缓慢的累积变化也能被发现
+        """
+        thumb = self.make_thumbnail(image)
+        self.last_ratio = self.change_ratio(thumb)
+        if self.last_ratio > self.threshold:
+            # 新帧成为参考帧，下一帧写入另一个缓冲区
+            self.reference = thumb
+            self.spare = 1 - self.spare
+            return True
+        return False
+
+    def reset(self):
+        """清空参考帧，下一帧一定会被判定为变化"""
+        self.reference = None
+        self.last_ratio = 0.0
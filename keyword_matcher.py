@@ -0,0 +1,273 @@
+# keyword_matcher.py
+# 关键词匹配引擎 - Aho-Corasick 多模式匹配 + 容忍OCR形近字错误的模糊匹配
+import unicodedata
+
+# OCR 常见的形近字/形近字符，同一组内的字符在模糊匹配时视为相同
+CONFUSION_GROUPS = [
+    # 中文形近字
+    "习刁", "己已巳", "未末", "土士", "日曰", "人入", "八儿", "木术",
+    "大太犬", "干千于", "王玉", "间问", "候侯", "代伐", "体休", "码玛",
+    "媒煤", "计汁", "程呈", "识织", "构沟",
+    # 数字、字母和符号（已统一转成小写、半角）
+    "0o", "1li|!", "5s", "8b", "2z", "9q", "-_一—",
+]
+
+# 模糊匹配时短于该长度的关键词不做大小写和形近字归一化，按原文精确匹配：
+# 像 "AI" 这样的短词归一化后会出现在 "Training"、"Maintenance" 等普通单词里
+FUZZY_MIN_LENGTH = 4
+
+# 受限识别时除关键词用到的字符外还允许的字符：数字和常见分隔符，
+# 课程号、课序号、括号等不会被强行认成关键词里的字
+ALLOWLIST_EXTRA = "0123456789 -_.,:;/()（）[]【】·、，：；"
+
+
+def build_allowlist(keywords, extra=ALLOWLIST_EXTRA):
+    """由关键词生成受限识别的字符白名单（英文字母同时加入大小写），返回排好序的字符串"""
+    chars = set(extra)
+    for keyword in keywords:
+        for ch in keyword:
+            if not ch.isspace():
+                chars.update((ch, ch.lower(), ch.upper()))
+    return ''.join(sorted(chars))
+
+
+def build_confusion_map(groups=CONFUSION_GROUPS):
+    """把形近字分组转换为 字符 -> 代表字符 的映射（有交集的分组会合并）"""
+    canonical = {}
+    for group in groups:
+        chars = [unicodedata.normalize('NFKC', ch).casefold() for ch in group]
+        # 组内若有字符已属于其他分组，沿用那个分组的代表字符
+        root = next((canonical[ch] for ch in chars if ch in canonical), chars[0])
+        for ch in chars:
+            old_root = canonical.get(ch)
+            if old_root is not None and old_root != root:
+                for key, value in canonical.items():
+                    if value == old_root:
+                        canonical[key] = root
+            canonical[ch] = root
+    return canonical
+
+
+def is_latin_letter(ch):
+    """是否为英文字母"""
+    return ch.isascii() and ch.isalpha()
+
+
+def at_word_boundary(text, start, end):
+    """text[start:end] 以英文字母开头/结尾时，两侧不能紧挨着其他英文字母（不能是单词的一部分）"""
+    if start > 0 and is_latin_letter(text[start]) and is_latin_letter(text[start - 1]):
+        return False
+    if end < len(text) and is_latin_letter(text[end - 1]) and is_latin_letter(text[end]):
+        return False
+    return True
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick 自动机
+    功能：一次扫描文本即可找出所有模式串，耗时与文本长度成线性关系
+    """
+
+    def __init__(self, patterns):
+        """
+        参数:
+        patterns: [(模式串, 值), ...]，匹配到模式串时返回对应的值
+        """
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+        for pattern, value in patterns:
+            if pattern:
+                self.add(pattern, value)
+        self.build_fail_links()
+
+    def add(self, pattern, value):
+        """向字典树中加入一个模式串"""
+        state = 0
+        for ch in pattern:
+            next_state = self.transitions[state].get(ch)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][ch] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append(value)
+
+    def build_fail_links(self):
+        """按层次遍历构造失配指针，并把失配链上的输出合并到当前状态"""
+        queue = list(self.transitions[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.transitions[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def iter_matches(self, text):
+        """扫描文本，依次产生 (结束位置, 值)"""
+        state = 0
+        transitions, fail, outputs = self.transitions, self.fail, self.outputs
+        for index, ch in enumerate(text):
+            while state and ch not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(ch, 0)
+            for value in outputs[state]:
+                yield index, value
+
+
+def within_edit_distance(pattern, text, max_edits):
+    """
+    判断 text 中是否存在与 pattern 编辑距离不超过 max_edits 的子串 (Sellers算法)
+
+    只允许替换和多出字符、不允许漏字：匹配的子串至少与 pattern 一样长，
+    否则 "器学习" 这样的残缺片段也会被当成 "机器学习"
+    """
+    m = len(pattern)
+    if m == 0:
+        return True
+
+    unreachable = m + 1
+    previous = [0] + [unreachable] * m
+    for ch in text:
+        current = [0] + [unreachable] * m
+        for i in range(1, m + 1):
+            cost = 0 if pattern[i - 1] == ch else 1
+            current[i] = min(previous[i - 1] + cost, previous[i] + 1)
+        if current[m] <= max_edits:
+            return True
+        previous = current
+    return False
+
+
+class KeywordMatcher:
+    """
+    关键词匹配器
+    功能：预先编译关键词，精确模式下用 Aho-Corasick 一次扫描全部OCR文字；
+    模糊模式下先按形近字表归一化，再允许少量编辑距离的误差；
+    短关键词在模糊模式下仍按原文精确匹配，英文短词还要求是完整的单词
+    """
+
+    LINE_SEPARATOR = '\n'
+
+    def __init__(self, keywords, fuzzy=False, max_edits=1, confusion_groups=CONFUSION_GROUPS,
+                 reachable_only=False):
+        """
+        初始化匹配器
+
+        参数:
+        keywords: 关键词列表
+        fuzzy: 是否启用模糊匹配
+        max_edits: 模糊匹配允许的最大编辑距离（短关键词会自动减少，少于 FUZZY_MIN_LENGTH 个字时精确匹配）
+        confusion_groups: 形近字分组
+        reachable_only: 只匹配字符足以组成某个关键词的文字行（受限识别时大部分行只剩数字和分隔符）
+        """
+        self.keywords = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+        self.fuzzy = fuzzy
+        self.max_edits = max(0, int(max_edits))
+        self.reachable_only = reachable_only
+        self.allowed_edits = {}
+
+        if not fuzzy:
+            self.exact_keywords = set(self.keywords)
+            self.automaton = AhoCorasick((keyword, keyword) for keyword in self.keywords)
+            self.keyword_chars = {keyword: frozenset(keyword) for keyword in self.keywords}
+            return
+
+        self.confusion_map = build_confusion_map(confusion_groups)
+        normalized = {keyword: self.normalize(keyword) for keyword in self.keywords}
+
+        # 短关键词：只统一全半角，保留大小写和原字，按原文精确匹配
+        self.exact_patterns = {keyword: unicodedata.normalize('NFKC', keyword)
+                               for keyword, norm in normalized.items() if len(norm) < FUZZY_MIN_LENGTH}
+        self.exact_keywords = set(self.exact_patterns)
+        self.exact_automaton = AhoCorasick((pattern, keyword)
+                                           for keyword, pattern in self.exact_patterns.items())
+
+        self.normalized = {keyword: norm for keyword, norm in normalized.items()
+                           if keyword not in self.exact_keywords}
+        self.automaton = AhoCorasick((norm, keyword) for keyword, norm in self.normalized.items())
+        self.keyword_chars = {keyword: frozenset(norm) for keyword, norm in self.normalized.items()}
+        self.keyword_chars.update((keyword, frozenset(pattern))
+                                  for keyword, pattern in self.exact_patterns.items())
+        # 编辑距离模式：关键词切成 k+1 段，有k处错误时至少有一段完整出现（鸽巢原理），
+        # 先用自动机找出包含某一段的行，再做编辑距离校验
+        pieces = []
+        for keyword, norm in self.normalized.items():
+            edits = min(self.max_edits, len(norm) // 4)
+            if edits <= 0:
+                continue
+            self.allowed_edits[keyword] = edits
+            size = len(norm) / float(edits + 1)
+            for part in range(edits + 1):
+                piece = norm[int(part * size):int((part + 1) * size)]
+                pieces.append((piece, keyword))
+        self.piece_automaton = AhoCorasick(pieces) if pieces else None
+
+    def normalize(self, text):
+        """统一全半角和大小写，去掉空白，并把形近字替换成代表字符"""
+        text = unicodedata.normalize('NFKC', text).casefold()
+        confusion_map = self.confusion_map
+        return ''.join(confusion_map.get(ch, ch) for ch in text if not ch.isspace())
+
+    def reachable_keywords(self, text):
+        """
+        文字行中的字符能组成的关键词
+
+        模糊模式下每处编辑最多让关键词缺少一种字符，缺少的字符种数不超过允许的编辑次数即可
+        """
+        raw_chars = set(unicodedata.normalize('NFKC', text) if self.fuzzy else text)
+        chars = set(self.normalize(text)) if self.fuzzy else raw_chars
+        return [keyword for keyword, needed in self.keyword_chars.items()
+                if len(needed - (raw_chars if keyword in self.exact_keywords else chars))
+                <= self.allowed_edits.get(keyword, 0)]
+
+    def find(self, texts):
+        """
+        在OCR结果中查找关键词
+
+        参数:
+        texts: OCR识别出的文字行列表
+
+        返回: 找到的关键词列表（按关键词配置顺序）
+        """
+        if not self.keywords or not texts:
+            return []
+        if self.reachable_only:
+            texts = [text for text in texts if self.reachable_keywords(text)]
+            if not texts:
+                return []
+
+        if not self.fuzzy:
+            joined = self.LINE_SEPARATOR.join(texts)
+            found = {keyword for _, keyword in self.automaton.iter_matches(joined)}
+            return [keyword for keyword in self.keywords if keyword in found]
+
+        lines = [self.normalize(text) for text in texts]
+        joined = self.LINE_SEPARATOR.join(lines)
+        found = {keyword for _, keyword in self.automaton.iter_matches(joined)}
+
+        if self.exact_keywords:
+            raw = unicodedata.normalize('NFKC', self.LINE_SEPARATOR.join(texts))
+            for end, keyword in self.exact_automaton.iter_matches(raw):
+                start = end + 1 - len(self.exact_patterns[keyword])
+                if at_word_boundary(raw, start, end + 1):
+                    found.add(keyword)
+
+        if self.piece_automaton is not None and len(found) < len(self.keywords):
+            for line in lines:
+                candidates = {keyword for _, keyword in self.piece_automaton.iter_matches(line)}
+                for keyword in candidates - found:
+                    if within_edit_distance(self.normalized[keyword], line,
+                                            self.allowed_edits[keyword]):
+                        found.add(keyword)
+
+        return [keyword for keyword in self.keywords if keyword in found]
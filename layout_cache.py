@@ -0,0 +1,105 @@
+# layout_cache.py
+# 文字框缓存 - 页面版面不变时复用上次检测到的文字框，只运行识别模型
+import cv2
+import numpy as np
+
+
+def find_runs(mask, max_gap=0):
+    """
+    找出布尔序列中连续为True的区段
+
+    参数:
+    mask: 一维布尔数组
+    max_gap: 间隔不超过该长度的相邻区段会被合并
+
+    返回: [(起点, 终点), ...]，终点不包含在区段内
+    """
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    runs = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if runs and start - runs[-1][1] <= max_gap:
+            runs[-1] = (runs[-1][0], int(end))
+        else:
+            runs.append((int(start), int(end)))
+    return runs
+
+
+def layout_signature(image, thumb_width=128, ink_delta=48, quantum=2):
+    """
+    计算图像的版面签名
+
+    在缩略图上找出每一行文字所在的区段，以及该行内各段文字的左右边界，
+    量化后组成元组。文字内容改变但位置不变时签名不变，文字行移动或变长变短时签名改变。
+    """
+    height, width = image.shape[:2]
+    if width > thumb_width:
+        thumb_height = max(1, int(height * thumb_width / width))
+        image = cv2.resize(image, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
+
+    background = int(np.median(image))
+    ink = np.abs(image.astype(np.int16) - background) > ink_delta
+
+    signature = []
+    for top, bottom in find_runs(ink.any(axis=1)):
+        segments = find_runs(ink[top:bottom].any(axis=0), max_gap=2)
+        signature.append((top // quantum, bottom // quantum,
+                          tuple((left // quantum, right // quantum) for left, right in segments)))
+    return tuple(signature)
+
+
+class TextBoxCache:
+    """
+    文字框缓存
+    功能：记录上次文字检测(CRAFT)得到的文字框和对应的版面签名，
+    版面签名不变时直接复用文字框，跳过最耗时的检测步骤
+    """
+
+    def __init__(self, refresh_checks=30):
+        """
+        初始化缓存
+
+        参数:
+        refresh_checks: 连续复用多少次后强制重新检测一次
+        """
+        self.refresh_checks = max(1, int(refresh_checks))
+        self.signature = None
+        self.shape = None
+        self.boxes = None  # (horizontal_list, free_list)
+        self.uses = 0
+
+        # 统计
+        self.detect_count = 0
+        self.reuse_count = 0
+
+    def lookup(self, image):
+        """版面未变化时返回缓存的文字框，否则返回None"""
+        signature = layout_signature(image)
+        if (self.boxes is not None and signature == self.signature
+                and image.shape == self.shape and self.uses < self.refresh_checks):
+            self.uses += 1
+            self.reuse_count += 1
+            return self.boxes
+
+        self.signature = signature
+        self.shape = image.shape
+        self.boxes = None
+        return None
+
+    def store(self, boxes):
+        """保存刚检测到的文字框"""
+        self.boxes = boxes
+        self.uses = 0
+        self.detect_count += 1
+
+    def reuse_ratio(self):
+        """文字框复用比例"""
+        total = self.detect_count + self.reuse_count
+        return self.reuse_count / total if total else 0.0
+
+    def reset(self):
+        """清空缓存"""
+        self.signature = None
+        self.shape = None
+        self.boxes = None
+        self.uses = 0
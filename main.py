@@ -5,7 +5,6 @@
 
 import sys
 import os
-import time
 import threading
 import keyboard
 
@@ -15,6 +14,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # 导入核心模块
 from course_monitor import CourseMonitor, check_dependencies as check_monitor_deps
 from continuous_clicker import ContinuousClicker, check_dependencies as check_clicker_deps
+from ocr_warmup import OCRWarmup
+from ocr_engines import engine_from_config
+from metrics import MetricsRegistry
 import config
 
 
@@ -28,21 +30,25 @@ class IntegratedApp:
         self.course_monitor = None
         self.clicker = None
         self.is_running = False
-        self.stop_event = threading.Event()
+        self.stop_event = threading.Event()  # 退出请求，主线程等待该事件
         self.has_shown_stop_message = False  # 新增：标记是否已经显示过停止消息
+        self.ocr_warmup = None  # OCR后台预热任务
 
         # 从配置文件加载设置
         self.course_config = config.COURSE_MONITOR_CONFIG.copy()
         self.clicker_config = config.CLICKER_CONFIG.copy()
         self.feature_switches = config.FEATURE_SWITCHES.copy()
 
+        # 课程检测和鼠标连点共用一个指标注册表和指标接口
+        self.metrics = MetricsRegistry(enabled=self.course_config.get('metrics', True))
+
     def check_all_dependencies(self):
         """检查所有必要的Python库"""
         print("检查运行环境...")
 
         # 检查课程检测依赖
         print("\n[课程检测模块依赖]")
-        monitor_ok = check_monitor_deps()
+        monitor_ok = check_monitor_deps(self.course_config.get('ocr_engine', 'easyocr'))
 
         # 检查鼠标连点依赖
         print("\n[鼠标连点模块依赖]")
@@ -120,7 +126,9 @@ class IntegratedApp:
         print("提示：如需修改点击间隔，请在 config.py 中调整 CLICKER_CONFIG['click_interval']")
         print("-" * 40)
 
-        # 创建点击器实例
+        # 创建点击器实例（每次点击后通知课程检测页面已刷新）
+        self.clicker_config['on_click'] = self.on_refresh_click
+        self.clicker_config['metrics_registry'] = self.metrics
         self.clicker = ContinuousClicker(self.clicker_config)
 
         # 设置点击位置（不启动）
@@ -150,25 +158,43 @@ class IntegratedApp:
         if self.feature_switches['enable_clicker']:
             # 如果启用了点击器，设置回调函数
             self.course_config['on_target_detected'] = self.on_course_detected
+            if self.course_config.get('click_sync', False):
+                print("点击同步检查: 每次点击刷新后等页面稳定再识别")
         else:
             self.course_config['on_target_detected'] = None
+            # 没有连点器就没有刷新点击可以同步
+            self.course_config['click_sync'] = False
 
+        self.course_config['ocr_warmup'] = self.ocr_warmup
+        self.course_config['metrics_registry'] = self.metrics
         self.course_monitor = CourseMonitor(self.course_config)
         return True
 
-    def on_course_detected(self):
-        """课程检测到目标时的回调函数"""
+    def on_course_detected(self, matches=None):
+        """
+        课程检测到目标时的回调函数
+
+        参数:
+        matches: {区域名称: [找到的关键词, ...]}
+        """
         # 停止鼠标连点
         if self.clicker and self.clicker.is_clicking:
             # 只显示一次停止消息
             if not self.has_shown_stop_message:
                 print("\n" + "=" * 60)
                 print("⚠️  检测到目标课程，正在停止鼠标连点...")
+                for name, keywords in (matches or {}).items():
+                    print(f"   {name}: {', '.join(keywords)}")
                 print("=" * 60)
                 self.has_shown_stop_message = True
 
             self.clicker.stop_clicking()
 
+    def on_refresh_click(self):
+        """鼠标连点每次点击刷新后的回调函数"""
+        if self.course_monitor:
+            self.course_monitor.notify_refresh()
+
     def run_features(self):
         """运行启用的功能"""
         print("\n" + "=" * 60)
@@ -189,11 +215,7 @@ class IntegratedApp:
                 print("\n正在启动鼠标连点功能...")
                 # 注意：这里直接调用点击器的内部方法，而不是start_clicking（避免重复设置位置）
                 if not self.clicker.is_clicking:
-                    self.clicker.is_clicking = True
-                    # 在新线程中启动点击循环
-                    self.clicker.click_thread = threading.Thread(target=self.clicker.click_loop)
-                    self.clicker.click_thread.daemon = True
-                    self.clicker.click_thread.start()
+                    self.clicker.start_click_loop()
                     print("✓ 鼠标连点已启动")
 
         # 如果只启用了鼠标连点，没有启用课程检测
@@ -227,10 +249,20 @@ class IntegratedApp:
             print("pip install pyautogui keyboard easyocr opencv-python pillow numpy")
             sys.exit(1)
 
+        # 在用户选择功能、设置点击位置的同时，后台加载并预热OCR模型
+        if self.course_config.get('background_warmup', True):
+            self.ocr_warmup = OCRWarmup(self.course_config.get('use_gpu', False),
+                                        self.course_config.get('image_scale', 0.7),
+                                        *engine_from_config(self.course_config)).start()
+
         # 询问用户启用哪些功能
         if not self.ask_feature_enable():
             return
 
+        # 未启用课程检测时不再持有预热的模型
+        if not self.feature_switches['enable_course_monitor']:
+            self.ocr_warmup = None
+
         # 设置鼠标连点功能
         if self.feature_switches['enable_clicker']:
             if not self.setup_clicker():
@@ -243,19 +275,31 @@ class IntegratedApp:
                 print("课程检测功能设置失败")
                 return
 
+        # 启动指标接口/JSONL输出（按 COURSE_MONITOR_CONFIG 中的设置）
+        self.metrics.start_exporters(port=self.course_config.get('metrics_port', None),
+                                     jsonl_path=self.course_config.get('metrics_jsonl', None),
+                                     jsonl_interval=self.course_config.get('metrics_jsonl_interval', 10))
+
         # 运行启用的功能
         self.run_features()
 
         # 设置全局退出快捷键
         keyboard.add_hotkey('ctrl+alt+q', self.quit)
 
-        # 保持程序运行
+        # 保持程序运行：主线程等待退出事件，按下快捷键后立即退出
+        # （分段等待是为了在 Windows 上也能及时响应 Ctrl+C）
         try:
-            keyboard.wait()
+            while not self.stop_event.wait(0.5):
+                pass
         except KeyboardInterrupt:
-            self.quit()
+            pass
+        self.shutdown()
 
     def quit(self):
+        """请求退出程序（在快捷键线程中调用，由主线程完成清理并退出）"""
+        self.stop_event.set()
+
+    def shutdown(self):
         """安全退出程序"""
         print("\n" + "=" * 60)
         print("正在退出整合版选课助手...")
@@ -269,8 +313,10 @@ class IntegratedApp:
         if self.course_monitor and self.course_monitor.is_monitoring:
             self.course_monitor.stop_monitoring()
             print("✓ 课程检测已停止")
+        if self.course_monitor:
+            self.course_monitor.close()
+        self.metrics.close()
 
-        time.sleep(1)
         print("\n感谢使用！")
         print("=" * 60)
         sys.exit(0)
@@ -0,0 +1,287 @@
+# metrics.py
+# 运行指标 - 低开销的分阶段耗时直方图，可通过本机HTTP接口(Prometheus文本/JSON)或JSONL文件查看
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 每个2倍区间细分的桶数为 2^SUB_BITS，相对误差约 1/32
+SUB_BITS = 5
+SUB_COUNT = 1 << SUB_BITS
+LINEAR_LIMIT = SUB_COUNT * 2
+
+# Prometheus 输出使用的桶上界(秒)
+PROMETHEUS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                      0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def bucket_index(value):
+    """微秒值所在的桶序号：小于64微秒逐一计数，之后每个2倍区间分32个桶"""
+    if value < LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - (SUB_BITS + 1)
+    return LINEAR_LIMIT + (shift - 1) * SUB_COUNT + ((value >> shift) - SUB_COUNT)
+
+
+def bucket_bounds(index):
+    """桶序号对应的微秒值范围 [下界, 上界)"""
+    if index < LINEAR_LIMIT:
+        return index, index + 1
+    shift = (index - LINEAR_LIMIT) // SUB_COUNT + 1
+    mantissa = (index - LINEAR_LIMIT) % SUB_COUNT + SUB_COUNT
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class LatencyHistogram:
+    """
+    HDR风格的耗时直方图
+    功能：按对数-线性分桶记录耗时(微秒精度)，记录一次只是一次字典计数，
+    可以在任意时刻计算分位数
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        """记录一次耗时(秒)"""
+        index = bucket_index(max(0, int(seconds * 1e6)))
+        with self.lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, percent):
+        """估算分位数(秒)，取所在桶的中点"""
+        with self.lock:
+            if not self.count:
+                return 0.0
+            rank = percent / 100.0 * self.count
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= rank:
+                    low, high = bucket_bounds(index)
+                    return min(self.max, (low + high) / 2 / 1e6)
+            return self.max
+
+    def cumulative(self, limits):
+        """按给定上界(秒)统计累计次数，用于 Prometheus 直方图"""
+        with self.lock:
+            items = sorted(self.counts.items())
+        result = []
+        for limit in limits:
+            limit_us = limit * 1e6
+            result.append(sum(count for index, count in items if bucket_bounds(index)[1] <= limit_us))
+        return result
+
+    def summary(self):
+        """汇总信息，耗时单位为毫秒"""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3),
+            'min_ms': round(self.min * 1000, 3),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p90_ms': round(self.percentile(90) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'p999_ms': round(self.percentile(99.9) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class StageTimer:
+    """计时上下文：with metrics.time('阶段名'): ..."""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class NullTimer:
+    """关闭指标时使用的空计时上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+    功能：按阶段名保存耗时直方图，并汇总各模块登记的计数(检查次数、报警次数等)；
+    可启动本机HTTP接口和JSONL文件输出
+    """
+
+    def __init__(self, enabled=True, prefix='course'):
+        """
+        参数:
+        enabled: 是否记录，关闭时计时调用几乎没有开销
+        prefix: Prometheus 指标名前缀
+        """
+        self.enabled = enabled
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.collectors = []  # 返回 {名称: 数值} 的函数
+        self.server = None
+        self.sink_thread = None
+        self.stop_event = threading.Event()
+
+    def histogram(self, name):
+        """获取(必要时创建)指定阶段的直方图"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def time(self, name):
+        """返回计时上下文"""
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(self.histogram(name))
+
+    def observe(self, name, seconds):
+        """直接记录一次耗时(秒)"""
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def add_collector(self, collector):
+        """登记计数来源，collector() 返回 {名称: 数值}"""
+        self.collectors.append(collector)
+
+    def collect_counters(self):
+        """汇总所有计数"""
+        counters = {}
+        for collector in self.collectors:
+            try:
+                counters.update(collector())
+            except Exception:
+                pass
+        return counters
+
+    def snapshot(self):
+        """当前全部指标，供JSON输出"""
+        with self.lock:
+            names = sorted(self.histograms)
+        return {
+            'timestamp': time.time(),
+            'stages': {name: self.histograms[name].summary() for name in names},
+            'counters': self.collect_counters(),
+        }
+
+    def prometheus_text(self):
+        """Prometheus 文本格式"""
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Per-stage latency in seconds.",
+                 f"# TYPE {name} histogram"]
+        with self.lock:
+            items = sorted(self.histograms.items())
+        for stage, histogram in items:
+            for limit, count in zip(PROMETHEUS_BUCKETS, histogram.cumulative(PROMETHEUS_BUCKETS)):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{limit}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+        for counter, value in sorted(self.collect_counters().items()):
+            lines.append(f"{self.prefix}_{counter} {value}")
+        return "\n".join(lines) + "\n"
+
+    def start_server(self, port, host='127.0.0.1'):
+        """在后台线程启动HTTP接口：/metrics 为 Prometheus 文本，/metrics.json 为JSON"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body = json.dumps(registry.snapshot(), ensure_ascii=False).encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                elif self.path.startswith('/metrics'):
+                    body = registry.prometheus_text().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self.server
+
+    def start_jsonl_sink(self, path, interval=10.0):
+        """在后台线程中每隔 interval 秒把指标快照追加写入JSONL文件"""
+        def write_loop():
+            with open(path, 'a', encoding='utf-8') as sink:
+                while not self.stop_event.wait(interval):
+                    sink.write(json.dumps(self.snapshot(), ensure_ascii=False) + "\n")
+                    sink.flush()
+                sink.write(json.dumps(self.snapshot(), ensure_ascii=False) + "\n")
+
+        self.sink_thread = threading.Thread(target=write_loop)
+        self.sink_thread.daemon = True
+        self.sink_thread.start()
+
+    def start_exporters(self, port=None, jsonl_path=None, jsonl_interval=10.0, verbose=True):
+        """按配置启动HTTP接口和JSONL输出"""
+        if not self.enabled:
+            return
+        if port and self.server is None:
+            try:
+                self.start_server(port)
+                if verbose:
+                    print(f"✓ 指标接口: http://127.0.0.1:{port}/metrics (JSON: /metrics.json)")
+            except OSError as e:
+                print(f"[警告] 指标接口启动失败: {e}")
+        if jsonl_path and self.sink_thread is None:
+            self.start_jsonl_sink(jsonl_path, jsonl_interval)
+            if verbose:
+                print(f"✓ 指标每{jsonl_interval}秒写入: {jsonl_path}")
+
+    def close(self):
+        """停止HTTP接口和JSONL输出"""
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.sink_thread is not None:
+            self.sink_thread.join(timeout=2.0)
+            self.sink_thread = None
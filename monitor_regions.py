@@ -0,0 +1,91 @@
+# monitor_regions.py
+# 多区域监控 - 每个区域有自己的名称、坐标和关键词，截图一次后分别裁剪
+import cv2
+import numpy as np
+
+from frame_change import DEFAULT_CHANGE_THRESHOLD, FrameChangeDetector
+from keyword_matcher import KeywordMatcher
+
+
+class MonitorRegion:
+    """
+    单个监控区域
+    功能：保存区域坐标、关键词和该区域自己的画面变化检测、识别结果缓存
+    """
+
+    def __init__(self, name, bbox=None, keywords=None, change_threshold=DEFAULT_CHANGE_THRESHOLD):
+        """
+        参数:
+        name: 区域名称，如 "课程列表"、"课余量"、"通知栏"
+        bbox: 区域坐标 (left, top, right, bottom)，None 表示启动时手动框选
+        keywords: 该区域的关键词列表，None 表示使用全局关键词
+        change_threshold: 画面变化检测阈值
+        """
+        self.name = name
+        self.bbox = tuple(int(v) for v in bbox) if bbox else None
+        self.keywords = list(keywords) if keywords else None
+        self.change_detector = FrameChangeDetector(threshold=change_threshold)
+        self.matcher = None
+        self.last_texts = []
+        self.last_alert_time = 0
+
+    @classmethod
+    def from_config(cls, index, item, change_threshold=DEFAULT_CHANGE_THRESHOLD):
+        """从配置项创建区域，配置项可以是字典或 (left, top, right, bottom) 元组"""
+        if isinstance(item, dict):
+            return cls(item.get('name', f"区域{index + 1}"), item.get('bbox'),
+                       item.get('keywords'), change_threshold)
+        return cls(f"区域{index + 1}", item, None, change_threshold)
+
+    def build_matcher(self, default_keywords, fuzzy=False, max_edits=1, reachable_only=False):
+        """编译该区域的关键词匹配器"""
+        self.matcher = KeywordMatcher(self.keywords or default_keywords, fuzzy=fuzzy,
+                                      max_edits=max_edits, reachable_only=reachable_only)
+
+    def reset(self):
+        """重置缓存和统计"""
+        self.change_detector.reset()
+        self.last_texts = []
+        self.last_alert_time = 0
+
+
+def union_bbox(regions):
+    """计算所有区域的外接矩形"""
+    return (min(r.bbox[0] for r in regions), min(r.bbox[1] for r in regions),
+            max(r.bbox[2] for r in regions), max(r.bbox[3] for r in regions))
+
+
+def crop_regions(image, regions, origin, scale):
+    """
+    从外接矩形的截图中裁剪出各个区域（返回视图，不拷贝）
+
+    参数:
+    image: 外接矩形区域预处理后的图像
+    regions: MonitorRegion 列表
+    origin: 外接矩形左上角的屏幕坐标
+    scale: 预处理时的缩放比例
+    """
+    height, width = image.shape[:2]
+    crops = []
+    for region in regions:
+        left, top, right, bottom = region.bbox
+        x1 = min(width, int((left - origin[0]) * scale))
+        y1 = min(height, int((top - origin[1]) * scale))
+        x2 = min(width, max(x1 + 1, int((right - origin[0]) * scale)))
+        y2 = min(height, max(y1 + 1, int((bottom - origin[1]) * scale)))
+        crops.append(image[y1:y2, x1:x2])
+    return crops
+
+
+def pad_to_same_size(images):
+    """
+    把一组灰度图像用背景色填充到相同尺寸（不缩放，保证文字大小不变），以便批量推理
+    """
+    height = max(image.shape[0] for image in images)
+    width = max(image.shape[1] for image in images)
+    padded = []
+    for image in images:
+        background = int(np.median(image)) if image.size else 255
+        padded.append(cv2.copyMakeBorder(image, 0, height - image.shape[0], 0, width - image.shape[1],
+                                         cv2.BORDER_CONSTANT, value=background))
+    return padded
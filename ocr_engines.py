@@ -0,0 +1,380 @@
+# ocr_engines.py
+# OCR引擎 - 统一的文字检测/识别接口，默认使用 easyocr，也可以使用导出并int8量化的ONNX模型
+import json
+import math
+import os
+
+import cv2
+import numpy as np
+
+# easyocr 的 CRAFT 检测模型输入按 ImageNet 均值/方差归一化
+CRAFT_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32) * 255.0
+CRAFT_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32) * 255.0
+
+# 导出的模型文件（export_ocr_models.py 生成）
+ONNX_METADATA_FILE = 'model.json'
+ONNX_DETECTOR_FILES = ('detector.int8.onnx', 'detector.onnx')
+ONNX_RECOGNIZER_FILES = ('recognizer.int8.onnx', 'recognizer.onnx')
+
+
+class OCREngine:
+    """
+    OCR引擎基类
+
+    结果格式与 easyocr 一致：readtext() 返回 [(box, text, confidence), ...]，box 为四个角点；
+    detect() 返回 (horizontal_list, free_list)，horizontal_list 中每项为 [x_min, x_max, y_min, y_max]，
+    可以原样交给 recognize()，用于文字框缓存（版面不变时跳过检测）。
+    识别方法的 allowlist 参数为字符白名单字符串，给出时只在这些字符中解码（受限识别）
+    """
+
+    name = 'base'
+
+    def detect(self, image):
+        """检测文字框，返回 (horizontal_list, free_list)"""
+        raise NotImplementedError
+
+    def recognize(self, image, horizontal_list, free_list, allowlist=None):
+        """识别给定的文字框，返回 [(box, text, confidence), ...]"""
+        raise NotImplementedError
+
+    def readtext(self, image, allowlist=None):
+        """检测并识别一幅灰度图像"""
+        horizontal_list, free_list = self.detect(image)
+        if not horizontal_list and not free_list:
+            return []
+        return self.recognize(image, horizontal_list, free_list, allowlist)
+
+    def readtext_batched(self, images, allowlist=None):
+        """识别多幅同样大小的图像，返回每幅图像的结果列表"""
+        return [self.readtext(image, allowlist) for image in images]
+
+    def close(self):
+        """释放引擎资源"""
+
+
+class EasyOCREngine(OCREngine):
+    """easyocr 引擎（原有实现，PyTorch 模型）"""
+
+    name = 'easyocr'
+
+    def __init__(self, use_gpu=False, lang_list=('ch_sim', 'en'), verbose=False):
+        import easyocr
+        self.reader = easyocr.Reader(lang_list=list(lang_list), gpu=use_gpu, verbose=verbose)
+
+    def detect(self, image):
+        horizontal_list, free_list = self.reader.detect(image)
+        return horizontal_list[0], free_list[0]
+
+    def recognize(self, image, horizontal_list, free_list, allowlist=None):
+        return self.reader.recognize(image, horizontal_list=horizontal_list, free_list=free_list,
+                                     allowlist=allowlist)
+
+    def readtext(self, image, allowlist=None):
+        return self.reader.readtext(image, allowlist=allowlist)
+
+    def readtext_batched(self, images, allowlist=None):
+        return self.reader.readtext_batched(images, allowlist=allowlist)
+
+
+def find_craft_boxes(score_text, score_link, text_threshold=0.7, link_threshold=0.4, low_text=0.4):
+    """
+    从 CRAFT 的字符得分图和连接得分图中找出文字块（与 easyocr 的后处理一致，只保留水平框）
+
+    返回: [(x_min, y_min, x_max, y_max), ...]，坐标为得分图坐标
+    """
+    height, width = score_text.shape
+    text_mask = score_text > low_text
+    link_mask = score_link > link_threshold
+    combined = np.logical_or(text_mask, link_mask).astype(np.uint8)
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(combined, connectivity=4)
+
+    boxes = []
+    for index in range(1, count):
+        x, y, w, h, size = stats[index]
+        if size < 10:
+            continue
+        if score_text[labels == index].max() < text_threshold:
+            continue
+        # 按连通域大小向外扩展，补上得分图边缘被截掉的笔画
+        grow = int(math.sqrt(size * min(w, h) / float(w * h)) * 2)
+        boxes.append((max(0, x - grow), max(0, y - grow),
+                      min(width, x + w + grow + 1), min(height, y + h + grow + 1)))
+    return boxes
+
+
+def group_line_boxes(boxes, ycenter_ths=0.5, height_ths=0.5, width_ths=0.5, margin=0.1):
+    """
+    把同一行中相邻的文字块合并成一个文字框（对应 easyocr 的 group_text_box）
+
+    参数:
+    boxes: [(x_min, y_min, x_max, y_max), ...]
+    ycenter_ths: 中心高度差小于 行高×该值 时视为同一行
+    height_ths: 高度差小于 行高×该值 时视为同一行
+    width_ths: 水平间隔小于 行高×该值 时合并
+    margin: 合并后的框向外扩展 行高×该值
+
+    返回: [[x_min, x_max, y_min, y_max], ...]（easyocr 的 horizontal_list 格式）
+    """
+    lines = []
+    for box in sorted(boxes, key=lambda b: (b[1] + b[3]) / 2.0):
+        x_min, y_min, x_max, y_max = box
+        center, height = (y_min + y_max) / 2.0, y_max - y_min
+        if lines:
+            line = lines[-1]
+            line_center = sum((b[1] + b[3]) / 2.0 for b in line) / len(line)
+            line_height = sum(b[3] - b[1] for b in line) / len(line)
+            if (abs(center - line_center) < ycenter_ths * line_height
+                    and abs(height - line_height) < height_ths * line_height):
+                line.append(box)
+                continue
+        lines.append([box])
+
+    merged = []
+    for line in lines:
+        line.sort(key=lambda b: b[0])
+        group = [line[0]]
+        for box in line[1:]:
+            height = max(b[3] for b in group) - min(b[1] for b in group)
+            if box[0] - max(b[2] for b in group) < width_ths * height:
+                group.append(box)
+            else:
+                merged.append(group)
+                group = [box]
+        merged.append(group)
+
+    horizontal_list = []
+    for group in merged:
+        x_min, x_max = min(b[0] for b in group), max(b[2] for b in group)
+        y_min, y_max = min(b[1] for b in group), max(b[3] for b in group)
+        pad = int(margin * (y_max - y_min))
+        horizontal_list.append([x_min - pad, x_max + pad, y_min - pad, y_max + pad])
+    horizontal_list.sort(key=lambda b: (b[2], b[0]))
+    return horizontal_list
+
+
+def ctc_greedy_decode(indices, scores, characters):
+    """
+    CTC 贪心解码：合并连续重复的字符并去掉空白(序号0)
+
+    参数:
+    indices: 每个时间步概率最大的序号
+    scores: 每个非空白时间步所选字符的概率（按时间步顺序）
+    characters: 字符表，序号 i 对应 characters[i - 1]
+
+    返回: (文字, 置信度)，置信度的算法与 easyocr 相同
+    """
+    chars = []
+    previous = 0
+    for index in indices:
+        if index != 0 and index != previous:
+            chars.append(characters[index - 1])
+        previous = index
+
+    if not len(scores):
+        return '', 0.0
+    confidence = float(np.prod(scores) ** (2.0 / math.sqrt(len(scores))))
+    return ''.join(chars), confidence
+
+
+class OnnxOCREngine(OCREngine):
+    """
+    ONNX Runtime 引擎
+    功能：加载由 easyocr 导出的 CRAFT 检测模型和 CRNN 识别模型（优先使用 int8 量化版本），
+    不需要 PyTorch，启动快、内存占用小；前后处理与 easyocr 保持一致
+    """
+
+    name = 'onnx'
+
+    def __init__(self, use_gpu=False, model_dir='onnx_models', threads=None, quantized=True,
+                 canvas_size=2560, text_threshold=0.7, link_threshold=0.4, low_text=0.4,
+                 batch_size=16, verbose=False):
+        """
+        参数:
+        use_gpu: 有 CUDAExecutionProvider 时使用GPU
+        model_dir: 模型目录（export_ocr_models.py 的输出目录）
+        threads: 每个模型的计算线程数，None 表示由 ONNX Runtime 决定
+        quantized: 是否优先使用 int8 量化模型
+        canvas_size: 检测输入的最长边上限
+        text_threshold / link_threshold / low_text: CRAFT 后处理阈值，与 easyocr 默认值相同
+        batch_size: 一次送入识别模型的文字框个数上限
+        """
+        import onnxruntime
+
+        metadata_path = os.path.join(model_dir, ONNX_METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            raise FileNotFoundError(f"找不到ONNX模型说明文件 {metadata_path}，"
+                                    f"请先运行 python export_ocr_models.py")
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+
+        self.characters = metadata['characters']
+        self.image_height = metadata.get('image_height', 64)
+        # 不属于所选语言的字符不参与解码（与 easyocr 的 ignore_idx 相同）
+        self.lang_characters = set(metadata.get('lang_characters') or self.characters)
+        self.decoders = {}  # 白名单 -> (参与解码的列, 对应字符表)
+        self.lang_columns = self.decoder_for(None)[0]
+
+        self.canvas_size = canvas_size
+        self.text_threshold = text_threshold
+        self.link_threshold = link_threshold
+        self.low_text = low_text
+        self.batch_size = max(1, int(batch_size))
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = int(threads)
+        providers = ['CPUExecutionProvider']
+        if use_gpu and 'CUDAExecutionProvider' in onnxruntime.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+
+        self.detector_path = self.find_model(model_dir, ONNX_DETECTOR_FILES, quantized)
+        self.recognizer_path = self.find_model(model_dir, ONNX_RECOGNIZER_FILES, quantized)
+        self.detector = onnxruntime.InferenceSession(self.detector_path, options, providers=providers)
+        self.recognizer = onnxruntime.InferenceSession(self.recognizer_path, options,
+                                                       providers=providers)
+        self.detector_input = self.detector.get_inputs()[0].name
+        self.recognizer_input = self.recognizer.get_inputs()[0].name
+        if verbose:
+            print(f"ONNX模型: {os.path.basename(self.detector_path)}, "
+                  f"{os.path.basename(self.recognizer_path)} ({', '.join(providers)})")
+
+    @staticmethod
+    def find_model(model_dir, candidates, quantized):
+        """按优先顺序查找模型文件"""
+        if not quantized:
+            candidates = candidates[1:]
+        for filename in candidates:
+            path = os.path.join(model_dir, filename)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"在 {model_dir} 中找不到模型文件: {', '.join(candidates)}")
+
+    def detect(self, image):
+        height, width = image.shape[:2]
+        ratio = min(1.0, self.canvas_size / float(max(height, width)))
+        target_w, target_h = max(1, int(width * ratio)), max(1, int(height * ratio))
+
+        # 缩放到目标尺寸后右下补零到32的倍数，归一化为 NCHW
+        rgb = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB) if image.ndim == 2 else image
+        if (target_w, target_h) != (width, height):
+            rgb = cv2.resize(rgb, (target_w, target_h), interpolation=cv2.INTER_LINEAR)
+        canvas = np.zeros((-(-target_h // 32) * 32, -(-target_w // 32) * 32, 3), dtype=np.float32)
+        canvas[:target_h, :target_w] = (rgb - CRAFT_MEAN) / CRAFT_STD
+        tensor = canvas.transpose(2, 0, 1)[np.newaxis]
+
+        scores = self.detector.run(None, {self.detector_input: tensor})[0][0]
+        boxes = find_craft_boxes(scores[:, :, 0], scores[:, :, 1], self.text_threshold,
+                                 self.link_threshold, self.low_text)
+
+        # 得分图是输入的一半大小
+        factor = 2.0 / ratio
+        boxes = [(int(x0 * factor), int(y0 * factor), int(math.ceil(x1 * factor)),
+                  int(math.ceil(y1 * factor))) for x0, y0, x1, y1 in boxes]
+        horizontal_list = [[max(0, x0), min(width, x1), max(0, y0), min(height, y1)]
+                           for x0, x1, y0, y1 in group_line_boxes(boxes)]
+        return [box for box in horizontal_list if box[1] > box[0] and box[3] > box[2]], []
+
+    def prepare_crop(self, image, box):
+        """裁剪文字框并缩放到识别模型的输入高度，返回 float32 图像"""
+        x_min, x_max, y_min, y_max = box
+        crop = image[y_min:y_max, x_min:x_max]
+        if crop.ndim == 3:
+            crop = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+        height, width = crop.shape
+        new_width = max(1, int(math.ceil(self.image_height * width / float(height))))
+        crop = cv2.resize(crop, (new_width, self.image_height), interpolation=cv2.INTER_CUBIC)
+        return (crop.astype(np.float32) / 255.0 - 0.5) / 0.5
+
+    def decoder_for(self, allowlist):
+        """按白名单得到参与解码的列（第0列为空白）和对应的字符表，结果缓存"""
+        decoder = self.decoders.get(allowlist)
+        if decoder is None:
+            allowed = set(allowlist) if allowlist else None
+            columns, characters = [0], []
+            for index, ch in enumerate(self.characters):
+                if ch in self.lang_characters and (allowed is None or ch in allowed):
+                    columns.append(index + 1)
+                    characters.append(ch)
+            decoder = (np.array(columns, dtype=np.int64), characters)
+            self.decoders[allowlist] = decoder
+        return decoder
+
+    def decode(self, logits, decoder):
+        """
+        把识别模型的输出 (时间步, 字符数+1) 解码为 (文字, 置信度)
+
+        只在白名单的列中取最大值；概率仍按所选语言的全部字符归一化，
+        白名单外的字被强行认成白名单内的字时置信度会很低，可以据此丢弃
+        """
+        columns, characters = decoder
+        indices = logits[:, columns].argmax(axis=1)
+        steps = np.flatnonzero(indices)
+        if not len(steps):
+            return '', 0.0
+
+        full = logits[np.ix_(steps, self.lang_columns)]
+        peak = full.max(axis=1)
+        chosen = logits[steps, columns[indices[steps]]]
+        scores = np.exp(chosen - peak) / np.exp(full - peak[:, np.newaxis]).sum(axis=1)
+        return ctc_greedy_decode(indices, scores, characters)
+
+    def recognize(self, image, horizontal_list, free_list, allowlist=None):
+        boxes = [box for box in horizontal_list if box[1] > box[0] and box[3] > box[2]]
+        decoder = self.decoder_for(allowlist)
+        results = []
+        for start in range(0, len(boxes), self.batch_size):
+            batch = boxes[start:start + self.batch_size]
+            crops = [self.prepare_crop(image, box) for box in batch]
+
+            # 宽度不同的文字框右侧用最后一列补齐（与 easyocr 的 NormalizePAD 相同）
+            max_width = max(crop.shape[1] for crop in crops)
+            tensor = np.empty((len(crops), 1, self.image_height, max_width), dtype=np.float32)
+            for index, crop in enumerate(crops):
+                width = crop.shape[1]
+                tensor[index, 0, :, :width] = crop
+                tensor[index, 0, :, width:] = crop[:, -1:]
+
+            outputs = self.recognizer.run(None, {self.recognizer_input: tensor})[0]
+            for (x_min, x_max, y_min, y_max), logits in zip(batch, outputs):
+                text, confidence = self.decode(logits, decoder)
+                box = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+                results.append((box, text, confidence))
+        return results
+
+
+OCR_ENGINES = {
+    'easyocr': EasyOCREngine,
+    'onnx': OnnxOCREngine,
+}
+
+# 各引擎需要的 (模块名, pip包名)
+OCR_ENGINE_PACKAGES = {
+    'easyocr': ('easyocr', 'easyocr'),
+    'onnx': ('onnxruntime', 'onnxruntime'),
+}
+
+
+def engine_from_config(config):
+    """
+    从配置字典中读取OCR引擎设置
+
+    返回: (引擎名称, 创建参数字典)，参数不含 use_gpu，可以传给其他进程
+    """
+    name = config.get('ocr_engine', 'easyocr')
+    options = {}
+    if name == 'onnx':
+        options = {
+            'model_dir': config.get('onnx_model_dir', 'onnx_models'),
+            'threads': config.get('onnx_threads', None) or config.get('ocr_threads', None),
+            'quantized': config.get('onnx_quantized', True),
+        }
+    return name, options
+
+
+def create_ocr_engine(name='easyocr', use_gpu=False, **options):
+    """按名称创建OCR引擎"""
+    engine_class = OCR_ENGINES.get(name)
+    if engine_class is None:
+        raise ValueError(f"未知的OCR引擎: {name} (可选: {', '.join(OCR_ENGINES)})")
+    return engine_class(use_gpu=use_gpu, **options)
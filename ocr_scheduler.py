@@ -0,0 +1,154 @@
+# ocr_scheduler.py
+# 公平OCR调度 - 多个监控会话共用一个OCR引擎和一个OCR线程，按会话轮流识别
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+
+class FairOCRScheduler:
+    """
+    公平OCR调度器
+    功能：每个会话有自己的请求队列，唯一的OCR线程按轮转顺序每次从下一个有请求的会话中取一个请求执行，
+    请求多的会话不会让其他会话一直等待：一个请求最多等待其他每个会话各一次识别；
+    OCR引擎只在这一个线程中使用，不需要线程安全
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.queues = collections.OrderedDict()  # 会话名称 -> deque[(future, function, args, 提交时刻)]
+        self.metrics = {}  # 会话名称 -> 指标注册表(可为None)
+        self.next_index = 0
+        self.closed = False
+        self.thread = None
+
+        # 按会话统计（秒）
+        self.served = collections.Counter()
+        self.busy = collections.Counter()
+        self.waited = collections.Counter()
+        self.started_at = None
+
+    def start(self):
+        """启动OCR线程，返回自身便于链式调用"""
+        if self.thread is None:
+            self.started_at = time.monotonic()
+            self.thread = threading.Thread(target=self.run, name='ocr-scheduler')
+            self.thread.daemon = True
+            self.thread.start()
+        return self
+
+    def executor(self, name, metrics=None):
+        """
+        登记一个会话，返回该会话使用的执行器（可直接作为 CourseMonitor 的 ocr_executor）
+
+        参数:
+        name: 会话名称
+        metrics: 会话的指标注册表，记录排队等待 ocr_queue_wait 和识别耗时 ocr_service
+        """
+        with self.condition:
+            if name in self.queues:
+                raise ValueError(f"会话名称重复: {name}")
+            self.queues[name] = collections.deque()
+            self.metrics[name] = metrics
+        return SessionOCRExecutor(self, name)
+
+    def submit(self, name, function, *args):
+        """把一次识别放进会话的队列，返回 concurrent.futures.Future"""
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("OCR调度器已关闭")
+            self.queues[name].append((future, function, args, time.perf_counter()))
+            self.condition.notify()
+        return future
+
+    def cancel_session(self, name):
+        """取消会话队列中还没开始的识别"""
+        with self.condition:
+            pending = list(self.queues.get(name, ()))
+            if name in self.queues:
+                self.queues[name].clear()
+        for future, _, _, _ in pending:
+            future.cancel()
+
+    def next_request(self):
+        """轮转取出下一个请求（调用时需持有锁），没有请求时返回None"""
+        names = list(self.queues)
+        for offset in range(len(names)):
+            index = (self.next_index + offset) % len(names)
+            queue = self.queues[names[index]]
+            if queue:
+                self.next_index = index + 1
+                return names[index], queue.popleft()
+        return None
+
+    def run(self):
+        """OCR线程：按轮转顺序执行各会话的识别请求"""
+        while True:
+            with self.condition:
+                request = self.next_request()
+                while request is None and not self.closed:
+                    self.condition.wait()
+                    request = self.next_request()
+                if request is None:
+                    return
+            name, (future, function, args, submitted) = request
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            start = time.perf_counter()
+            self.waited[name] += start - submitted
+            metrics = self.metrics.get(name)
+            if metrics is not None:
+                metrics.observe('ocr_queue_wait', start - submitted)
+            try:
+                result = function(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            service = time.perf_counter() - start
+            if metrics is not None:
+                metrics.observe('ocr_service', service)
+            self.served[name] += 1
+            self.busy[name] += service
+
+    def summary(self):
+        """各会话的识别次数、占用OCR线程的时间比例和平均排队等待"""
+        elapsed = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        return {
+            name: {
+                'served': self.served[name],
+                'busy_share': self.busy[name] / elapsed if elapsed > 0 else 0.0,
+                'mean_wait_ms': self.waited[name] / self.served[name] * 1000 if self.served[name] else 0.0,
+            }
+            for name in self.queues
+        }
+
+    def close(self):
+        """取消所有未开始的识别并停止OCR线程（正在进行的识别会执行完）"""
+        with self.condition:
+            self.closed = True
+            names = list(self.queues)
+            self.condition.notify_all()
+        for name in names:
+            self.cancel_session(name)
+
+
+class SessionOCRExecutor:
+    """
+    单个会话的执行器
+    功能：提供与 ThreadPoolExecutor 相同的 submit/shutdown 接口，请求交给共享的公平调度器
+    """
+
+    def __init__(self, scheduler, name):
+        self.scheduler = scheduler
+        self.name = name
+
+    def submit(self, function, *args):
+        """提交一次识别，返回 Future"""
+        return self.scheduler.submit(self.name, function, *args)
+
+    def shutdown(self, wait=True):
+        """会话结束：取消本会话未开始的识别（共享的OCR线程由调度器关闭）"""
+        self.scheduler.cancel_session(self.name)
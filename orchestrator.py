@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# orchestrator.py
+# 多会话运行 - 在一个进程中同时运行多组 课程检测 + 鼠标连点（不同浏览器窗口/虚拟桌面、不同目标课程），
+# 所有会话共用一个OCR模型，由公平调度器轮流识别；各会话的鼠标点击串行执行，不会互相抢鼠标
+#
+# 用法示例:
+#   python orchestrator.py                        # 使用 config.py 中 ORCHESTRATOR_CONFIG['sessions_file']
+#   python orchestrator.py sessions.json --json session_stats.json
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import keyboard
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from course_monitor import CourseMonitor, check_dependencies as check_monitor_deps
+from continuous_clicker import ContinuousClicker, check_dependencies as check_clicker_deps
+from ocr_warmup import OCRWarmup
+from ocr_engines import engine_from_config
+from ocr_scheduler import FairOCRScheduler
+from metrics import MetricsRegistry
+import config
+
+# 会话中的监控器/连点器默认不输出详细信息，由编排器统一输出各会话的状态
+SESSION_DEFAULTS = {'verbose': False}
+# 每个会话都开并行OCR进程池会各自加载模型，违背共用一个模型的初衷
+SESSION_OVERRIDES = {'parallel_ocr': False, 'background_warmup': False}
+
+
+def load_sessions_file(path):
+    """
+    读取会话定义文件（格式见 sessions.example.json）
+
+    返回: (监控默认设置, 连点默认设置, [(会话名称, 监控设置, 连点设置或None), ...])
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    monitor_defaults = dict(config.COURSE_MONITOR_CONFIG, **SESSION_DEFAULTS)
+    monitor_defaults.update(data.get('monitor_defaults') or {})
+    clicker_defaults = dict(config.CLICKER_CONFIG, **SESSION_DEFAULTS)
+    clicker_defaults.update(data.get('clicker_defaults') or {})
+
+    sessions = []
+    for index, item in enumerate(data.get('sessions') or []):
+        name = item.get('name') or f"会话{index + 1}"
+        if any(name == existing[0] for existing in sessions):
+            raise ValueError(f"会话名称重复: {name}")
+        monitor_config = dict(monitor_defaults, **(item.get('monitor') or {}))
+        clicker_config = None
+        if item.get('clicker') is not None:
+            clicker_config = dict(clicker_defaults, **item['clicker'])
+        sessions.append((name, monitor_config, clicker_config))
+
+    if not sessions:
+        raise ValueError(f"{path} 中没有定义任何会话 (sessions)")
+    return monitor_defaults, clicker_defaults, sessions
+
+
+class MonitorSession:
+    """
+    单个选课会话
+    功能：一个监控器（监控区域 + 关键词）和一个连点器（刷新按钮位置），发现目标课程时只停止本会话的连点；
+    识别交给共享的公平调度器，点击使用共享的输入锁，耗时统计记在本会话自己的指标注册表中
+    """
+
+    def __init__(self, name, monitor_config, clicker_config, scheduler, ocr_warmup, input_lock=None):
+        """
+        参数:
+        name: 会话名称
+        monitor_config: 课程检测配置
+        clicker_config: 鼠标连点配置，None 表示本会话只检测不连点
+        scheduler: 共享的 FairOCRScheduler
+        ocr_warmup: 共享的OCR预热任务，所有会话使用它加载的同一个模型
+        input_lock: 共享的输入锁，None 表示不串行化点击
+        """
+        self.name = name
+        self.metrics = MetricsRegistry(enabled=monitor_config.get('metrics', True))
+        self.detect_count = 0
+        self.monitor = None
+        self.clicker = None
+
+        if clicker_config is not None:
+            clicker_config = dict(clicker_config, on_click=self.on_refresh_click,
+                                  metrics_registry=self.metrics, input_lock=input_lock)
+            self.clicker = ContinuousClicker(clicker_config)
+
+        monitor_config = dict(monitor_config, **SESSION_OVERRIDES)
+        monitor_config.update({
+            'ocr_warmup': ocr_warmup,
+            'ocr_executor': scheduler.executor(name, self.metrics),
+            'metrics_registry': self.metrics,
+            'on_target_detected': self.on_course_detected,
+        })
+        if self.clicker is None:
+            # 没有连点器就没有刷新点击可以同步
+            monitor_config['click_sync'] = False
+        self.monitor = CourseMonitor(monitor_config)
+
+    def setup(self):
+        """设置点击位置（配置中没有给出 click_position 时手动确认），返回是否成功"""
+        if self.clicker is None or self.clicker.config['click_position']:
+            return True
+        print(f"\n[{self.name}] 请把鼠标移动到本会话的刷新按钮上，按 Enter 确认")
+        position = self.clicker.get_click_position()
+        if position is None:
+            print(f"[错误] [{self.name}] 点击位置设置失败")
+            return False
+        print(f"   点击位置已设置: {position}")
+        return True
+
+    def start(self):
+        """先启动课程检测，成功后再启动连点，返回是否成功"""
+        self.monitor.start_monitoring()
+        if not self.monitor.is_monitoring:
+            return False
+        if self.clicker is not None and not self.clicker.is_clicking:
+            self.clicker.start_click_loop()
+        return True
+
+    def on_course_detected(self, matches=None):
+        """
+        本会话发现目标课程：停止本会话的连点
+
+        参数:
+        matches: {区域名称: [找到的关键词, ...]}
+        """
+        self.detect_count += 1
+        time_str = time.strftime("%H:%M:%S")
+        found = '; '.join(f"{name}: {', '.join(keywords)}" for name, keywords in (matches or {}).items())
+        print(f"[{time_str}] ⚠️  [{self.name}] 发现目标课程「{found}」")
+        if self.clicker is not None and self.clicker.is_clicking:
+            self.clicker.stop_clicking()
+            print(f"   [{self.name}] 已停止鼠标连点")
+
+    def on_refresh_click(self):
+        """本会话的连点器每次点击刷新后通知本会话的监控器"""
+        if self.monitor is not None:
+            self.monitor.notify_refresh()
+
+    def format_status(self):
+        """本会话的状态行"""
+        status = f"[{self.name}] {self.monitor.format_status() if self.monitor.is_monitoring else '未运行'}"
+        if self.clicker is not None:
+            status += f", 点击{self.clicker.click_total}次{'' if self.clicker.is_clicking else '(已停止)'}"
+        return status
+
+    def summary(self):
+        """本会话的统计：检查/识别/提醒/点击次数和各项耗时（毫秒）"""
+        stages = self.metrics.snapshot()['stages']
+        return {
+            'checks': self.monitor.check_count,
+            'ocr': self.monitor.ocr_count,
+            'alerts': self.monitor.alert_count,
+            'detections': self.detect_count,
+            'clicks': self.clicker.click_total if self.clicker is not None else 0,
+            'ocr_queue_wait': stages.get('ocr_queue_wait', {'count': 0}),
+            'ocr_service': stages.get('ocr_service', {'count': 0}),
+            'capture': stages.get('capture_grab', {'count': 0}),
+            'click': stages.get('click', {'count': 0}),
+            'click_input_wait': stages.get('click_input_wait', {'count': 0}),
+        }
+
+    def stop(self):
+        """停止连点和检测"""
+        if self.clicker is not None and self.clicker.is_clicking:
+            self.clicker.stop_clicking()
+        if self.monitor.is_monitoring:
+            self.monitor.stop_monitoring()
+
+    def close(self):
+        """释放本会话的截屏后端、提醒线程等资源"""
+        self.monitor.close()
+        self.metrics.close()
+
+
+class SessionOrchestrator:
+    """
+    多会话编排器
+    功能：从一个会话定义文件创建多个选课会话，在一个进程中运行；
+    只加载一个OCR模型，由公平调度器让各会话轮流识别；所有连点器共用一个输入锁，
+    同一时刻只有一个会话在操作鼠标；定时输出并在退出时汇总各会话的延迟统计
+    """
+
+    def __init__(self, sessions_file, status_interval=30, stats_json=None, serialize_input=True):
+        """
+        参数:
+        sessions_file: 会话定义文件路径
+        status_interval: 状态输出间隔(秒)
+        stats_json: 退出时写入各会话统计的JSON文件，None 表示不写
+        serialize_input: 是否串行执行各会话的点击
+        """
+        self.sessions_file = sessions_file
+        self.status_interval = status_interval
+        self.stats_json = stats_json
+        self.input_lock = threading.Lock() if serialize_input else None
+        self.scheduler = FairOCRScheduler()
+        self.ocr_warmup = None
+        self.sessions = []
+        self.stop_event = threading.Event()  # 退出请求，主线程等待该事件
+
+    def create_sessions(self, monitor_defaults, definitions):
+        """加载共享的OCR模型并创建所有会话"""
+        # 模型只加载一次：引擎、GPU和预热缩放比例取自监控默认设置
+        self.ocr_warmup = OCRWarmup(monitor_defaults.get('use_gpu', False),
+                                    monitor_defaults.get('image_scale', 0.7),
+                                    *engine_from_config(monitor_defaults)).start()
+        self.scheduler.start()
+        for name, monitor_config, clicker_config in definitions:
+            self.sessions.append(MonitorSession(name, monitor_config, clicker_config,
+                                                self.scheduler, self.ocr_warmup, self.input_lock))
+
+    def print_sessions(self):
+        """打印各会话的设置"""
+        print(f"共 {len(self.sessions)} 个会话 (共用一个OCR模型"
+              f"{', 点击串行执行' if self.input_lock is not None else ''}):")
+        for session in self.sessions:
+            monitor = session.monitor
+            if monitor.regions:
+                area = f"{len(monitor.regions)}个区域"
+            else:
+                area = f"区域{tuple(monitor.preset_region) if monitor.preset_region else '(启动时框选)'}"
+            line = f"  [{session.name}] 关键词: {', '.join(monitor.keywords)}; {area}"
+            if session.clicker is not None:
+                position = session.clicker.config['click_position']
+                line += (f"; 点击{tuple(position) if position else '(启动时设置)'}"
+                         f" 每{session.clicker.config['click_interval']}秒")
+            print(line)
+
+    def start(self):
+        """启动所有会话并等待退出"""
+        print("=" * 60)
+        print("多会话选课助手 - 共用OCR模型的多组 课程检测 + 鼠标连点")
+        print("=" * 60)
+
+        try:
+            monitor_defaults, _, definitions = load_sessions_file(self.sessions_file)
+        except (OSError, ValueError) as e:
+            print(f"[错误] 无法读取会话定义文件 {self.sessions_file}: {e}")
+            sys.exit(1)
+
+        # 检查依赖
+        engine = monitor_defaults.get('ocr_engine', 'easyocr')
+        if not (check_monitor_deps(engine) and check_clicker_deps()):
+            print("\n缺少必要组件，请先安装依赖 (pip install -r requirements.txt)")
+            sys.exit(1)
+
+        self.create_sessions(monitor_defaults, definitions)
+        self.print_sessions()
+
+        # 先确认所有点击位置，再逐个启动（区域未预设的会话在启动时框选）
+        for session in self.sessions:
+            if not session.setup():
+                self.shutdown()
+                return
+        print("\n正在启动各会话 (首次启动需等待OCR模型加载完成)...")
+        for session in self.sessions:
+            if session.start():
+                print(f"✓ [{session.name}] 已启动")
+            else:
+                print(f"✗ [{session.name}] 启动失败")
+
+        print("\n✅ 所有会话已启动！按 Ctrl+Alt+Q 退出")
+        print("=" * 60 + "\n")
+        keyboard.add_hotkey('ctrl+alt+q', self.quit)
+
+        # 主线程定时输出各会话状态，按下快捷键后立即退出
+        try:
+            while not self.stop_event.wait(self.status_interval):
+                self.print_status()
+        except KeyboardInterrupt:
+            pass
+        self.shutdown()
+
+    def print_status(self):
+        """输出各会话的状态行和OCR线程的使用情况"""
+        time_str = time.strftime("%H:%M:%S")
+        shares = self.scheduler.summary()
+        print(f"[{time_str}] OCR线程: " + ', '.join(
+            f"{name} {share['busy_share'] * 100:.0f}%" for name, share in shares.items()))
+        for session in self.sessions:
+            print(f"  {session.format_status()}")
+
+    def summary(self):
+        """各会话的统计，加上OCR调度器中的识别次数、占用比例和平均排队时间"""
+        shares = self.scheduler.summary()
+        return {session.name: dict(session.summary(), scheduler=shares.get(session.name, {}))
+                for session in self.sessions}
+
+    def print_summary(self, summary):
+        """输出各会话的延迟统计"""
+        def percentiles(stage):
+            if not stage.get('count'):
+                return '-'
+            return f"{stage['p50_ms']:.0f}/{stage['p99_ms']:.0f}"
+
+        print("\n各会话统计 (耗时为 p50/p99 毫秒):")
+        print(f"  {'会话':<12}{'检查':>6}{'识别':>6}{'提醒':>6}{'点击':>6}"
+              f"{'OCR排队':>12}{'识别耗时':>12}{'等待鼠标':>12}{'占用OCR':>9}")
+        for name, stats in summary.items():
+            print(f"  {name:<12}{stats['checks']:>6}{stats['ocr']:>6}{stats['alerts']:>6}{stats['clicks']:>6}"
+                  f"{percentiles(stats['ocr_queue_wait']):>12}{percentiles(stats['ocr_service']):>12}"
+                  f"{percentiles(stats['click_input_wait']):>12}"
+                  f"{stats['scheduler'].get('busy_share', 0.0) * 100:>8.0f}%")
+
+    def quit(self):
+        """请求退出程序（在快捷键线程中调用，由主线程完成清理并退出）"""
+        self.stop_event.set()
+
+    def shutdown(self):
+        """停止所有会话、输出统计并退出"""
+        print("\n" + "=" * 60)
+        print("正在退出多会话选课助手...")
+        for session in self.sessions:
+            session.stop()
+
+        summary = self.summary()
+        if self.sessions:
+            self.print_summary(summary)
+        if self.stats_json:
+            with open(self.stats_json, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            print(f"✓ 统计已写入: {self.stats_json}")
+
+        for session in self.sessions:
+            session.close()
+        self.scheduler.close()
+
+        print("\n感谢使用！")
+        print("=" * 60)
+        sys.exit(0)
+
+
+def main():
+    """主函数 - 程序入口"""
+    settings = config.ORCHESTRATOR_CONFIG
+    parser = argparse.ArgumentParser(description="多会话选课助手：多组课程检测+鼠标连点共用一个OCR模型")
+    parser.add_argument('sessions_file', nargs='?', default=settings['sessions_file'],
+                        help="会话定义文件 (格式见 sessions.example.json)")
+    parser.add_argument('--json', default=settings['stats_json'], help="退出时写入各会话统计的JSON文件")
+    args = parser.parse_args()
+
+    orchestrator = SessionOrchestrator(args.sessions_file,
+                                       status_interval=settings['status_interval'],
+                                       stats_json=args.json,
+                                       serialize_input=settings['serialize_input'])
+    orchestrator.start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# parallel_ocr.py
+# 多核并行OCR - 把图像切成有重叠的横向条带，放进共享内存，由常驻进程池并行识别
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# 以下变量只在工作进程中使用
+_worker_reader = None
+_worker_segments = {}
+
+
+def _init_worker(use_gpu, threads, engine, engine_options):
+    """工作进程初始化：限制线程数并加载各自的OCR引擎"""
+    global _worker_reader
+    if threads:
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+        if engine == 'onnx':
+            engine_options = dict(engine_options, threads=threads)
+        else:
+            try:
+                import torch
+                torch.set_num_threads(threads)
+            except ImportError:
+                pass
+    from ocr_engines import create_ocr_engine
+    _worker_reader = create_ocr_engine(engine, use_gpu=use_gpu, **engine_options)
+
+
+def _attach_segment(name):
+    """在工作进程中挂载共享内存段（同名的段只挂载一次）"""
+    segment = _worker_segments.get(name)
+    if segment is not None:
+        return segment
+
+    for old in _worker_segments.values():
+        old.close()
+    _worker_segments.clear()
+
+    try:
+        segment = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.13 之前没有 track 参数，挂载方需要从资源跟踪器中注销，
+        # 否则工作进程退出时会把主进程创建的共享内存删除
+        segment = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, 'shared_memory')
+    _worker_segments[name] = segment
+    return segment
+
+
+def _recognize_strip(name, shape, top, bottom, allowlist=None):
+    """识别共享内存中图像的一个条带，返回坐标已换算回整幅图像的结果"""
+    segment = _attach_segment(name)
+    image = np.ndarray(shape, dtype=np.uint8, buffer=segment.buf)
+    results = _worker_reader.readtext(image[top:bottom], allowlist=allowlist)
+    del image
+    return [([[float(x), float(y) + top] for x, y in box], text, float(confidence))
+            for box, text, confidence in results]
+
+
+def _ping(_):
+    """确认工作进程已完成初始化"""
+    return _worker_reader is not None
+
+
+class ParallelOCR:
+    """
+    并行OCR识别器
+    功能：常驻进程池中的每个进程各自持有一个识别器，主进程把图像写入共享内存后
+    按条带分发任务，结果按条带核心区域去重后合并
+    """
+
+    def __init__(self, workers=None, overlap=32, use_gpu=False, threads_per_worker=None,
+                 engine='easyocr', engine_options=None):
+        """
+        初始化进程池
+
+        参数:
+        workers: 工作进程数，None 表示 CPU核数-1
+        overlap: 条带上下重叠的像素，应不小于半行文字高度
+        use_gpu: 工作进程是否使用GPU
+        threads_per_worker: 每个工作进程的计算线程数，None 表示平均分配CPU核
+        engine: OCR引擎名称
+        engine_options: 创建引擎的其他参数（需要能被pickle）
+        """
+        cpu_count = os.cpu_count() or 2
+        self.workers = max(1, int(workers or cpu_count - 1))
+        self.overlap = max(0, int(overlap))
+        if threads_per_worker is None:
+            threads_per_worker = max(1, cpu_count // self.workers)
+
+        # 统一使用 spawn，Windows 与 Linux 行为一致，也避免 fork 带着主进程的模型和线程
+        context = multiprocessing.get_context('spawn')
+        self.pool = context.Pool(self.workers, initializer=_init_worker,
+                                 initargs=(use_gpu, threads_per_worker, engine,
+                                           engine_options or {}))
+        self.segment = None
+
+    def wait_ready(self):
+        """等待所有工作进程加载完模型"""
+        return all(self.pool.map(_ping, range(self.workers), chunksize=1))
+
+    def ensure_segment(self, nbytes):
+        """保证共享内存段足够大，不够时重新创建"""
+        if self.segment is not None and self.segment.size >= nbytes:
+            return self.segment
+        self.release_segment()
+        self.segment = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+        return self.segment
+
+    def split(self, height):
+        """
+        把图像高度平均分成若干条带
+
+        返回: [(核心起点, 核心终点, 扩展起点, 扩展终点), ...]
+        """
+        # 条带太矮时减少条带数，避免重叠部分占比过高
+        count = max(1, min(self.workers, height // max(1, 4 * self.overlap)))
+        bounds = [round(height * i / count) for i in range(count + 1)]
+        return [(bounds[i], bounds[i + 1],
+                 max(0, bounds[i] - self.overlap), min(height, bounds[i + 1] + self.overlap))
+                for i in range(count)]
+
+    def readtext(self, image, allowlist=None):
+        """
+        并行识别一幅灰度图像
+
+        参数:
+        allowlist: 字符白名单，None 表示不限制
+
+        返回: [(box, text, confidence), ...]，按从上到下、从左到右排序
+        """
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        segment = self.ensure_segment(image.nbytes)
+        shared = np.ndarray(image.shape, dtype=np.uint8, buffer=segment.buf)
+        shared[...] = image
+        del shared
+
+        strips = self.split(image.shape[0])
+        tasks = [(segment.name, image.shape, top, bottom, allowlist) for _, _, top, bottom in strips]
+        strip_results = self.pool.starmap(_recognize_strip, tasks, chunksize=1)
+
+        merged = []
+        for (core_top, core_bottom, _, _), results in zip(strips, strip_results):
+            for box, text, confidence in results:
+                # 重叠区域的文字只保留中心落在本条带核心区域内的那一份
+                center_y = sum(point[1] for point in box) / len(box)
+                if core_top <= center_y < core_bottom:
+                    merged.append((box, text, confidence))
+
+        merged.sort(key=lambda result: (min(p[1] for p in result[0]), min(p[0] for p in result[0])))
+        return merged
+
+    def release_segment(self):
+        """释放共享内存段"""
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+
+    def close(self):
+        """关闭进程池并释放共享内存"""
+        self.pool.terminate()
+        self.pool.join()
+        self.release_segment()
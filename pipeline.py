@@ -0,0 +1,62 @@
+# pipeline.py
+# 流水线模式的基础组件 - 有界、丢弃旧数据的线程间队列
+import collections
+import threading
+
+
+class DropOldestQueue:
+    """
+    丢弃旧数据的有界队列
+    功能：队列满时丢掉最旧的元素，保证消费者总能拿到最新的画面
+    """
+
+    def __init__(self, maxsize=1):
+        """
+        初始化队列
+
+        参数:
+        maxsize: 队列最大长度，超出时丢弃最旧的元素
+        """
+        self.maxsize = max(1, int(maxsize))
+        self.items = collections.deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.dropped = 0  # 被丢弃的元素数量
+
+    def put(self, item):
+        """放入元素，队列满时丢弃最旧的元素"""
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self.condition.notify()
+
+    def _wait(self, timeout):
+        """等待队列中有数据，超时或已关闭时返回False"""
+        if not self.items and not self.closed:
+            self.condition.wait(timeout)
+        return bool(self.items)
+
+    def get(self, timeout=None):
+        """取出最早的元素，超时或队列关闭时返回None"""
+        with self.condition:
+            if not self._wait(timeout):
+                return None
+            return self.items.popleft()
+
+    def get_latest(self, timeout=None):
+        """取出最新的元素并丢弃其余旧元素，超时或队列关闭时返回None"""
+        with self.condition:
+            if not self._wait(timeout):
+                return None
+            item = self.items.pop()
+            self.dropped += len(self.items)
+            self.items.clear()
+            return item
+
+    def close(self):
+        """关闭队列并唤醒所有等待的线程"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
@@ -0,0 +1,146 @@
+# preprocess.py
+# 截图预处理 - 先转灰度再缩放，每一步都写入预先分配的缓冲区，稳定运行时每帧几乎不再分配内存
+import cv2
+import numpy as np
+
+# 各种截屏后端通道顺序到灰度图的转换方式
+GRAY_CONVERSIONS = {
+    'RGB': cv2.COLOR_RGB2GRAY,
+    'BGR': cv2.COLOR_BGR2GRAY,
+    'BGRA': cv2.COLOR_BGRA2GRAY,
+    'RGBA': cv2.COLOR_RGBA2GRAY,
+}
+
+# 缩小后文字边缘变软，用锐化核补偿（只在模块加载时构造一次）
+SHARPEN_KERNEL = np.array([[0, -0.25, 0],
+                           [-0.25, 2.0, -0.25],
+                           [0, -0.25, 0]], dtype=np.float32)
+
+# 二值化方式
+BINARIZE_MODES = (None, 'otsu', 'adaptive')
+
+
+class Preprocessor:
+    """
+    截图预处理流水线
+    功能：灰度 → 缩放 → 锐化 → 二值化(可选)，中间结果写入各自的缓冲区，
+    最终结果写入一组轮换使用的输出缓冲区；输入尺寸不变时不再分配新数组
+    """
+
+    def __init__(self, scale=1.0, sharpen='auto', binarize=None, adaptive_block_size=31,
+                 adaptive_c=10, ring_size=4, metrics=None):
+        """
+        参数:
+        scale: 缩放比例，小于1时缩小
+        sharpen: 是否锐化，'auto' 表示缩放比例小于0.9时锐化
+        binarize: 二值化方式，None / 'otsu' / 'adaptive'
+        adaptive_block_size: 自适应阈值的邻域大小(奇数)
+        adaptive_c: 自适应阈值从邻域均值中减去的常数
+        ring_size: 输出缓冲区个数。返回的图像在之后第 ring_size 次处理时才会被覆盖，
+                   必须大于同时被使用的帧数（如流水线队列长度 + 正在识别的帧）
+        metrics: 指标注册表，记录各阶段耗时
+        """
+        if binarize not in BINARIZE_MODES:
+            raise ValueError(f"未知的二值化方式: {binarize}")
+        self.scale = scale
+        self.sharpen = sharpen
+        self.binarize = binarize
+        self.adaptive_block_size = adaptive_block_size | 1
+        self.adaptive_c = adaptive_c
+        self.ring_size = max(1, int(ring_size))
+        self.metrics = metrics
+
+        self.input_key = None  # (输入形状, 颜色格式)，变化时重新规划
+        self.stages = []
+        self.buffers = {}  # 中间阶段名称 -> 缓冲区
+        self.ring = []
+        self.ring_index = 0
+
+    def configure(self, scale=None, sharpen=None):
+        """修改缩放比例/锐化设置，下一帧按新设置重新规划"""
+        if scale is not None:
+            self.scale = scale
+        if sharpen is not None:
+            self.sharpen = sharpen
+        self.input_key = None
+
+    def should_sharpen(self):
+        """当前设置下是否锐化"""
+        if self.sharpen == 'auto':
+            return self.scale < 0.9
+        return bool(self.sharpen)
+
+    def output_size(self, width, height):
+        """缩放后的 (宽, 高)"""
+        if self.scale >= 1.0:
+            return width, height
+        return max(1, int(width * self.scale)), max(1, int(height * self.scale))
+
+    def plan(self, shape, color_format):
+        """按输入尺寸和颜色格式确定处理步骤并分配缓冲区"""
+        height, width = shape[:2]
+        out_width, out_height = self.output_size(width, height)
+
+        stages = []
+        if color_format != 'GRAY':
+            stages.append(('gray', (height, width)))
+        if (out_width, out_height) != (width, height):
+            stages.append(('resize', (out_height, out_width)))
+        if self.should_sharpen():
+            stages.append(('sharpen', (out_height, out_width)))
+        if self.binarize:
+            stages.append(('binarize', (out_height, out_width)))
+        if not stages:
+            # 灰度输入且不缩放时仍是后端缓冲区的视图，拷贝到输出缓冲区
+            stages.append(('copy', (out_height, out_width)))
+
+        self.stages = stages
+        self.buffers = {name: np.empty(size, dtype=np.uint8) for name, size in stages[:-1]}
+        self.ring = [np.empty(stages[-1][1], dtype=np.uint8) for _ in range(self.ring_size)]
+        self.ring_index = 0
+        self.input_key = (shape, color_format)
+
+    def run_stage(self, name, src, dst, color_format):
+        """执行一个处理步骤，结果写入 dst"""
+        if name == 'gray':
+            cv2.cvtColor(src, GRAY_CONVERSIONS[color_format], dst=dst)
+        elif name == 'resize':
+            cv2.resize(src, (dst.shape[1], dst.shape[0]), dst=dst, interpolation=cv2.INTER_AREA)
+        elif name == 'sharpen':
+            cv2.filter2D(src, -1, SHARPEN_KERNEL, dst=dst)
+        elif name == 'binarize':
+            if self.binarize == 'otsu':
+                cv2.threshold(src, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=dst)
+            else:
+                cv2.adaptiveThreshold(src, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                      self.adaptive_block_size, self.adaptive_c, dst=dst)
+        else:
+            np.copyto(dst, src)
+
+    def process(self, frame, color_format):
+        """
+        处理一帧截图
+
+        参数:
+        frame: 截屏后端返回的图像（可能是后端内部缓冲区的视图）
+        color_format: 'RGB' / 'BGR' / 'BGRA' / 'RGBA' / 'GRAY'
+
+        返回: 灰度图像（输出缓冲区之一，ring_size 帧之后会被覆盖）
+        """
+        if self.input_key != (frame.shape, color_format):
+            self.plan(frame.shape, color_format)
+
+        output = self.ring[self.ring_index]
+        self.ring_index = (self.ring_index + 1) % self.ring_size
+
+        src = frame
+        last = len(self.stages) - 1
+        for index, (name, _) in enumerate(self.stages):
+            dst = output if index == last else self.buffers[name]
+            if self.metrics is not None:
+                with self.metrics.time('capture_' + name):
+                    self.run_stage(name, src, dst, color_format)
+            else:
+                self.run_stage(name, src, dst, color_format)
+            src = dst
+        return output
@@ -0,0 +1,154 @@
+# profiling.py
+# 性能剖析 - 可选的采样剖析和内存分配跟踪，每隔若干次检查把结果轮转写入磁盘
+import collections
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+
+class LoopProfiler:
+    """
+    监控循环剖析器
+    功能：后台线程定时采样各线程的调用栈（折叠栈格式，可直接生成火焰图），
+    并用 tracemalloc 定期拍摄内存快照；每隔 every_checks 次检查写出一组结果文件，
+    只保留最近 keep_dumps 组
+    """
+
+    def __init__(self, output_dir='profiles', every_checks=500, sample_interval=0.005,
+                 keep_dumps=5, top_allocations=30, trace_frames=5):
+        """
+        参数:
+        output_dir: 结果文件目录
+        every_checks: 每多少次检查写出一次结果
+        sample_interval: 调用栈采样间隔(秒)
+        keep_dumps: 保留最近多少组结果文件
+        top_allocations: 内存分配排行输出的条目数
+        trace_frames: tracemalloc 记录的调用栈深度
+        """
+        self.output_dir = output_dir
+        self.every_checks = max(1, int(every_checks))
+        self.sample_interval = sample_interval
+        self.keep_dumps = max(1, int(keep_dumps))
+        self.top_allocations = top_allocations
+        self.trace_frames = trace_frames
+
+        self.lock = threading.Lock()
+        self.stacks = collections.Counter()  # 折叠调用栈 -> 采样次数
+        self.samples = 0
+        self.ticks = 0
+        self.dump_index = 0
+        self.previous_snapshot = None
+        self.started_tracemalloc = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """开始采样和内存跟踪"""
+        if self.thread is not None:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self.started_tracemalloc = True
+        self.previous_snapshot = tracemalloc.take_snapshot()
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.sample_loop, name='profiler')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def sample_loop(self):
+        """采样线程：记录除自身以外所有线程当前的调用栈"""
+        own_id = threading.get_ident()
+        while not self.stop_event.wait(self.sample_interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            collected = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                parts.append(names.get(thread_id, str(thread_id)))
+                collected.append(';'.join(reversed(parts)))
+            with self.lock:
+                self.stacks.update(collected)
+                self.samples += 1
+
+    def tick(self):
+        """每次检查调用一次，满 every_checks 次时写出结果"""
+        self.ticks += 1
+        if self.ticks % self.every_checks == 0:
+            self.dump()
+
+    def dump(self):
+        """写出采样结果和内存分配排行，然后清空采样计数"""
+        with self.lock:
+            stacks, self.stacks = self.stacks, collections.Counter()
+            samples, self.samples = self.samples, 0
+
+        self.dump_index += 1
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        # 时间在前，文件名按字典序排列即为时间顺序（跨多次运行也成立）
+        prefix = os.path.join(self.output_dir, f"{stamp}_{self.dump_index:04d}")
+
+        try:
+            with open(prefix + '_profile.folded', 'w', encoding='utf-8') as output:
+                for stack, count in stacks.most_common():
+                    output.write(f"{stack} {count}\n")
+
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            with open(prefix + '_alloc.txt', 'w', encoding='utf-8') as output:
+                current, peak = tracemalloc.get_traced_memory()
+                output.write(f"检查次数: {self.ticks}, 采样次数: {samples}\n")
+                output.write(f"当前跟踪内存: {current / 1024 / 1024:.1f} MB, 峰值: {peak / 1024 / 1024:.1f} MB\n\n")
+
+                output.write(f"== 内存占用排行 (前{self.top_allocations}) ==\n")
+                for stat in snapshot.statistics('lineno')[:self.top_allocations]:
+                    output.write(f"{stat}\n")
+
+                if self.previous_snapshot is not None:
+                    output.write(f"\n== 与上次相比的增长排行 (前{self.top_allocations}) ==\n")
+                    for stat in snapshot.compare_to(self.previous_snapshot, 'lineno')[:self.top_allocations]:
+                        output.write(f"{stat}\n")
+            self.previous_snapshot = snapshot
+        except Exception as e:
+            print(f"[警告] 写出性能剖析结果失败: {e}")
+
+        self.rotate()
+
+    def rotate(self):
+        """只保留最近 keep_dumps 组结果文件"""
+        try:
+            files = sorted(name for name in os.listdir(self.output_dir)
+                           if name.endswith(('_profile.folded', '_alloc.txt')))
+        except OSError:
+            return
+        groups = sorted({name.rsplit('_', 1)[0] for name in files})
+        expired = set(groups[:-self.keep_dumps])
+        for name in files:
+            if name.rsplit('_', 1)[0] in expired:
+                try:
+                    os.remove(os.path.join(self.output_dir, name))
+                except OSError:
+                    pass
+
+    def stop(self):
+        """停止采样，写出最后一组结果"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join(timeout=2.0)
+        self.thread = None
+        self.dump()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+        self.previous_snapshot = None
@@ -0,0 +1,237 @@
+# resource_governor.py
+# 资源限制 - 限制OCR计算线程数、调整进程优先级和CPU亲和性，并按CPU占用预算推迟检查，给浏览器留出CPU
+import collections
+import ctypes
+import os
+import sys
+import time
+
+import cv2
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 进程优先级对应的 nice 值（Linux/macOS）和优先级类（Windows）
+PRIORITY_NICE = {'normal': 0, 'below_normal': 5, 'idle': 19}
+WINDOWS_PRIORITY_CLASS = {'normal': 0x20, 'below_normal': 0x4000, 'idle': 0x40}
+PSUTIL_PRIORITY_CLASS = {'normal': 'NORMAL_PRIORITY_CLASS',
+                         'below_normal': 'BELOW_NORMAL_PRIORITY_CLASS',
+                         'idle': 'IDLE_PRIORITY_CLASS'}
+
+
+def linux_thread_ids():
+    """
+    本进程所有线程的ID（仅Linux）
+
+    Linux 的 nice 值和CPU亲和性是按线程设置的，对进程号设置只影响主线程，
+    需要逐个线程设置（之后新建的线程会继承创建者的设置）
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        return [int(tid) for tid in os.listdir('/proc/self/task')]
+    except OSError:
+        return None
+
+
+def limit_ocr_threads(threads):
+    """限制 PyTorch / OpenMP / OpenCV 的计算线程数"""
+    threads = max(1, int(threads))
+    # 环境变量只对之后才加载的库生效，已经加载的 PyTorch 直接设置
+    for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[name] = str(threads)
+    cv2.setNumThreads(threads)
+    torch = sys.modules.get('torch')
+    if torch is not None and hasattr(torch, 'set_num_threads'):
+        torch.set_num_threads(threads)
+
+
+def set_process_priority(level):
+    """把本进程的优先级设为 'normal' / 'below_normal' / 'idle'"""
+    if level not in PRIORITY_NICE:
+        raise ValueError(f"未知的进程优先级: {level} (可选: {', '.join(PRIORITY_NICE)})")
+
+    thread_ids = linux_thread_ids()
+    if thread_ids is not None:
+        for tid in thread_ids:
+            # 普通用户只能降低优先级（增大nice值）
+            current = os.getpriority(os.PRIO_PROCESS, tid)
+            os.setpriority(os.PRIO_PROCESS, tid, max(current, PRIORITY_NICE[level]))
+    elif psutil is not None:
+        process = psutil.Process()
+        if os.name == 'nt':
+            process.nice(getattr(psutil, PSUTIL_PRIORITY_CLASS[level]))
+        else:
+            process.nice(max(process.nice(), PRIORITY_NICE[level]))
+    elif os.name == 'nt':
+        kernel32 = ctypes.windll.kernel32
+        if not kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), WINDOWS_PRIORITY_CLASS[level]):
+            raise OSError("SetPriorityClass 调用失败")
+    else:
+        current = os.getpriority(os.PRIO_PROCESS, 0)
+        os.setpriority(os.PRIO_PROCESS, 0, max(current, PRIORITY_NICE[level]))
+
+
+def set_cpu_affinity(cores):
+    """只在指定的CPU核上运行"""
+    cores = sorted(set(int(core) for core in cores))
+    thread_ids = linux_thread_ids()
+    if thread_ids is not None:
+        for tid in thread_ids:
+            os.sched_setaffinity(tid, cores)
+    elif psutil is not None:
+        psutil.Process().cpu_affinity(cores)
+    elif os.name == 'nt':
+        kernel32 = ctypes.windll.kernel32
+        mask = sum(1 << core for core in cores)
+        if not kernel32.SetProcessAffinityMask(kernel32.GetCurrentProcess(), mask):
+            raise OSError("SetProcessAffinityMask 调用失败")
+    else:
+        raise OSError("当前系统不支持设置CPU亲和性，请安装 psutil")
+
+
+class ResourceGovernor:
+    """
+    资源限制器
+    功能：开始监控时限制OCR计算线程数、降低进程优先级、绑定CPU核；
+    每次检查后统计最近一段时间本进程的CPU占用，超出预算时算出需要推迟多久再做下一次检查，
+    使平均占用不超过预算，同时记录推迟的时间（即预算给检测延迟带来的代价）；
+    推迟时间按已经过去的时间计算，调度器按 cpu_budget 已经等过的时间不会重复推迟
+    """
+
+    def __init__(self, ocr_threads=None, priority=None, affinity=None, cpu_percent=None,
+                 window=5.0, verbose=True):
+        """
+        参数:
+        ocr_threads: OCR计算线程数上限，None 表示不限制
+        priority: 进程优先级 'normal' / 'below_normal' / 'idle'，None 表示不修改
+        affinity: 允许使用的CPU核序号列表，None 表示不限制
+        cpu_percent: CPU占用预算，占全部可用CPU的百分比(0~100)，None 表示不限制
+        window: CPU占用的统计时长(秒)
+        verbose: 是否输出设置结果
+        """
+        self.ocr_threads = ocr_threads
+        self.priority = priority
+        self.affinity = list(affinity) if affinity else None
+        self.cpu_percent = cpu_percent
+        self.window = window
+        self.verbose = verbose
+
+        self.samples = collections.deque()  # (墙上时间, 进程CPU时间)
+        self.started_at = None
+        self.started_cpu = None
+        self.throttle_count = 0
+        self.throttle_total = 0.0
+        self.throttle_max = 0.0
+
+    def configured(self):
+        """是否设置了任何限制"""
+        return any(value is not None for value in (self.ocr_threads, self.priority,
+                                                   self.affinity, self.cpu_percent))
+
+    def cpu_count(self):
+        """可用的CPU核数"""
+        return len(self.affinity) if self.affinity else (os.cpu_count() or 1)
+
+    def apply(self):
+        """应用线程数、优先级和亲和性设置（在OCR模型加载完成后调用，开始统计CPU占用）"""
+        steps = [
+            (self.ocr_threads, limit_ocr_threads, lambda value: f"OCR线程数{value}"),
+            (self.priority, set_process_priority, lambda value: f"进程优先级{value}"),
+            (self.affinity, set_cpu_affinity, lambda value: f"CPU核{value}"),
+        ]
+        for value, function, describe in steps:
+            if value is None:
+                continue
+            try:
+                function(value)
+                if self.verbose:
+                    print(f"✓ 资源限制: {describe(value)}")
+            except Exception as e:
+                print(f"[警告] 资源限制 {describe(value)} 设置失败: {e}")
+
+        self.reset()
+        if self.verbose and self.cpu_percent:
+            print(f"✓ 资源限制: CPU占用预算{self.cpu_percent:g}% "
+                  f"(共{self.cpu_count()}核，统计最近{self.window:g}秒)")
+
+    def reset(self):
+        """重新开始统计"""
+        self.samples.clear()
+        self.started_at = time.monotonic()
+        self.started_cpu = time.process_time()
+        self.samples.append((self.started_at, self.started_cpu))
+        self.throttle_count = 0
+        self.throttle_total = 0.0
+        self.throttle_max = 0.0
+
+    def sample(self):
+        """记录当前的 (墙上时间, 进程CPU时间)，并丢弃统计窗口之外的记录"""
+        now, cpu = time.monotonic(), time.process_time()
+        self.samples.append((now, cpu))
+        while len(self.samples) > 2 and now - self.samples[1][0] >= self.window:
+            self.samples.popleft()
+        return now, cpu
+
+    def throttle_delay(self):
+        """
+        每次检查后调用，返回为了满足CPU预算还需要推迟的秒数（没有超出预算时为0）
+
+        窗口内用掉的CPU时间 / (窗口时长 + 推迟时间) = 预算 × 核数
+        """
+        now, cpu = self.sample()
+        if not self.cpu_percent:
+            return 0.0
+        first_time, first_cpu = self.samples[0]
+        rate = self.cpu_percent / 100.0 * self.cpu_count()
+        delay = (cpu - first_cpu) / rate - (now - first_time)
+        if delay <= 0:
+            return 0.0
+
+        self.throttle_count += 1
+        self.throttle_total += delay
+        self.throttle_max = max(self.throttle_max, delay)
+        return delay
+
+    def cpu_share(self):
+        """统计窗口内本进程占全部可用CPU的百分比"""
+        if len(self.samples) < 2:
+            return 0.0
+        (first_time, first_cpu), (last_time, last_cpu) = self.samples[0], self.samples[-1]
+        elapsed = last_time - first_time
+        if elapsed <= 0:
+            return 0.0
+        return (last_cpu - first_cpu) / elapsed / self.cpu_count() * 100
+
+    def average_share(self):
+        """开始统计以来的平均CPU占用百分比"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started_at
+        if elapsed <= 0:
+            return 0.0
+        return (time.process_time() - self.started_cpu) / elapsed / self.cpu_count() * 100
+
+    def format_status(self):
+        """状态行中的资源占用部分"""
+        status = f"CPU占用{self.cpu_share():.0f}%"
+        if self.cpu_percent:
+            status += f"(预算{self.cpu_percent:g}%)"
+            if self.throttle_count:
+                status += (f", 限流{self.throttle_count}次"
+                           f"(平均推迟{self.throttle_total / self.throttle_count * 1000:.0f}毫秒)")
+        return status
+
+    def summary(self):
+        """停止监控时的统计结果"""
+        elapsed = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        return {
+            'cpu_percent': self.average_share(),
+            'cpu_percent_limit': self.cpu_percent,
+            'throttle_count': self.throttle_count,
+            'throttle_seconds': self.throttle_total,
+            'throttle_max_seconds': self.throttle_max,
+            'throttle_share': self.throttle_total / elapsed if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,121 @@
+# runtime.py
+# 可取消任务 - 用事件代替布尔标志和固定 sleep，停止/切换/退出请求在毫秒级生效
+import threading
+
+
+class TaskCancelled(Exception):
+    """任务已被取消"""
+
+
+class CancelToken:
+    """
+    取消令牌
+    功能：cancel() 之后，所有通过令牌进行的等待（sleep、等待其他事件、等待 Future）立即返回
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.waiters = set()  # 正在等待的事件，取消时一并唤醒
+
+    @property
+    def cancelled(self):
+        """是否已取消"""
+        return self.event.is_set()
+
+    def cancel(self):
+        """取消并唤醒所有等待"""
+        self.event.set()
+        with self.lock:
+            for waiter in self.waiters:
+                waiter.set()
+
+    def sleep(self, seconds):
+        """
+        等待指定时间
+
+        返回: 是否被取消（True 表示应当退出）
+        """
+        return self.event.wait(max(0.0, seconds))
+
+    def wait_event(self, event, timeout=None):
+        """
+        等待另一个事件被设置，取消时立即返回
+
+        返回: 该事件是否被设置
+        """
+        if self.cancelled:
+            return event.is_set()
+        with self.lock:
+            self.waiters.add(event)
+        try:
+            if self.cancelled:
+                return event.is_set()
+            event.wait(timeout)
+            return event.is_set() and not self.cancelled
+        finally:
+            with self.lock:
+                self.waiters.discard(event)
+
+    def wait_future(self, future, timeout=None):
+        """
+        等待 concurrent.futures.Future 完成并返回结果
+
+        取消时立即抛出 TaskCancelled（后台计算会继续执行完，但结果被丢弃）
+        """
+        done = threading.Event()
+        future.add_done_callback(lambda _: done.set())
+        self.wait_event(done, timeout)
+        if future.done():
+            return future.result()
+        if self.cancelled:
+            raise TaskCancelled()
+        raise TimeoutError()
+
+
+class CancellableTask:
+    """
+    可取消的后台任务
+    功能：在守护线程中运行 target(*args)，与一个取消令牌绑定；
+    cancel() 唤醒任务中所有通过令牌进行的等待，任务随即退出
+    """
+
+    def __init__(self, target, args=(), name=None, token=None):
+        """
+        参数:
+        target: 任务函数
+        args: 任务函数的参数
+        name: 线程名称
+        token: 取消令牌，多个任务可以共用一个令牌一起取消
+        """
+        self.target = target
+        self.args = args
+        self.token = token if token is not None else CancelToken()
+        self.thread = threading.Thread(target=self.run, name=name)
+        self.thread.daemon = True
+
+    def run(self):
+        try:
+            self.target(*self.args)
+        except TaskCancelled:
+            pass
+
+    def start(self):
+        """启动任务，返回自身便于链式调用"""
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """请求取消"""
+        self.token.cancel()
+
+    def join(self, timeout=None):
+        """等待任务结束，返回是否已结束"""
+        if self.thread.ident is None or self.thread is threading.current_thread():
+            return not self.thread.is_alive()
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def is_alive(self):
+        """任务是否仍在运行"""
+        return self.thread.is_alive()
@@ -0,0 +1,97 @@
+# scheduler.py
+# 自适应检查频率 - 画面变化或刚刷新时加快检查，画面静止时逐步放慢
+import threading
+import time
+
+
+class AdaptiveScheduler:
+    """
+    自适应检查调度器
+    功能：用单调时钟的截止时间安排下一次检查；检测到画面变化或点击刷新后在一段时间内
+    按最短间隔快速检查，画面静止时按倍数退避到最长间隔，并保证检查耗时不超过CPU预算
+    """
+
+    def __init__(self, base_interval=1.0, min_interval=0.1, max_interval=3.0,
+                 burst_duration=3.0, backoff_factor=1.5, cpu_budget=None):
+        """
+        初始化调度器
+
+        参数:
+        base_interval: 初始检查间隔(秒)
+        min_interval: 最短检查间隔(秒)，快速检查阶段使用
+        max_interval: 最长检查间隔(秒)，画面长时间静止时退避到该值
+        burst_duration: 画面变化或刷新后保持快速检查的时长(秒)
+        backoff_factor: 画面静止时每次检查间隔放大的倍数
+        cpu_budget: 检查耗时占总时间的上限(0~1)，None 表示不限制
+        """
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.interval = min(max(base_interval, self.min_interval), self.max_interval)
+        self.burst_duration = burst_duration
+        self.backoff_factor = max(1.0, backoff_factor)
+        self.cpu_budget = cpu_budget
+
+        self.burst_until = 0.0
+        self.next_deadline = time.monotonic()
+        self.last_check_start = None
+        self.average_period = None  # 实际检查周期的指数滑动平均
+        self.wake_event = threading.Event()
+
+    def start_burst(self, now=None):
+        """进入快速检查阶段"""
+        now = time.monotonic() if now is None else now
+        self.burst_until = now + self.burst_duration
+        self.interval = self.min_interval
+
+    def notify_refresh(self):
+        """页面刚被刷新（如连点器点击了刷新按钮）：立即进入快速检查并唤醒等待"""
+        now = time.monotonic()
+        self.start_burst(now)
+        self.next_deadline = min(self.next_deadline, now + self.min_interval)
+        self.wake_event.set()
+
+    def record_check(self, start, processing_time, changed):
+        """
+        记录一次检查并计算下一次检查的截止时间
+
+        参数:
+        start: 本次检查开始的单调时钟时间
+        processing_time: 本次检查耗时(秒)
+        changed: 本次检查是否发现画面变化
+        """
+        if self.last_check_start is not None:
+            period = start - self.last_check_start
+            if self.average_period is None:
+                self.average_period = period
+            else:
+                self.average_period = 0.8 * self.average_period + 0.2 * period
+        self.last_check_start = start
+
+        if changed:
+            self.start_burst(start)
+        elif start < self.burst_until:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+
+        deadline = start + self.interval
+        if self.cpu_budget:
+            # 检查耗时 / 检查周期 不超过预算
+            deadline = max(deadline, start + processing_time / self.cpu_budget)
+        self.next_deadline = deadline
+
+    def wait(self, should_continue=None):
+        """等待到下一次检查的截止时间，期间收到刷新通知会提前返回"""
+        while True:
+            delay = self.next_deadline - time.monotonic()
+            if delay <= 0 or (should_continue is not None and not should_continue()):
+                break
+            if self.wake_event.wait(min(delay, 0.5)):
+                self.wake_event.clear()
+        self.wake_event.clear()
+
+    def achieved_rate(self):
+        """实际检查频率(次/秒)"""
+        if not self.average_period:
+            return 0.0
+        return 1.0 / self.average_period
@@ -0,0 +1,220 @@
+# table_layout.py
+# 表格版面分析 - 找出课程表格的列，之后只把课程名（和课余量）这几列交给OCR
+import cv2
+import numpy as np
+
+from layout_cache import find_runs
+
+# 默认保留的列（按表头文字匹配）
+DEFAULT_COLUMN_NAMES = ('课程名', '课余量', 'Course', 'Seats')
+
+
+def line_mask(gray):
+    """把灰度图二值化为"线条/文字为白"的掩码，浅灰色的表格线也能保留下来"""
+    return cv2.adaptiveThreshold(cv2.bitwise_not(gray), 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                 cv2.THRESH_BINARY, 15, -2)
+
+
+def group_positions(positions, max_gap=2):
+    """把相邻的坐标合并为一条线，返回每条线的 (起点, 终点)"""
+    if len(positions) == 0:
+        return []
+    mask = np.zeros(int(positions[-1]) + 1, dtype=bool)
+    mask[positions] = True
+    return find_runs(mask, max_gap=max_gap)
+
+
+def find_vertical_lines(mask, min_coverage=0.5):
+    """
+    找出贯穿表格的竖线
+
+    返回: [(左, 右), ...]
+    """
+    height = mask.shape[0]
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(20, height // 10)))
+    vertical = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    coverage = np.count_nonzero(vertical, axis=0) / float(height)
+    return group_positions(np.flatnonzero(coverage >= min_coverage))
+
+
+def remove_horizontal_lines(mask):
+    """去掉横线（行分隔线、表头底色边缘），只留下文字"""
+    width = mask.shape[1]
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(20, width // 10), 1))
+    horizontal = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    return cv2.subtract(mask, horizontal)
+
+
+def columns_from_lines(lines, width, min_width=8):
+    """由竖线位置得到各列的左右边界"""
+    edges = [0] + [edge for line in lines for edge in line] + [width]
+    columns = []
+    for left, right in zip(edges[::2], edges[1::2]):
+        if right - left >= min_width:
+            columns.append((int(left), int(right)))
+    return columns
+
+
+def columns_from_gutters(mask, min_gap=None):
+    """没有竖线的表格：按文字之间的竖直空白带划分列"""
+    width = mask.shape[1]
+    text = remove_horizontal_lines(mask)
+    ink = np.count_nonzero(text, axis=0) > 0
+    min_gap = min_gap if min_gap is not None else max(8, width // 100)
+    return find_runs(ink, max_gap=min_gap)
+
+
+def detect_columns(gray, quantum=4):
+    """
+    检测表格的列
+
+    返回: (列边界列表 [(左, 右), ...], 版面签名)；签名只由竖线位置决定，用于发现表格结构变化
+    """
+    mask = line_mask(gray)
+    lines = find_vertical_lines(mask)
+    if len(lines) >= 2:
+        columns = columns_from_lines(lines, gray.shape[1])
+        signature = ('lines',) + tuple(left // quantum for left, _ in lines)
+    else:
+        columns = columns_from_gutters(mask)
+        signature = ('gutters', len(columns))
+    return columns, signature
+
+
+def column_of(box, columns):
+    """文字框中心所在的列序号，不在任何列内时返回None"""
+    center_x = sum(point[0] for point in box) / len(box)
+    for index, (left, right) in enumerate(columns):
+        if left <= center_x < right:
+            return index
+    return None
+
+
+def normalize(text):
+    """去掉空白，英文转小写，便于比较表头"""
+    return ''.join(text.split()).lower()
+
+
+def select_columns(columns, results, column_names=DEFAULT_COLUMN_NAMES, find_keywords=None):
+    """
+    选出需要识别的列
+
+    依次尝试：表头文字与 column_names 匹配的列 → 含有关键词的列 → 中文字符最多的列
+
+    参数:
+    columns: 列边界
+    results: 整幅图像的识别结果 [(box, text, confidence), ...]
+    column_names: 需要保留的列的表头名称
+    find_keywords: 函数，输入文字列表返回其中包含的关键词
+
+    返回: 选中的列序号列表
+    """
+    if not columns or not results:
+        return []
+
+    # 表头：最靠上的一行文字
+    top = min(min(point[1] for point in box) for box, *_ in results)
+    line_height = min(max(point[1] for point in box) - min(point[1] for point in box)
+                      for box, *_ in results)
+    names = [normalize(name) for name in column_names]
+
+    selected = set()
+    column_texts = [[] for _ in columns]
+    for box, text, *_ in results:
+        index = column_of(box, columns)
+        if index is None:
+            continue
+        column_texts[index].append(text)
+        if min(point[1] for point in box) <= top + max(4, line_height):
+            header = normalize(text)
+            if header and any(name in header or header in name for name in names):
+                selected.add(index)
+    if selected:
+        return sorted(selected)
+
+    if find_keywords is not None:
+        selected = {index for index, texts in enumerate(column_texts) if find_keywords(texts)}
+        if selected:
+            return sorted(selected)
+
+    cjk_counts = [sum(1 for text in texts for ch in text if '一' <= ch <= '鿿')
+                  for texts in column_texts]
+    if max(cjk_counts) > 0:
+        return [cjk_counts.index(max(cjk_counts))]
+    return []
+
+
+class TableLayout:
+    """
+    表格版面
+    功能：记录各列位置和选中的列，把每帧图像中选中的列左右拼接成一幅较窄的图像，
+    列之间用背景色隔开；写入轮换使用的输出缓冲区，不在每帧分配内存
+    """
+
+    def __init__(self, shape, columns, signature, selected, background=255, gap=16, ring_size=4):
+        """
+        参数:
+        shape: 学习版面时的图像尺寸
+        columns: 列边界 [(左, 右), ...]
+        signature: 版面签名
+        selected: 选中的列序号，为空时不裁剪
+        background: 列之间填充的灰度值
+        gap: 列之间的间隔(像素)
+        ring_size: 输出缓冲区个数
+        """
+        self.shape = shape
+        self.columns = columns
+        self.signature = signature
+        self.selected = selected
+        self.background = background
+        self.gap = gap
+
+        self.spans = [columns[index] for index in selected]
+        self.ring = []
+        if self.spans:
+            width = sum(right - left for left, right in self.spans) + gap * (len(self.spans) - 1)
+            self.ring = [np.full((shape[0], width), background, dtype=np.uint8)
+                         for _ in range(max(1, ring_size))]
+        self.ring_index = 0
+
+    @classmethod
+    def learn(cls, gray, recognize_detailed, column_names=DEFAULT_COLUMN_NAMES,
+              find_keywords=None, gap=16, ring_size=4):
+        """
+        在一帧图像上学习版面
+
+        参数:
+        recognize_detailed: 识别函数，输入图像返回 [(box, text, confidence), ...]，用于读取表头
+        """
+        columns, signature = detect_columns(gray)
+        selected = []
+        if len(columns) >= 2:
+            selected = select_columns(columns, recognize_detailed(gray), column_names, find_keywords)
+        return cls(gray.shape, columns, signature, selected,
+                   background=int(np.median(gray)), gap=gap, ring_size=ring_size)
+
+    def matches(self, gray):
+        """当前图像的表格结构是否与学习时一致"""
+        return gray.shape == self.shape and detect_columns(gray)[1] == self.signature
+
+    def crop(self, gray):
+        """只保留选中的列；没有选中的列时原样返回"""
+        if not self.spans or gray.shape != self.shape:
+            return gray
+        output = self.ring[self.ring_index]
+        self.ring_index = (self.ring_index + 1) % len(self.ring)
+
+        x = 0
+        for left, right in self.spans:
+            width = right - left
+            output[:, x:x + width] = gray[:, left:right]
+            x += width + self.gap
+        return output
+
+    def describe(self):
+        """选中列的说明文字"""
+        if not self.spans:
+            return "未找到需要识别的列，识别整个区域"
+        kept = sum(right - left for left, right in self.spans)
+        return (f"共{len(self.columns)}列，只识别第{', '.join(str(i + 1) for i in self.selected)}列 "
+                f"(宽度{kept}/{self.shape[1]}像素)")
@@ -0,0 +1,139 @@
+# template_tracker.py
+# 模板匹配快速通道 - OCR确认过的关键词截成模板，之后用 cv2.matchTemplate 在毫秒级重新找到它
+import unicodedata
+
+import cv2
+import numpy as np
+
+
+def char_width(ch):
+    """估计字符的相对显示宽度：全角字符为1，半角字符约为一半"""
+    if ch.isspace():
+        return 0.3
+    return 1.0 if unicodedata.east_asian_width(ch) in ('W', 'F') else 0.55
+
+
+def keyword_box(box, text, keyword, padding=2):
+    """
+    根据整行文字框估算关键词所在的子区域
+
+    参数:
+    box: OCR 返回的文字框四个顶点
+    text: 该文字框识别出的整行文字
+    keyword: 关键词
+
+    返回: (x1, y1, x2, y2)
+    """
+    xs = [point[0] for point in box]
+    ys = [point[1] for point in box]
+    x_min, x_max = min(xs), max(xs)
+    y_min, y_max = min(ys), max(ys)
+
+    start = text.find(keyword)
+    total = sum(char_width(ch) for ch in text)
+    if start >= 0 and total > 0:
+        before = sum(char_width(ch) for ch in text[:start])
+        width = sum(char_width(ch) for ch in keyword)
+        line_width = x_max - x_min
+        x_min, x_max = (x_min + line_width * before / total,
+                        x_min + line_width * (before + width) / total)
+
+    return (int(x_min) - padding, int(y_min) - padding,
+            int(round(x_max)) + padding, int(round(y_max)) + padding)
+
+
+class TemplateTracker:
+    """
+    关键词模板跟踪器
+    功能：保存每个已确认关键词在屏幕上的截图，之后优先在上次出现的位置附近、
+    再在整幅图像中做模板匹配，匹配度足够高即可认定关键词仍然存在
+    """
+
+    MIN_TEMPLATE_SIZE = 8  # 模板最小宽高(像素)
+    MIN_TEMPLATE_STD = 5.0  # 模板灰度标准差下限，纯色区域无法可靠匹配
+
+    def __init__(self, match_threshold=0.9, search_margin=40):
+        """
+        参数:
+        match_threshold: 归一化相关系数阈值，达到该值认为找到了关键词
+        search_margin: 上次位置附近的优先搜索范围(像素)
+        """
+        self.match_threshold = match_threshold
+        self.search_margin = search_margin
+        self.templates = {}  # 关键词 -> 模板图像
+        self.locations = {}  # 关键词 -> 上次出现的左上角坐标
+
+    def has_templates(self):
+        """是否已经学到了模板"""
+        return bool(self.templates)
+
+    def learn(self, image, results, find_keywords):
+        """
+        从OCR结果中截取关键词模板
+
+        参数:
+        image: 本次OCR使用的灰度图像
+        results: [(box, text, confidence), ...]
+        find_keywords: 函数，输入文字列表返回其中包含的关键词
+        """
+        height, width = image.shape[:2]
+        for result in results:
+            if len(result) < 2:
+                continue
+            box, text = result[0], result[1]
+            for keyword in find_keywords([text]):
+                x1, y1, x2, y2 = keyword_box(box, text, keyword)
+                x1, y1 = max(0, x1), max(0, y1)
+                x2, y2 = min(width, x2), min(height, y2)
+                if x2 - x1 < self.MIN_TEMPLATE_SIZE or y2 - y1 < self.MIN_TEMPLATE_SIZE:
+                    continue
+
+                # 图像可能是复用的缓冲区，模板必须拷贝保存
+                template = image[y1:y2, x1:x2].copy()
+                if float(np.std(template)) < self.MIN_TEMPLATE_STD:
+                    continue
+                self.templates[keyword] = template
+                self.locations[keyword] = (x1, y1)
+
+    def match(self, image, template):
+        """在图像中匹配模板，返回 (最高匹配度, 左上角坐标)"""
+        if image.shape[0] < template.shape[0] or image.shape[1] < template.shape[1]:
+            return 0.0, None
+        scores = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, location = cv2.minMaxLoc(scores)
+        return best, location
+
+    def search(self, image):
+        """
+        在图像中查找所有已学习的关键词
+
+        返回: 找到的关键词列表
+        """
+        found = []
+        height, width = image.shape[:2]
+        for keyword, template in self.templates.items():
+            t_height, t_width = template.shape[:2]
+
+            # 先在上次出现的位置附近找，找不到再搜索整幅图像
+            last = self.locations.get(keyword)
+            best, location = 0.0, None
+            if last is not None:
+                x1 = max(0, last[0] - self.search_margin)
+                y1 = max(0, last[1] - self.search_margin)
+                x2 = min(width, last[0] + t_width + self.search_margin)
+                y2 = min(height, last[1] + t_height + self.search_margin)
+                best, location = self.match(image[y1:y2, x1:x2], template)
+                if location is not None:
+                    location = (location[0] + x1, location[1] + y1)
+            if best < self.match_threshold:
+                best, location = self.match(image, template)
+
+            if best >= self.match_threshold:
+                self.locations[keyword] = location
+                found.append(keyword)
+        return found
+
+    def reset(self):
+        """清空所有模板"""
+        self.templates = {}
+        self.locations = {}
@@ -0,0 +1,6 @@
+# conftest.py
+# 测试只覆盖不依赖屏幕、鼠标和OCR模型的纯逻辑模块，模块都在项目根目录下
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
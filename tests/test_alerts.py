@@ -0,0 +1,34 @@
+# test_alerts.py
+import threading
+
+from alerts import AlertDispatcher, accepts_argument
+
+
+def test_accepts_argument_for_old_and_new_callbacks():
+    assert accepts_argument(lambda matches: None)
+    assert accepts_argument(lambda matches=None: None)
+    assert accepts_argument(lambda *args: None)
+    assert not accepts_argument(lambda: None)
+
+    class App:
+        def on_detected(self):
+            pass
+
+    assert not accepts_argument(App().on_detected)
+    assert accepts_argument(print)
+
+
+def test_dispatch_runs_handlers_with_matches():
+    dispatcher = AlertDispatcher(workers=2, verbose=False)
+    received = []
+    done = threading.Event()
+
+    def handler(matches):
+        received.append(matches)
+        done.set()
+
+    dispatcher.register('callback', handler)
+    dispatcher.dispatch({'监控区域': ['机器学习']})
+    assert done.wait(5)
+    dispatcher.close()
+    assert received == [{'监控区域': ['机器学习']}]
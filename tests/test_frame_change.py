@@ -0,0 +1,55 @@
+# test_frame_change.py
+import numpy as np
+
+from frame_change import FrameChangeDetector
+
+
+def make_frame(value=255, shape=(200, 400)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_first_frame_counts_as_changed():
+    detector = FrameChangeDetector()
+    assert detector.has_changed(make_frame())
+
+
+def test_identical_frame_is_unchanged():
+    detector = FrameChangeDetector()
+    detector.has_changed(make_frame())
+    assert not detector.has_changed(make_frame())
+
+
+def test_new_text_line_is_detected():
+    detector = FrameChangeDetector()
+    detector.has_changed(make_frame())
+    frame = make_frame()
+    frame[100:110, 20:300] = 0
+    assert detector.has_changed(frame)
+
+
+def test_small_noise_below_pixel_delta_is_ignored():
+    detector = FrameChangeDetector(pixel_delta=12)
+    detector.has_changed(make_frame(200))
+    assert not detector.has_changed(make_frame(205))
+
+
+def test_reference_kept_until_change_so_slow_drift_accumulates():
+    detector = FrameChangeDetector(pixel_delta=12)
+    detector.has_changed(make_frame(200))
+    assert not detector.has_changed(make_frame(208))
+    # 与参考帧(200)比较而不是与上一帧(208)比较
+    assert detector.has_changed(make_frame(216))
+
+
+def test_reset_forces_change_and_shape_change_counts():
+    detector = FrameChangeDetector()
+    detector.has_changed(make_frame())
+    detector.reset()
+    assert detector.has_changed(make_frame())
+    assert detector.has_changed(make_frame(shape=(100, 400)))
+
+
+def test_color_frames_are_accepted():
+    detector = FrameChangeDetector()
+    assert detector.has_changed(np.full((120, 300, 3), 255, dtype=np.uint8))
+    assert not detector.has_changed(np.full((120, 300, 3), 255, dtype=np.uint8))
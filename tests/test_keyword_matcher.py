@@ -0,0 +1,77 @@
+# test_keyword_matcher.py
+from keyword_matcher import AhoCorasick, KeywordMatcher, build_allowlist, within_edit_distance
+
+KEYWORDS = ["机器学习", "模式识别", "Python"]
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick([("he", "he"), ("she", "she"), ("hers", "hers")])
+    assert sorted(value for _, value in automaton.iter_matches("ushers")) == ["he", "hers", "she"]
+
+
+def test_exact_match_in_keyword_order():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.find(["Python程序设计 3学分", "机器学习(双语)"]) == ["机器学习", "Python"]
+    assert matcher.find(["计算机网络"]) == []
+
+
+def test_exact_match_does_not_cross_lines():
+    matcher = KeywordMatcher(["机器学习"])
+    assert matcher.find(["机器", "学习"]) == []
+
+
+def test_fuzzy_tolerates_confusable_characters_and_width():
+    matcher = KeywordMatcher(KEYWORDS, fuzzy=True)
+    assert matcher.find(["机器学刁"]) == ["机器学习"]
+    assert matcher.find(["ＰＹＴＨＯＮ 基础"]) == ["Python"]
+
+
+def test_fuzzy_allows_one_substitution_or_extra_character():
+    matcher = KeywordMatcher(["多媒体技术"], fuzzy=True, max_edits=1)
+    assert matcher.find(["多媒体投术"]) == ["多媒体技术"]
+    assert matcher.find(["多媒体·技术"]) == ["多媒体技术"]
+
+
+def test_fuzzy_rejects_truncated_keywords_and_decoys():
+    matcher = KeywordMatcher(KEYWORDS + ["多媒体技术"], fuzzy=True, max_edits=1)
+    # 残缺的片段和只共用部分字符的干扰课程都不能算命中
+    assert matcher.find(["器学习"]) == []
+    assert matcher.find(["机器学"]) == []
+    assert matcher.find(["机器人学", "模式设计", "多媒体设计", "多媒体"]) == []
+
+
+def test_within_edit_distance_requires_full_length_span():
+    assert within_edit_distance("abcd", "xxabxdxx", 1)
+    assert within_edit_distance("abcd", "abcxd", 1)
+    assert not within_edit_distance("abcd", "bcd", 1)
+    assert not within_edit_distance("abcd", "abd", 1)
+
+
+def test_reachable_only_skips_lines_without_keyword_characters():
+    matcher = KeywordMatcher(KEYWORDS, reachable_only=True)
+    assert matcher.reachable_keywords("000123 机器学习") == ["机器学习"]
+    assert matcher.reachable_keywords("000123 - 3") == []
+    assert matcher.find(["000123", "模式识别"]) == ["模式识别"]
+
+
+def test_build_allowlist_contains_keyword_characters_both_cases():
+    allowlist = build_allowlist(["Py学"], extra="0")
+    assert set(allowlist) == set("0PpYy学")
+    assert allowlist == ''.join(sorted(allowlist))
+
+
+def test_fuzzy_short_latin_keywords_need_whole_words():
+    matcher = KeywordMatcher(["AI", "机器学习"], fuzzy=True)
+    # 大小写归一化后 "ai" 出现在普通单词里，不能因此误报
+    assert matcher.find(["Training Course", "Maintenance", "机器学刁"]) == ["机器学习"]
+    assert matcher.find(["TRAINING"]) == []
+    assert matcher.find(["代码和AI框架"]) == ["AI"]
+    assert matcher.find(["ＡＩ Course"]) == ["AI"]
+
+
+def test_fuzzy_short_keywords_are_matched_exactly():
+    matcher = KeywordMatcher(["数学", "ai"], fuzzy=True, reachable_only=True)
+    assert matcher.find(["数学分析"]) == ["数学"]
+    assert matcher.find(["AI导论"]) == []
+    assert matcher.reachable_keywords("ai 01") == ["ai"]
+    assert matcher.reachable_keywords("AI 01") == []
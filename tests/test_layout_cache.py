@@ -0,0 +1,59 @@
+# test_layout_cache.py
+import numpy as np
+
+from layout_cache import TextBoxCache, find_runs, layout_signature
+
+BOXES = ([[0, 10, 0, 10]], [])
+
+
+def make_page(lines):
+    """白底页面，lines 为 [(上, 下, 左, 右), ...] 的黑色文字块"""
+    page = np.full((200, 256), 255, dtype=np.uint8)
+    for top, bottom, left, right in lines:
+        page[top:bottom, left:right] = 0
+    return page
+
+
+def test_find_runs_merges_small_gaps():
+    mask = np.array([1, 1, 0, 1, 0, 0, 0, 1], dtype=bool)
+    assert find_runs(mask) == [(0, 2), (3, 4), (7, 8)]
+    assert find_runs(mask, max_gap=1) == [(0, 4), (7, 8)]
+
+
+def test_signature_ignores_content_but_not_position():
+    page = make_page([(20, 30, 10, 200), (60, 70, 10, 120)])
+    same_layout = page.copy()
+    same_layout[22:28, 50:60] = 255  # 行内文字变化，行的范围不变
+    moved = make_page([(40, 50, 10, 200), (60, 70, 10, 120)])
+    assert layout_signature(page) == layout_signature(same_layout)
+    assert layout_signature(page) != layout_signature(moved)
+
+
+def test_boxes_reused_while_layout_is_stable():
+    cache = TextBoxCache(refresh_checks=30)
+    page = make_page([(20, 30, 10, 200)])
+    assert cache.lookup(page) is None
+    cache.store(BOXES)
+    assert cache.lookup(page) is BOXES
+    assert cache.reuse_ratio() == 0.5
+
+    assert cache.lookup(make_page([(80, 90, 10, 200)])) is None
+
+
+def test_refresh_after_refresh_checks_reuses():
+    cache = TextBoxCache(refresh_checks=2)
+    page = make_page([(20, 30, 10, 200)])
+    cache.lookup(page)
+    cache.store(BOXES)
+    assert cache.lookup(page) is BOXES
+    assert cache.lookup(page) is BOXES
+    assert cache.lookup(page) is None
+
+
+def test_reset_clears_boxes():
+    cache = TextBoxCache()
+    page = make_page([(20, 30, 10, 200)])
+    cache.lookup(page)
+    cache.store(BOXES)
+    cache.reset()
+    assert cache.lookup(page) is None
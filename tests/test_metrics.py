@@ -0,0 +1,77 @@
+# test_metrics.py
+import json
+
+import pytest
+
+from metrics import LatencyHistogram, MetricsRegistry, bucket_bounds, bucket_index
+
+
+@pytest.mark.parametrize('value', [0, 1, 63, 64, 65, 100, 1000, 12345, 10 ** 6, 10 ** 8])
+def test_bucket_contains_value_with_small_relative_error(value):
+    low, high = bucket_bounds(bucket_index(value))
+    assert low <= value < high
+    assert high - low <= max(1, low / 32.0)
+
+
+def test_bucket_index_is_monotonic():
+    indexes = [bucket_index(value) for value in range(0, 5000)]
+    assert indexes == sorted(indexes)
+
+
+def test_histogram_percentiles_within_bucket_error():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000.0)
+    assert histogram.percentile(50) == pytest.approx(0.050, rel=0.04)
+    assert histogram.percentile(99) == pytest.approx(0.099, rel=0.04)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    assert summary['min_ms'] == 1.0
+    assert summary['max_ms'] == 100.0
+
+
+def test_empty_histogram_summary():
+    assert LatencyHistogram().summary() == {'count': 0}
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_registry_timer_counters_and_snapshot():
+    registry = MetricsRegistry()
+    with registry.time('ocr'):
+        pass
+    registry.observe('ocr', 0.2)
+    registry.add_collector(lambda: {'checks_total': 3})
+    registry.add_collector(lambda: 1 / 0)  # 出错的计数来源不影响其他计数
+
+    snapshot = registry.snapshot()
+    assert snapshot['stages']['ocr']['count'] == 2
+    assert snapshot['counters'] == {'checks_total': 3}
+    json.dumps(snapshot)
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    with registry.time('ocr'):
+        pass
+    registry.observe('ocr', 0.1)
+    assert registry.snapshot()['stages'] == {}
+
+
+def test_prometheus_text_has_cumulative_buckets():
+    registry = MetricsRegistry(prefix='test')
+    for seconds in (0.002, 0.02, 0.2):
+        registry.observe('ocr', seconds)
+    text = registry.prometheus_text()
+    assert 'test_stage_seconds_bucket{stage="ocr",le="0.01"} 1' in text
+    assert 'test_stage_seconds_bucket{stage="ocr",le="0.25"} 3' in text
+    assert 'test_stage_seconds_count{stage="ocr"} 3' in text
+
+
+def test_jsonl_sink_writes_final_snapshot(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    registry = MetricsRegistry()
+    registry.observe('click', 0.01)
+    registry.start_exporters(jsonl_path=str(path), jsonl_interval=60, verbose=False)
+    registry.close()
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[-1])['stages']['click']['count'] == 1
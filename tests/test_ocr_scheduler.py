@@ -0,0 +1,118 @@
+# test_ocr_scheduler.py
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from ocr_scheduler import FairOCRScheduler
+
+
+class Recorder:
+    """记录识别顺序；gate 未打开前第一次识别会一直阻塞，便于先把请求排好队"""
+
+    def __init__(self):
+        self.order = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def blocking(self, name):
+        self.started.set()
+        self.gate.wait(5)
+        self.order.append(name)
+        return name
+
+    def record(self, name):
+        self.order.append(name)
+        return name
+
+
+class FakeMetrics:
+    def __init__(self):
+        self.stages = []
+
+    def observe(self, stage, seconds):
+        self.stages.append(stage)
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = FairOCRScheduler().start()
+    yield scheduler
+    scheduler.close()
+
+
+def test_sessions_are_served_round_robin(scheduler):
+    recorder = Recorder()
+    a = scheduler.executor('a')
+    b = scheduler.executor('b')
+    first = a.submit(recorder.blocking, 'a0')
+    assert recorder.started.wait(5)
+
+    # a 一次提交了很多请求，b 只有两个：b 不会排在 a 的所有请求之后
+    futures = [a.submit(recorder.record, f'a{i}') for i in range(1, 5)]
+    futures += [b.submit(recorder.record, f'b{i}') for i in range(2)]
+    recorder.gate.set()
+    for future in [first] + futures:
+        future.result(timeout=5)
+
+    assert recorder.order == ['a0', 'b0', 'a1', 'b1', 'a2', 'a3', 'a4']
+
+
+def test_results_exceptions_and_metrics(scheduler):
+    metrics = FakeMetrics()
+    executor = scheduler.executor('a', metrics=metrics)
+    assert executor.submit(lambda x, y: x + y, 1, 2).result(timeout=5) == 3
+
+    def fail():
+        raise ValueError('ocr failed')
+
+    with pytest.raises(ValueError):
+        executor.submit(fail).result(timeout=5)
+    assert metrics.stages.count('ocr_queue_wait') == 2
+    assert metrics.stages.count('ocr_service') == 2
+
+    summary = scheduler.summary()
+    assert summary['a']['served'] == 2
+    assert summary['a']['mean_wait_ms'] >= 0
+
+
+def test_duplicate_session_name_is_rejected(scheduler):
+    scheduler.executor('a')
+    with pytest.raises(ValueError):
+        scheduler.executor('a')
+
+
+def test_shutdown_cancels_only_that_sessions_pending_requests(scheduler):
+    recorder = Recorder()
+    a = scheduler.executor('a')
+    b = scheduler.executor('b')
+    running = a.submit(recorder.blocking, 'a0')
+    assert recorder.started.wait(5)
+    pending_a = a.submit(recorder.record, 'a1')
+    pending_b = b.submit(recorder.record, 'b0')
+
+    a.shutdown()
+    recorder.gate.set()
+    assert running.result(timeout=5) == 'a0'
+    assert pending_b.result(timeout=5) == 'b0'
+    with pytest.raises(CancelledError):
+        pending_a.result(timeout=5)
+    assert recorder.order == ['a0', 'b0']
+
+
+def test_close_cancels_pending_and_rejects_new_requests():
+    scheduler = FairOCRScheduler().start()
+    recorder = Recorder()
+    executor = scheduler.executor('a')
+    running = executor.submit(recorder.blocking, 'a0')
+    assert recorder.started.wait(5)
+    pending = executor.submit(recorder.record, 'a1')
+
+    scheduler.close()
+    recorder.gate.set()
+    assert running.result(timeout=5) == 'a0'
+    assert pending.cancelled()
+    scheduler.thread.join(5)
+    assert not scheduler.thread.is_alive()
+    with pytest.raises(RuntimeError):
+        executor.submit(recorder.record, 'a2')
@@ -0,0 +1,54 @@
+# test_pipeline.py
+import threading
+import time
+
+from pipeline import DropOldestQueue
+
+
+def test_full_queue_drops_oldest():
+    queue = DropOldestQueue(maxsize=2)
+    for item in range(5):
+        queue.put(item)
+    assert queue.dropped == 3
+    assert queue.get(timeout=0) == 3
+    assert queue.get(timeout=0) == 4
+
+
+def test_get_latest_discards_older_items():
+    queue = DropOldestQueue(maxsize=3)
+    for item in range(3):
+        queue.put(item)
+    assert queue.get_latest(timeout=0) == 2
+    assert queue.dropped == 2
+    assert queue.get(timeout=0) is None
+
+
+def test_get_times_out_when_empty():
+    queue = DropOldestQueue()
+    start = time.monotonic()
+    assert queue.get(timeout=0.05) is None
+    assert time.monotonic() - start >= 0.04
+
+
+def test_put_wakes_waiting_consumer():
+    queue = DropOldestQueue()
+    results = []
+    consumer = threading.Thread(target=lambda: results.append(queue.get(timeout=5)))
+    consumer.start()
+    time.sleep(0.05)
+    queue.put('frame')
+    consumer.join(timeout=5)
+    assert results == ['frame']
+
+
+def test_close_wakes_waiting_consumer():
+    queue = DropOldestQueue()
+    results = []
+    consumer = threading.Thread(target=lambda: results.append(queue.get_latest(timeout=5)))
+    consumer.start()
+    time.sleep(0.05)
+    start = time.monotonic()
+    queue.close()
+    consumer.join(timeout=5)
+    assert results == [None]
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,67 @@
+# test_preprocess.py
+import numpy as np
+import pytest
+
+from preprocess import Preprocessor
+
+
+def make_frame(value=200, shape=(100, 200, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_output_is_scaled_grayscale():
+    preprocessor = Preprocessor(scale=0.5, sharpen=False)
+    output = preprocessor.process(make_frame(), 'RGB')
+    assert output.shape == (50, 100)
+    assert output.dtype == np.uint8
+    assert int(output[0, 0]) == 200
+
+
+def test_configure_changes_output_scale():
+    preprocessor = Preprocessor(scale=0.7, sharpen=False)
+    assert preprocessor.process(make_frame(), 'RGB').shape == (70, 140)
+    preprocessor.configure(scale=0.5)
+    assert preprocessor.process(make_frame(), 'RGB').shape == (50, 100)
+    preprocessor.configure(scale=1.0)
+    assert preprocessor.process(make_frame(), 'RGB').shape == (100, 200)
+
+
+def test_gray_input_without_scaling_is_copied_out_of_backend_buffer():
+    preprocessor = Preprocessor(scale=1.0, sharpen=False)
+    frame = np.full((40, 60), 10, dtype=np.uint8)
+    output = preprocessor.process(frame, 'GRAY')
+    frame[:] = 99
+    assert int(output[0, 0]) == 10
+
+
+def test_ring_buffer_is_overwritten_after_ring_size_frames():
+    """返回的图像是轮换使用的缓冲区：跨线程长时间持有的帧必须由使用者拷贝"""
+    preprocessor = Preprocessor(scale=1.0, sharpen=False, ring_size=2)
+    first = preprocessor.process(make_frame(10), 'RGB')
+    kept = first.copy()
+    preprocessor.process(make_frame(20), 'RGB')
+    assert int(first[0, 0]) == 10
+    third = preprocessor.process(make_frame(30), 'RGB')
+    assert third is first
+    assert int(first[0, 0]) == 30
+    assert int(kept[0, 0]) == 10
+
+
+def test_steady_state_reuses_buffers():
+    preprocessor = Preprocessor(scale=0.5, sharpen=True, binarize='otsu', ring_size=3)
+    outputs = [preprocessor.process(make_frame(), 'BGR') for _ in range(6)]
+    assert outputs[0] is outputs[3]
+    assert len({id(output) for output in outputs}) == 3
+
+
+@pytest.mark.parametrize('mode', ['otsu', 'adaptive'])
+def test_binarize_outputs_only_black_and_white(mode):
+    frame = make_frame(230)
+    frame[40:60, 20:180] = 30
+    output = Preprocessor(scale=1.0, sharpen=False, binarize=mode).process(frame, 'RGB')
+    assert set(np.unique(output)) <= {0, 255}
+
+
+def test_unknown_binarize_mode_is_rejected():
+    with pytest.raises(ValueError):
+        Preprocessor(binarize='sauvola')
@@ -0,0 +1,69 @@
+# test_resource_governor.py
+import pytest
+
+import resource_governor
+from resource_governor import ResourceGovernor
+
+
+class FakeClock:
+    """替代 time 模块：墙上时间和进程CPU时间都由测试推进"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.cpu = 10.0
+
+    def monotonic(self):
+        return self.now
+
+    def process_time(self):
+        return self.cpu
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resource_governor, 'time', fake)
+    return fake
+
+
+def make_governor(cpu_percent):
+    # 只允许一个核，预算百分比即单核占用
+    governor = ResourceGovernor(affinity=[0], cpu_percent=cpu_percent, window=5.0, verbose=False)
+    governor.reset()
+    return governor
+
+
+def test_no_budget_never_throttles(clock):
+    governor = make_governor(None)
+    clock.now += 1.0
+    clock.cpu += 1.0
+    assert governor.throttle_delay() == 0.0
+
+
+def test_delay_brings_average_back_to_budget(clock):
+    governor = make_governor(50)
+    clock.now += 1.0
+    clock.cpu += 1.0  # 1秒内用满一个核
+    assert governor.throttle_delay() == pytest.approx(1.0)
+    assert governor.throttle_count == 1
+    assert governor.summary()['cpu_percent_limit'] == 50
+
+
+def test_time_already_waited_is_not_throttled_again(clock):
+    """调度器按 cpu_budget 等过的时间计入统计，两个限制取更严格的一个而不是相加"""
+    governor = make_governor(50)
+    clock.now += 1.0
+    clock.cpu += 1.0
+    clock.now += 0.6  # 调度器已经等了0.6秒
+    assert governor.throttle_delay() == pytest.approx(0.4)
+    clock.now += 2.0
+    assert governor.throttle_delay() == 0.0
+
+
+def test_cpu_share_uses_recent_window(clock):
+    governor = make_governor(None)
+    for _ in range(10):
+        clock.now += 1.0
+        clock.cpu += 0.25
+        governor.sample()
+    assert governor.cpu_share() == pytest.approx(25.0)
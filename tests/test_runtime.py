@@ -0,0 +1,91 @@
+# test_runtime.py
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from runtime import CancellableTask, CancelToken, TaskCancelled
+
+
+def cancel_later(token, delay=0.05):
+    timer = threading.Timer(delay, token.cancel)
+    timer.start()
+    return timer
+
+
+def test_sleep_returns_false_after_full_wait():
+    token = CancelToken()
+    assert token.sleep(0.01) is False
+
+
+def test_cancel_interrupts_sleep():
+    token = CancelToken()
+    cancel_later(token)
+    start = time.monotonic()
+    assert token.sleep(10) is True
+    assert time.monotonic() - start < 1.0
+
+
+def test_wait_event_returns_when_event_set():
+    token = CancelToken()
+    event = threading.Event()
+    threading.Timer(0.05, event.set).start()
+    assert token.wait_event(event, timeout=10) is True
+
+
+def test_cancel_interrupts_wait_event():
+    token = CancelToken()
+    event = threading.Event()
+    cancel_later(token)
+    start = time.monotonic()
+    assert token.wait_event(event, timeout=10) is False
+    assert time.monotonic() - start < 1.0
+    assert not token.waiters
+
+
+def test_wait_future_returns_result_or_raises():
+    token = CancelToken()
+    future = Future()
+    threading.Timer(0.05, future.set_result, args=(42,)).start()
+    assert token.wait_future(future, timeout=10) == 42
+
+    failed = Future()
+    failed.set_exception(ValueError('ocr failed'))
+    with pytest.raises(ValueError):
+        token.wait_future(failed)
+
+    with pytest.raises(TimeoutError):
+        token.wait_future(Future(), timeout=0.01)
+
+
+def test_cancel_interrupts_wait_future():
+    token = CancelToken()
+    cancel_later(token)
+    with pytest.raises(TaskCancelled):
+        token.wait_future(Future(), timeout=10)
+
+
+def test_cancellable_task_stops_on_cancel():
+    ticks = []
+
+    def loop(token_holder):
+        while not token_holder[0].token.sleep(0.01):
+            ticks.append(1)
+
+    holder = []
+    task = CancellableTask(loop, args=(holder,), name='test')
+    holder.append(task)
+    task.start()
+    time.sleep(0.05)
+    task.cancel()
+    assert task.join(timeout=2)
+    assert ticks
+
+
+def test_task_cancelled_inside_target_is_swallowed():
+    def target():
+        raise TaskCancelled()
+
+    task = CancellableTask(target).start()
+    assert task.join(timeout=2)
@@ -0,0 +1,63 @@
+# test_scheduler.py
+import threading
+import time
+
+import pytest
+
+from scheduler import AdaptiveScheduler
+
+
+def make_scheduler(**kwargs):
+    options = dict(base_interval=1.0, min_interval=0.1, max_interval=2.0,
+                   burst_duration=3.0, backoff_factor=2.0)
+    options.update(kwargs)
+    return AdaptiveScheduler(**options)
+
+
+def test_static_screen_backs_off_to_max_interval():
+    scheduler = make_scheduler()
+    scheduler.record_check(100.0, 0.01, changed=False)
+    assert scheduler.interval == 2.0
+    assert scheduler.next_deadline == pytest.approx(102.0)
+    scheduler.record_check(102.0, 0.01, changed=False)
+    assert scheduler.interval == 2.0
+
+
+def test_change_starts_burst_at_min_interval():
+    scheduler = make_scheduler()
+    scheduler.record_check(100.0, 0.01, changed=True)
+    assert scheduler.interval == 0.1
+    # 快速检查阶段内即使画面不变也保持最短间隔
+    scheduler.record_check(102.0, 0.01, changed=False)
+    assert scheduler.interval == 0.1
+    scheduler.record_check(103.5, 0.01, changed=False)
+    assert scheduler.interval == 0.2
+
+
+def test_cpu_budget_stretches_deadline():
+    scheduler = make_scheduler(cpu_budget=0.5)
+    scheduler.record_check(100.0, 0.4, changed=True)
+    # 检查耗时0.4秒、预算50%，下一次检查至少在0.8秒之后
+    assert scheduler.next_deadline == pytest.approx(100.8)
+
+
+def test_achieved_rate_from_check_period():
+    scheduler = make_scheduler()
+    assert scheduler.achieved_rate() == 0.0
+    for start in (0.0, 0.5, 1.0):
+        scheduler.record_check(start, 0.01, changed=True)
+    assert scheduler.achieved_rate() == pytest.approx(2.0)
+
+
+def test_notify_refresh_wakes_waiter_early():
+    scheduler = make_scheduler(min_interval=0.05)
+    scheduler.next_deadline = time.monotonic() + 10.0
+    waiter = threading.Thread(target=scheduler.wait)
+    start = time.monotonic()
+    waiter.start()
+    time.sleep(0.05)
+    scheduler.notify_refresh()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert time.monotonic() - start < 1.0
+    assert scheduler.interval == 0.05
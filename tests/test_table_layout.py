@@ -0,0 +1,103 @@
+# test_table_layout.py
+import numpy as np
+
+from table_layout import TableLayout, column_of, detect_columns, select_columns
+
+LINES = (0, 100, 220, 320, 399)  # 竖线的横坐标，共四列
+
+
+def make_table(lines=LINES, height=200, width=400):
+    """白底表格：贯穿全高的竖线，每列中间有几行"文字"块"""
+    table = np.full((height, width), 255, dtype=np.uint8)
+    for x in lines:
+        table[:, x:x + 1] = 0
+    for left, right in zip(lines, lines[1:]):
+        for top in range(20, height - 20, 40):
+            table[top:top + 10, left + 10:right - 10] = 0
+    return table
+
+
+def box(left, top, right, bottom):
+    return [[left, top], [right, top], [right, bottom], [left, bottom]]
+
+
+def test_detect_columns_between_vertical_lines():
+    columns, signature = detect_columns(make_table())
+    assert len(columns) == 4
+    for (left, right), (line_left, line_right) in zip(columns, zip(LINES, LINES[1:])):
+        assert line_left <= left < line_left + 4
+        assert line_right - 4 < right <= line_right + 1
+    assert signature[0] == 'lines'
+
+
+def test_signature_changes_when_columns_move():
+    _, signature = detect_columns(make_table())
+    _, same = detect_columns(make_table())
+    _, moved = detect_columns(make_table(lines=(0, 150, 220, 320, 399)))
+    assert signature == same
+    assert signature != moved
+
+
+def test_column_of_uses_box_center():
+    columns = [(0, 100), (100, 200)]
+    assert column_of(box(10, 0, 90, 10), columns) == 0
+    assert column_of(box(90, 0, 130, 10), columns) == 1
+    assert column_of(box(210, 0, 230, 10), columns) is None
+
+
+def test_select_columns_prefers_header_names():
+    columns = [(0, 100), (100, 200), (200, 300)]
+    results = [
+        (box(10, 0, 60, 12), '序号', 0.9),
+        (box(110, 0, 170, 12), '课程名', 0.9),
+        (box(210, 0, 260, 12), '课余量', 0.9),
+        (box(10, 30, 60, 42), '1', 0.9),
+        (box(110, 30, 190, 42), '机器学习', 0.9),
+    ]
+    assert select_columns(columns, results) == [1, 2]
+
+
+def test_select_columns_falls_back_to_keywords_then_chinese_text():
+    columns = [(0, 100), (100, 200)]
+    results = [
+        (box(10, 0, 60, 12), '序号', 0.9),
+        (box(110, 0, 170, 12), '名称', 0.9),
+        (box(10, 30, 90, 42), '多媒体技术', 0.9),
+        (box(110, 30, 190, 42), '数学分析与高等代数', 0.9),
+    ]
+    find_keywords = lambda texts: [text for text in texts if text == '多媒体技术']
+    assert select_columns(columns, results, find_keywords=find_keywords) == [0]
+    assert select_columns(columns, results) == [1]
+    assert select_columns(columns, []) == []
+
+
+def test_crop_joins_selected_columns_with_gap():
+    gray = np.tile(np.arange(300, dtype=np.uint8), (10, 1))
+    layout = TableLayout(gray.shape, [(0, 100), (100, 200), (200, 300)], ('lines',), [0, 2],
+                         background=255, gap=5, ring_size=2)
+    output = layout.crop(gray)
+    assert output.shape == (10, 205)
+    assert np.array_equal(output[:, :100], gray[:, :100])
+    assert (output[:, 100:105] == 255).all()
+    assert np.array_equal(output[:, 105:], gray[:, 200:300])
+
+
+def test_crop_passes_frame_through_without_selection_or_on_size_change():
+    gray = np.zeros((10, 300), dtype=np.uint8)
+    assert TableLayout(gray.shape, [(0, 300)], ('gutters', 1), []).crop(gray) is gray
+    layout = TableLayout(gray.shape, [(0, 100), (100, 300)], ('lines',), [0])
+    other = np.zeros((20, 300), dtype=np.uint8)
+    assert layout.crop(other) is other
+
+
+def test_learn_and_matches():
+    table = make_table()
+
+    def recognize_detailed(image):
+        return [(box(110, 0, 200, 12), '课程名', 0.9), (box(230, 0, 300, 12), '教师', 0.9)]
+
+    layout = TableLayout.learn(table, recognize_detailed)
+    assert layout.selected == [1]
+    assert layout.matches(make_table())
+    assert not layout.matches(make_table(lines=(0, 150, 220, 320, 399)))
+    assert layout.crop(table).shape == (200, layout.spans[0][1] - layout.spans[0][0])
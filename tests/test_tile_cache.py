@@ -0,0 +1,63 @@
+# test_tile_cache.py
+import numpy as np
+
+from tile_cache import TileTextCache
+
+
+class FakeRecognizer:
+    """每个条带返回一行位于条带正中的文字，并记录被识别的条带"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tile):
+        self.calls.append(tile.shape)
+        middle = tile.shape[0] / 2.0
+        box = [[0, middle - 2], [10, middle - 2], [10, middle + 2], [0, middle + 2]]
+        return [(box, f"行{len(self.calls)}", 0.9)]
+
+
+def test_split_covers_image_with_overlap():
+    cache = TileTextCache(tile_height=100, overlap=20)
+    assert cache.split(250) == [(0, 100, 0, 120), (100, 200, 80, 220), (200, 250, 180, 250)]
+
+
+def test_unchanged_tiles_are_reused():
+    cache = TileTextCache(tile_height=100, overlap=20)
+    recognizer = FakeRecognizer()
+    image = np.full((300, 200), 255, dtype=np.uint8)
+
+    first = cache.recognize(image, recognizer)
+    assert len(recognizer.calls) == 3
+    assert cache.recognize(image, recognizer) == first
+    assert len(recognizer.calls) == 3
+    assert cache.reuse_ratio() == 0.5
+
+
+def test_only_changed_tile_is_recognized_again():
+    cache = TileTextCache(tile_height=100, overlap=0)
+    recognizer = FakeRecognizer()
+    image = np.full((300, 200), 255, dtype=np.uint8)
+    cache.recognize(image, recognizer)
+
+    image[150:160, :] = 0
+    results = cache.recognize(image, recognizer)
+    assert len(recognizer.calls) == 4
+    assert [text for _, text, _ in results] == ["行1", "行4", "行3"]
+
+
+def test_boxes_are_shifted_to_image_coordinates():
+    cache = TileTextCache(tile_height=100, overlap=0)
+    results = cache.recognize(np.zeros((200, 50), dtype=np.uint8), FakeRecognizer())
+    assert results[1][0][0][1] == 100 + 48
+
+
+def test_shape_change_and_reset_drop_the_cache():
+    cache = TileTextCache(tile_height=100, overlap=0)
+    recognizer = FakeRecognizer()
+    cache.recognize(np.zeros((200, 50), dtype=np.uint8), recognizer)
+    cache.recognize(np.zeros((200, 60), dtype=np.uint8), recognizer)
+    assert len(recognizer.calls) == 4
+    cache.reset()
+    cache.recognize(np.zeros((200, 60), dtype=np.uint8), recognizer)
+    assert len(recognizer.calls) == 6
@@ -0,0 +1,100 @@
+# tile_cache.py
+# 分块增量识别 - 把监控区域切成横向条带，只对内容变化的条带重新OCR
+import zlib
+
+import numpy as np
+
+
+class TileTextCache:
+    """
+    条带文字缓存
+    功能：按行把图像切成若干条带并计算哈希，哈希未变的条带直接复用上次识别的文字
+    """
+
+    def __init__(self, tile_height=120, overlap=24):
+        """
+        初始化缓存
+
+        参数:
+        tile_height: 每个条带的核心高度(像素，按缩放后的图像计算)
+        overlap: 条带上下额外扩展的像素，保证跨越边界的文字行能被完整识别
+        """
+        self.tile_height = max(1, int(tile_height))
+        self.overlap = max(0, int(overlap))
+        self.image_shape = None
+        self.entries = {}  # 条带序号 -> (哈希, 识别结果列表)
+
+        # 统计
+        self.tiles_total = 0
+        self.tiles_recognized = 0
+
+    def split(self, height):
+        """
+        计算条带划分
+
+        返回: [(核心起点, 核心终点, 扩展起点, 扩展终点), ...]
+        """
+        tiles = []
+        for core_top in range(0, height, self.tile_height):
+            core_bottom = min(height, core_top + self.tile_height)
+            top = max(0, core_top - self.overlap)
+            bottom = min(height, core_bottom + self.overlap)
+            tiles.append((core_top, core_bottom, top, bottom))
+        return tiles
+
+    @staticmethod
+    def tile_hash(tile):
+        """计算条带像素哈希"""
+        return zlib.crc32(np.ascontiguousarray(tile))
+
+    def recognize(self, image, recognize_detailed):
+        """
+        增量识别整幅图像
+
+        参数:
+        image: 预处理后的灰度图像
+        recognize_detailed: 识别函数，输入图像返回 [(box, text, confidence), ...]
+
+        返回: 按从上到下顺序排列的 [(box, text, confidence), ...]，坐标已换算回整幅图像
+        """
+        if image.shape != self.image_shape:
+            self.image_shape = image.shape
+            self.entries = {}
+
+        merged = []
+        for index, (core_top, core_bottom, top, bottom) in enumerate(self.split(image.shape[0])):
+            tile = image[top:bottom]
+            digest = self.tile_hash(tile)
+            self.tiles_total += 1
+
+            cached = self.entries.get(index)
+            if cached is not None and cached[0] == digest:
+                merged.extend(cached[1])
+                continue
+
+            tile_results = []
+            for result in recognize_detailed(tile):
+                if len(result) < 2:
+                    continue
+                box = [[point[0], point[1] + top] for point in result[0]]
+                # 只保留中心落在本条带核心区域内的文字，重叠区域由相邻条带负责
+                center_y = sum(point[1] for point in box) / len(box)
+                if core_top <= center_y < core_bottom:
+                    tile_results.append((box, result[1], result[2] if len(result) > 2 else 1.0))
+
+            self.entries[index] = (digest, tile_results)
+            self.tiles_recognized += 1
+            merged.extend(tile_results)
+
+        return merged
+
+    def reuse_ratio(self):
+        """条带复用比例"""
+        if not self.tiles_total:
+            return 0.0
+        return 1.0 - self.tiles_recognized / self.tiles_total
+
+    def reset(self):
+        """清空缓存"""
+        self.image_shape = None
+        self.entries = {}